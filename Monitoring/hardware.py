@@ -5,6 +5,7 @@ from cpuinfo import DataSource
 import psutil
 from .gpu import CGPUInfo
 from .hdd import getDrivesInfo
+from .process import CProcessInfo
 
 from Monitoring.core import logger
 
@@ -17,6 +18,7 @@ class CHardwareInfo:
     switchCPU = False
     switchHDD = False
     switchRAM = False
+    switchProcess = False
     whichHDD = '/' # breaks linux
 
     @property
@@ -33,8 +35,10 @@ class CHardwareInfo:
     def switchVRAM(self, value):
         self.GPUInfo.switchVRAM = value
 
-    def __init__(self, switchCPU=False, switchGPU=False, switchHDD=False, switchRAM=False, switchVRAM=False):
+    def __init__(self, switchCPU=False, switchGPU=False, switchHDD=False, switchRAM=False, switchVRAM=False, switchProcess=False):
         self.switchCPU = switchCPU
+        self.switchProcess = switchProcess
+        self.ProcessInfo = CProcessInfo() if switchProcess else None
         self.switchHDD = switchHDD
         self.switchRAM = switchRAM
 
@@ -113,6 +117,12 @@ class CHardwareInfo:
 
         getStatus = self.GPUInfo.getStatus()
 
+        process = None
+        processHistory = []
+        if self.switchProcess and self.ProcessInfo is not None:
+            process = self.ProcessInfo.getStatus()
+            processHistory = self.ProcessInfo.getHistory()
+
         return {
             'cpu_utilization': cpu,
             'ram_total': ramTotal,
@@ -123,4 +133,6 @@ class CHardwareInfo:
             'hdd_used_percent': hddUsedPercent,
             'device_type': getStatus['device_type'],
             'gpus': getStatus['gpus'],
+            'process': process,
+            'process_history': processHistory,
         }
@@ -1,44 +1,64 @@
-import asyncio
 import time
 import threading
 from .hardware import CHardwareInfo
 
-from ..core import logger
+from .core import logger
 
 lock = threading.Lock()
 
 
 class CMonitor:
+    """
+    Polls CHardwareInfo on its own thread and hands every status dict to callback.
+    The hardware probes (cpuinfo, pynvml, torch.cuda) are set up once, in the
+    constructor, and reused for every sample.
+    """
     monitorThread = None
-    threadController = threading.Event()
     rate = 0
     hardwareInfo = None
 
-    def __init__(self, rate=5, switchCPU=False, switchGPU=False, switchHDD=False, switchRAM=False, switchVRAM=False):
+    def __init__(self, rate=5, switchCPU=False, switchGPU=False, switchHDD=False, switchRAM=False, switchVRAM=False, callback=None, switchProcess=False):
         self.rate = rate
-        self.hardwareInfo = CHardwareInfo(switchCPU, switchGPU, switchHDD, switchRAM, switchVRAM)
+        self.callback = callback
+        self.threadController = threading.Event()
+        self.hardwareInfo = CHardwareInfo(switchCPU, switchGPU, switchHDD, switchRAM, switchVRAM, switchProcess)
 
         self.startMonitor()
 
-    async def send_message(self, data) -> None:
-      # I'm not sure if it is ok, but works ¯\_(ツ)_/¯
-      # I tried to use async with send_json, but eventually that don't send the message
-      server.PromptServer.instance.send_sync('crystools.monitor', data)
+    def send_message(self, data) -> None:
+        if self.callback is not None:
+            self.callback(data)
 
     def startMonitorLoop(self):
-      # logger.debug('Starting monitor loop...')
-      asyncio.run(self.MonitorLoop())
+        # logger.debug('Starting monitor loop...')
+        self.MonitorLoop()
 
-    async def MonitorLoop(self):
+    def MonitorLoop(self):
         while self.rate > 0 and not self.threadController.is_set():
-            data = self.hardwareInfo.getStatus()
-            # logger.debug('data to send' + str(data))
-            await self.send_message(data)
-            await asyncio.sleep(self.rate)
+            started = time.monotonic()
+            try:
+                data = self.hardwareInfo.getStatus()
+                # logger.debug('data to send' + str(data))
+                self.send_message(data)
+            except Exception as e:
+                logger.error(f'Monitor sample failed: {e}')
+            # Event.wait so stopMonitor() ends the loop immediately
+            self.threadController.wait(max(0.0, self.rate - (time.monotonic() - started)))
+
+    def setRate(self, rate):
+        """Change the sampling interval in seconds; 0 stops the monitor."""
+        self.rate = rate
+        if rate > 0:
+            if self.monitorThread is None or not self.monitorThread.is_alive():
+                self.startMonitor()
+        else:
+            self.stopMonitor()
 
     def startMonitor(self):
         if self.monitorThread is not None:
             self.stopMonitor()
+            if self.monitorThread.is_alive():
+                self.monitorThread.join(timeout=self.rate + 1)
             logger.debug('Restarting monitor...')
         else:
             if self.rate == 0:
@@ -60,7 +80,3 @@ class CMonitor:
     def stopMonitor(self):
         logger.debug('Stopping monitor...')
         self.threadController.set()
-
-
-cmonitor = CMonitor(1, True, True, True, True, True)
-
@@ -0,0 +1,111 @@
+import os
+import time
+import threading
+from collections import deque
+import psutil
+from Monitoring.core import logger
+
+# Child processes worth naming in the breakdown; anything else is grouped as "other"
+TRACKED_CHILDREN = ('ffmpeg', 'ffprobe', 'yt-dlp', 'yt_dlp')
+
+
+class CProcessInfo:
+    """
+    Resource use of this process and its children (ffmpeg encodes, probes, yt-dlp):
+    CPU %, RSS, I/O bytes/s and thread count, plus a rolling history of samples.
+    psutil.Process objects are kept between samples, because cpu_percent() and
+    the I/O rates are measured against the previous call on the same object.
+    """
+
+    def __init__(self, historySize=120):
+        self.process = psutil.Process(os.getpid())
+        self.process.cpu_percent(None)
+        self.children = {}
+        self.lastIO = {}
+        self.lastTime = time.monotonic()
+        self.history = deque(maxlen=historySize)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def groupName(proc):
+        try:
+            name = proc.name().lower()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 'other'
+        for tracked in TRACKED_CHILDREN:
+            if name.startswith(tracked):
+                return tracked.replace('_', '-')
+        return 'other'
+
+    def readIO(self, proc):
+        try:
+            io = proc.io_counters()
+            return io.read_bytes + io.write_bytes
+        except (psutil.NoSuchProcess, psutil.AccessDenied, AttributeError, NotImplementedError):
+            # io_counters is not available on every platform (e.g. macOS)
+            return None
+
+    def sampleOne(self, proc, elapsed):
+        with proc.oneshot():
+            cpu = proc.cpu_percent(None)
+            rss = proc.memory_info().rss
+            threads = proc.num_threads()
+        total = self.readIO(proc)
+        last = self.lastIO.get(proc.pid)
+        self.lastIO[proc.pid] = total
+        ioRate = -1
+        if total is not None and last is not None and elapsed > 0:
+            ioRate = max(0, total - last) / elapsed
+        return {'cpu': cpu, 'rss': rss, 'io_rate': ioRate, 'threads': threads}
+
+    def getStatus(self):
+        now = time.monotonic()
+        elapsed = now - self.lastTime
+        self.lastTime = now
+
+        try:
+            current = {p.pid: p for p in self.process.children(recursive=True)}
+        except psutil.Error as e:
+            logger.debug(f'Could not list child processes: {e}')
+            current = {}
+        for pid, proc in current.items():
+            if pid not in self.children:
+                # First call only primes the CPU counter
+                self.children[pid] = proc
+                try:
+                    proc.cpu_percent(None)
+                except psutil.Error:
+                    pass
+        for pid in list(self.children):
+            if pid not in current:
+                del self.children[pid]
+                self.lastIO.pop(pid, None)
+
+        own = self.sampleOne(self.process, elapsed)
+        groups = {}
+        for proc in list(self.children.values()):
+            try:
+                sample = self.sampleOne(proc, elapsed)
+            except psutil.Error:
+                continue
+            group = groups.setdefault(self.groupName(proc), {'cpu': 0.0, 'rss': 0, 'io_rate': 0.0, 'threads': 0, 'count': 0})
+            group['cpu'] += sample['cpu']
+            group['rss'] += sample['rss']
+            group['io_rate'] += max(0, sample['io_rate'])
+            group['threads'] += sample['threads']
+            group['count'] += 1
+
+        total = {
+            'cpu': own['cpu'] + sum(g['cpu'] for g in groups.values()),
+            'rss': own['rss'] + sum(g['rss'] for g in groups.values()),
+            'io_rate': max(0, own['io_rate']) + sum(g['io_rate'] for g in groups.values()),
+            'threads': own['threads'] + sum(g['threads'] for g in groups.values()),
+        }
+        with self.lock:
+            self.history.append((time.time(), own['cpu'], total['cpu'], total['rss'], total['io_rate']))
+        return {'self': own, 'children': groups, 'total': total}
+
+    def getHistory(self):
+        """Copy of the ring buffer: (time, own cpu %, total cpu %, total rss, total io bytes/s) per sample."""
+        with self.lock:
+            return list(self.history)
@@ -1,28 +1,36 @@
 import sys
 import os
-import time
+from scripts import startup_timing
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 from scripts.video_cropper import VideoCropper
+from scripts.video_list_view import mirror_list_widget_rules
+startup_timing.mark("imports")
 
 # Set high DPI environment variables before creating QApplication
 os.environ["QT_ENABLE_HIGHDPI_SCALING"] = "1"
 os.environ["QT_SCALE_FACTOR_ROUNDING_POLICY"] = "PassThrough"
 
-# Create the application
-app = QApplication(sys.argv)
-
 if __name__ == "__main__":
-    start = time.time()
+    # Create the application (inside the guard so process-pool workers don't create one)
+    app = QApplication(sys.argv)
+    startup_timing.mark("QApplication")
     
     # Load the retro arcade stylesheet from a file
     with open("styles/minimal/pure_dark.css", "r") as file:
         retro_stylesheet = file.read()
-    app.setStyleSheet(retro_stylesheet)
+    app.setStyleSheet(mirror_list_widget_rules(retro_stylesheet))
+    startup_timing.mark("stylesheet")
     
     try:
         window = VideoCropper()
+        startup_timing.mark("window constructed")
         window.show()
-        print("App created in", time.time() - start, "seconds")
+        startup_timing.mark("window shown")
+        # The breakdown is printed when the first folder listing lands, or right away without one
+        QTimer.singleShot(0, lambda: startup_timing.mark("event loop running"))
+        if not window.folder_path:
+            QTimer.singleShot(0, startup_timing.report)
         sys.exit(app.exec())
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -1,5 +1,7 @@
 from __future__ import annotations
 import os
+import threading
+import time
 from typing import Optional, Tuple
 
 from PyQt6.QtCore import Qt, pyqtSignal, QObject
@@ -18,6 +20,91 @@ except Exception:
     pg = None  # type: ignore
 
 
+class WaveformLoader(QObject):
+    """Decodes audio on a worker thread and streams waveform peaks back to the GUI.
+
+    Samples are read from an ffmpeg PCM pipe in chunks and reduced to peaks as they
+    arrive, so the full-rate sample array never exists in memory. Every signal carries
+    the generation of the load it belongs to, so results of a superseded load are ignored.
+    """
+
+    info_ready = pyqtSignal(int, int, int)             # generation, sample rate, duration ms
+    peaks_progress = pyqtSignal(int, object, object)   # generation, times (s), peaks
+    pyramid_ready = pyqtSignal(int, object)            # generation, waveform_cache.PeakPyramid
+    load_failed = pyqtSignal(int, str)
+
+    PREVIEW_POINTS = 8000
+    PREVIEW_INTERVAL_S = 0.25
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._generation = 0
+        self._procs = []
+
+    def start(self, path: str) -> int:
+        """Cancel any running decode and start decoding path. Returns the load generation."""
+        self.cancel()
+        gen = self._generation
+        threading.Thread(target=self._run, args=(gen, path), daemon=True).start()
+        return gen
+
+    def cancel(self) -> None:
+        self._generation += 1
+        for proc in self._procs:
+            try:
+                if proc.poll() is None:
+                    proc.terminate()
+            except Exception:
+                pass
+        self._procs = []
+
+    def _run(self, gen: int, path: str) -> None:
+        from scripts.waveform_cache import (
+            PeakAccumulator, build_peak_pyramid, probe_audio_stream, save_pyramid_to_cache, stream_pcm
+        )
+        try:
+            sr, duration_ms = probe_audio_stream(path)
+        except FileNotFoundError:
+            sr, duration_ms = None, 0
+        if sr is None:
+            # No ffprobe/ffmpeg (or a stream it cannot describe): decode in one go
+            samples, sr, duration_ms = AudioEditor._load_samples(path)
+            if samples is None or sr is None or len(samples) == 0:
+                self.load_failed.emit(gen, f"Could not decode audio: {os.path.basename(path)}")
+                return
+            pyramid = build_peak_pyramid(samples, sr)
+            del samples
+        else:
+            self.info_ready.emit(gen, sr, duration_ms)
+            acc = PeakAccumulator()
+            procs = []
+            self._procs = procs
+            pcm = stream_pcm(path, sr, process_holder=procs)
+            last_emit = time.monotonic()
+            try:
+                for chunk in pcm:
+                    if gen != self._generation:
+                        return
+                    acc.feed(chunk)
+                    now = time.monotonic()
+                    if now - last_emit >= self.PREVIEW_INTERVAL_S:
+                        last_emit = now
+                        block, peaks = acc.preview(self.PREVIEW_POINTS)
+                        times = (np.arange(len(peaks), dtype=np.float64) * block + block / 2.0) / float(sr)
+                        self.peaks_progress.emit(gen, times, peaks.astype(np.float32))
+            except (OSError, RuntimeError) as e:
+                if gen == self._generation:
+                    self.load_failed.emit(gen, f"Waveform decode failed: {e}")
+                return
+            finally:
+                pcm.close()
+            pyramid = acc.finish(sr)
+        if gen != self._generation:
+            return
+        save_pyramid_to_cache(path, pyramid)
+        self.pyramid_ready.emit(gen, pyramid)
+
+
 class AudioEditor(QWidget):
     """
     Lightweight audio editor panel with waveform, draggable trim markers, and playhead.
@@ -36,9 +123,20 @@ class AudioEditor(QWidget):
         self._audio_path: Optional[str] = None
         self._duration_ms: int = 0
         self._sr: Optional[int] = None
-        self._samples: Optional["np.ndarray"] = None  # mono float32 [-1,1]
+        self._pyramid = None  # waveform_cache.PeakPyramid of the loaded file
+        self._level: int = -1  # pyramid level currently shown
+        self._load_generation: int = -1
+        self._waveform_loader = WaveformLoader()
+        self._waveform_loader.info_ready.connect(self._on_waveform_info)
+        self._waveform_loader.peaks_progress.connect(self._on_waveform_progress)
+        self._waveform_loader.pyramid_ready.connect(self._on_waveform_ready)
+        self._waveform_loader.load_failed.connect(self._on_waveform_failed)
         self._start_ms: Optional[int] = None
         self._end_ms: Optional[int] = None
+        # Regions queued for a batch clip export: list of (start_ms, end_ms, overlay item)
+        self._queued_regions = []
+        # Auto-detected segments proposed for queuing: list of (start_ms, end_ms, overlay item)
+        self._candidates = []
         
         # Enable key events
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
@@ -58,7 +156,8 @@ class AudioEditor(QWidget):
             return
 
         # Professional waveform display with grid and axis
-        pg.setConfigOptions(antialias=True, useNumba=True, useOpenGL=True)
+        # No numba: importing it costs seconds and the cached peak pyramid already keeps plots small
+        pg.setConfigOptions(antialias=True, useOpenGL=True)
         self.plot_widget = pg.PlotWidget()
         self.plot_widget.setBackground('#1e1e1e')  # Dark background like professional DAWs
         
@@ -117,6 +216,9 @@ class AudioEditor(QWidget):
         # Context menu for zoom controls
         self.plot_widget.scene().contextMenu = []  # Remove default context menu
 
+        # Switch waveform detail level whenever the visible span changes (wheel, drag, auto-range)
+        self.plot_item.getViewBox().sigXRangeChanged.connect(lambda *_: self._update_waveform_level())
+
         # Marker moved handlers
         self.start_line.sigPositionChanged.connect(self._on_marker_moved)
         self.end_line.sigPositionChanged.connect(self._on_marker_moved)
@@ -132,33 +234,69 @@ class AudioEditor(QWidget):
     # Public API
     # ----------
     def load(self, path: str) -> None:
+        """Show the waveform of path. Cached peaks render immediately; otherwise the file
+        is decoded on a worker thread and the waveform fills in as it streams."""
+        self.clear_regions()
+        self.clear_candidates()
         self._audio_path = path
-        self._samples, self._sr, self._duration_ms = self._load_samples(path)
-        if self._samples is None or self.plot_widget is None or self._sr is None:
+        self._pyramid = None
+        self._level = -1
+        self._sr, self._duration_ms = None, 0
+        self._start_ms, self._end_ms = None, None
+        if self.plot_widget is None:
             return
-            
-        x = self._samples
-        if x is None or len(x) == 0:
+        self._waveform_loader.cancel()
+        self.curve_positive.setData([], [])
+        from scripts.waveform_cache import load_pyramid_from_cache
+
+        # Reopening a file renders from the cached peak pyramid without decoding
+        pyramid = load_pyramid_from_cache(path)
+        if pyramid is not None:
+            self._load_generation = -1
+            self._on_waveform_ready(-1, pyramid)
+            return
+        self._load_generation = self._waveform_loader.start(path)
+
+    def _on_waveform_info(self, gen: int, sr: int, duration_ms: int) -> None:
+        if gen != self._load_generation:
+            return
+        self._sr = sr
+        if duration_ms > 0:
+            self._show_timeline(duration_ms)
+
+    def _on_waveform_progress(self, gen: int, times, peaks) -> None:
+        if gen != self._load_generation or self._pyramid is not None:
+            return
+        self.curve_positive.setData(times, peaks, pen=pg.mkPen('#4e9ef4', width=1.2))
+
+    def _on_waveform_ready(self, gen: int, pyramid) -> None:
+        if gen != self._load_generation:
+            return
+        self._pyramid = pyramid
+        self._sr = pyramid.sr
+        if self._duration_ms <= 0:
+            self._show_timeline(pyramid.duration_ms)
+        elif self._duration_ms != pyramid.duration_ms:
+            # The decoded length is authoritative over the container's duration
+            old_duration = self._duration_ms
+            self._duration_ms = pyramid.duration_ms
+            if self._end_ms is None or self._end_ms >= old_duration or self._end_ms > self._duration_ms:
+                self._end_ms = self._duration_ms
+            self._start_ms = min(self._start_ms or 0, self._end_ms)
+            self._update_marker_positions()
+        self._update_waveform_level(force=True)
+
+    def _on_waveform_failed(self, gen: int, message: str) -> None:
+        if gen != self._load_generation:
+            return
+        print(message)
+
+    def _show_timeline(self, duration_ms: int) -> None:
+        """Set up axes, playhead and trim markers for a file of duration_ms."""
+        self._duration_ms = int(duration_ms)
+        if self._duration_ms <= 0:
             return
-            
-        # Calculate time points for x-axis
         duration_sec = self._duration_ms / 1000.0
-        time_points = np.linspace(0, duration_sec, len(x))
-        
-        # Create envelope for better visualization (top half only)
-        # Take absolute value to get full waveform in positive space
-        x_abs = np.abs(x)
-        
-        # Downsample intelligently for performance
-        target_points = min(5000, len(x))  # Target number of points
-        if len(x) > target_points * 2:
-            # Use peak detection for better downsampling
-            step = len(x) // target_points
-            x_abs = self._downsample_peaks(x_abs, step)
-            time_points = time_points[::step][:len(x_abs)]
-        
-        # Update the plot with new data (only positive half)
-        self.curve_positive.setData(time_points, x_abs, pen=pg.mkPen('#4e9ef4', width=1.2))
         # Hide the negative curve since we're only showing top half
         self.curve_negative.setData([], [])  # Empty data to hide
         # Update zero line to be at the bottom
@@ -172,8 +310,12 @@ class AudioEditor(QWidget):
         self.playhead_line.setValue(0)
         self.playhead_line.show()
         
-        # Default trim to full length
-        self._start_ms, self._end_ms = 0, self._duration_ms
+        # Default trim to full length, keeping a selection made while the file was still decoding
+        if self._start_ms is None or self._end_ms is None:
+            self._start_ms, self._end_ms = 0, self._duration_ms
+        else:
+            self._start_ms = min(self._start_ms, self._duration_ms)
+            self._end_ms = min(self._end_ms, self._duration_ms)
         self._update_marker_positions()
         self.start_line.show()
         self.end_line.show()
@@ -184,26 +326,21 @@ class AudioEditor(QWidget):
         # Enable auto-range buttons
         self.plot_item.getViewBox().enableAutoRange(enable=True)
         
-    def _downsample_peaks(self, x: np.ndarray, step: int) -> np.ndarray:
-        """Downsample using peak detection for better waveform visualization."""
-        n = len(x) // step
-        result = np.zeros(n)
-        for i in range(n):
-            start = i * step
-            end = min((i + 1) * step, len(x))
-            if start >= end:
-                continue
-            # Get min and max in the window
-            window = x[start:end]
-            if np.all(np.isnan(window)):
-                result[i] = 0
-            else:
-                # For positive part, get max; for negative, get min
-                if np.any(window > 0):
-                    result[i] = np.nanmax(window)
-                else:
-                    result[i] = np.nanmin(window)
-        return result
+    def _update_waveform_level(self, force: bool = False) -> None:
+        """Show the pyramid level that matches the visible time span and plot width."""
+        if self._pyramid is None or self.plot_widget is None:
+            return
+        x_min, x_max = self.plot_item.getViewBox().viewRange()[0]
+        span = max(1e-3, min(x_max, self._duration_ms / 1000.0) - max(0.0, x_min))
+        level = self._pyramid.level_for_span(span, self.plot_widget.width())
+        if level == self._level and not force:
+            return
+        self._level = level
+        self.curve_positive.setData(
+            self._pyramid.times(level),
+            self._pyramid.levels[level].astype(np.float32),
+            pen=pg.mkPen('#4e9ef4', width=1.2)
+        )
 
     def set_playhead_ms(self, ms: int) -> None:
         if self._duration_ms <= 0 or self.playhead_line is None:
@@ -232,16 +369,84 @@ class AudioEditor(QWidget):
         e = self._duration_ms if self._end_ms is None else int(self._end_ms)
         return s, e
 
+    def add_region(self) -> Optional[Tuple[int, int]]:
+        """Queue the current trim selection for batch export and mark it on the waveform."""
+        s, e = self.get_trim_points()
+        if not self._queue_region(s, e):
+            return None
+        return s, e
+
+    def _queue_region(self, s: int, e: int) -> bool:
+        if e <= s or any(q[0] == s and q[1] == e for q in self._queued_regions):
+            return False
+        item = None
+        if self.plot_widget is not None:
+            item = pg.LinearRegionItem(
+                values=(s / 1000.0, e / 1000.0),
+                movable=False,
+                brush=pg.mkBrush(78, 158, 244, 40),
+                pen=pg.mkPen('#4e9ef4', width=1),
+            )
+            item.setZValue(-10)
+            self.plot_item.addItem(item)
+        self._queued_regions.append((s, e, item))
+        return True
+
+    def queued_regions(self):
+        """Return the queued (start_ms, end_ms) regions in the order they were added."""
+        return [(s, e) for s, e, _ in self._queued_regions]
+
+    def clear_regions(self) -> None:
+        for _, _, item in self._queued_regions:
+            if item is not None and self.plot_widget is not None:
+                self.plot_item.removeItem(item)
+        self._queued_regions = []
+
+    def propose_segments(self) -> int:
+        """Detect non-silent spans from the cached RMS envelope and show them as candidates.
+        Returns the number of candidates (0 while the file is still decoding)."""
+        self.clear_candidates()
+        if self._pyramid is None or self.plot_widget is None:
+            return 0
+        from scripts.audio_segments import detect_segments
+        segments = detect_segments(self._pyramid.rms, self._pyramid.sr, self._duration_ms)
+        for s, e in segments:
+            item = pg.LinearRegionItem(
+                values=(s / 1000.0, e / 1000.0),
+                movable=False,
+                brush=pg.mkBrush(255, 204, 0, 30),
+                pen=pg.mkPen('#FFCC00', width=1, style=Qt.PenStyle.DotLine),
+            )
+            item.setZValue(-20)
+            self.plot_item.addItem(item)
+            self._candidates.append((s, e, item))
+        return len(segments)
+
+    def candidate_segments(self):
+        return [(s, e) for s, e, _ in self._candidates]
+
+    def accept_candidates(self) -> int:
+        """Move all proposed segments into the export queue. Returns how many were queued."""
+        accepted = sum(1 for s, e in self.candidate_segments() if self._queue_region(s, e))
+        self.clear_candidates()
+        return accepted
+
+    def clear_candidates(self) -> None:
+        for _, _, item in self._candidates:
+            if item is not None and self.plot_widget is not None:
+                self.plot_item.removeItem(item)
+        self._candidates = []
+
     # Internal helpers
     # ----------------
     def _on_marker_moved(self):
         if self._duration_ms <= 0:
             return
-        # Convert marker x positions back to ms
-        s_idx = int(self.start_line.value()) if self.start_line else 0
-        e_idx = int(self.end_line.value()) if self.end_line else 0
-        s_ms = self._sample_index_to_ms(s_idx)
-        e_ms = self._sample_index_to_ms(e_idx)
+        # Convert marker x positions (seconds) back to ms
+        s_ms = int(round(self.start_line.value() * 1000)) if self.start_line else 0
+        e_ms = int(round(self.end_line.value() * 1000)) if self.end_line else 0
+        s_ms = max(0, min(self._duration_ms, s_ms))
+        e_ms = max(0, min(self._duration_ms, e_ms))
         if e_ms < s_ms:
             s_ms, e_ms = e_ms, s_ms
         self._start_ms, self._end_ms = s_ms, e_ms
@@ -278,10 +483,16 @@ class AudioEditor(QWidget):
         # Update the highlighted region between markers
         self._update_highlight_region()
 
+    def _total_samples(self) -> int:
+        """Sample count derived from duration and sample rate (samples are not retained)."""
+        if not self._sr or self._duration_ms <= 0:
+            return 0
+        return int(round(self._duration_ms * self._sr / 1000.0))
+
     def _ms_to_sample_index(self, ms: int) -> int:
-        if self._sr is None or self._duration_ms <= 0 or self._samples is None:
+        total_samples = self._total_samples()
+        if total_samples <= 0:
             return 0
-        total_samples = self._samples.shape[0]
         ratio = float(ms) / float(self._duration_ms)
         return int(max(0, min(total_samples - 1, ratio * total_samples)))
         
@@ -321,18 +532,20 @@ class AudioEditor(QWidget):
         # Apply zoom centered on mouse position
         vb.setRange(xRange=vb.viewRange()[0], padding=0)
         vb.scaleBy((1/zoom_factor, 1), pos=pos)
+        self._update_waveform_level()
         
         event.accept()
 
     def _sample_index_to_ms(self, idx: int) -> int:
-        if self._samples is None or self._duration_ms <= 0:
+        total_samples = self._total_samples()
+        if total_samples <= 0:
             return 0
-        total = max(1, self._samples.shape[0] - 1)
+        total = max(1, total_samples - 1)
         ratio = max(0.0, min(1.0, float(idx) / float(total)))
         return int(ratio * self._duration_ms)
 
     def _on_plot_clicked(self, ev):
-        if self.plot_item is None or self._duration_ms <= 0 or self._samples is None:
+        if self.plot_item is None or self._duration_ms <= 0:
             return
             
         # Only process left mouse button clicks
@@ -395,7 +608,8 @@ class AudioEditor(QWidget):
             return
         super().keyPressEvent(event)
 
-    def _load_samples(self, path: str):
+    @staticmethod
+    def _load_samples(path: str):
         """Return (mono_samples_float32, sr, duration_ms). Best effort without hard deps.
         Prefers librosa if available, else tries wave for .wav files.
         """
@@ -0,0 +1,110 @@
+import os
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from scripts.export_jobs import container_format_for, discard_partial, finalize_partial, partial_path_for
+
+# Source codecs that can be cut with stream copy, and the extension to copy them into.
+# Anything else is re-encoded to MP3 as before.
+STREAM_COPY_OUTPUTS = {
+    'mp3': '.mp3',
+    'aac': '.m4a',
+    'flac': '.flac',
+    'vorbis': '.ogg',
+}
+
+
+def probe_audio_codec(path):
+    """Return the codec name of the first audio stream, or None (only codec_name is probed)."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+             '-show_entries', 'stream=codec_name', '-of', 'json', path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        if result.returncode != 0:
+            return None
+        streams = json.loads(result.stdout or '{}').get('streams', [])
+        return streams[0].get('codec_name') if streams else None
+    except (OSError, ValueError):
+        return None
+
+
+def build_clip_command(src, regions, out_paths, stream_copy):
+    """Build a single ffmpeg command that cuts every region in one pass over src.
+
+    The input is fast-seeked to the earliest region start; each output then gets its
+    own -ss/-t relative to that point, so the file is only read once for all clips.
+    """
+    first_ms = min(s for s, _ in regions)
+    cmd = ['ffmpeg', '-y', '-v', 'error', '-ss', str(first_ms / 1000.0), '-i', src]
+    for (s_ms, e_ms), out_path in zip(regions, out_paths):
+        cmd += ['-ss', str((s_ms - first_ms) / 1000.0), '-t', str((e_ms - s_ms) / 1000.0),
+                '-map', '0:a:0', '-vn']
+        if stream_copy:
+            cmd += ['-c:a', 'copy']
+        else:
+            cmd += ['-acodec', 'libmp3lame', '-b:a', '192k']
+        cmd += ['-f', container_format_for(out_path), partial_path_for(out_path)]
+    return cmd
+
+
+class AudioClipExporter(QObject):
+    """Cuts audio clips in a background pool.
+
+    Each submitted job is one source file with one or more (start_ms, end_ms) regions,
+    cut by a single ffmpeg process. Jobs for different files run in parallel.
+    """
+
+    status_changed = pyqtSignal(str)
+    job_finished = pyqtSignal(bool, str, list)  # success, message, exported paths
+
+    def __init__(self, max_workers=None):
+        super().__init__()
+        if max_workers is None:
+            max_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(self, src, regions):
+        regions = sorted((int(s), int(e)) for s, e in regions if e > s)
+        if not regions:
+            return None
+        return self._executor.submit(self._run_job, src, regions)
+
+    def _run_job(self, src, regions):
+        codec = probe_audio_codec(src)
+        copy_ext = STREAM_COPY_OUTPUTS.get(codec)
+        ext = copy_ext or '.mp3'
+        folder = os.path.dirname(src)
+        clips_dir = os.path.join(folder, 'Clips')
+        os.makedirs(clips_dir, exist_ok=True)
+        base = os.path.splitext(os.path.basename(src))[0]
+        out_paths = [os.path.join(clips_dir, f"{base}_{s}ms_{e}ms{ext}") for s, e in regions]
+        mode = "stream copy" if copy_ext else "MP3 encode"
+        self.status_changed.emit(f"Exporting {len(regions)} clip(s) from {os.path.basename(src)} ({mode})...")
+        cmd = build_clip_command(src, regions, out_paths, stream_copy=bool(copy_ext))
+        try:
+            completed = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        except FileNotFoundError:
+            self.job_finished.emit(False, "ffmpeg not found. Please install ffmpeg and ensure it's in PATH.", [])
+            return
+        if completed.returncode != 0:
+            for out_path in out_paths:
+                discard_partial(partial_path_for(out_path))
+            last = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'ffmpeg error'
+            self.job_finished.emit(False, f"Export failed: {last}", [])
+            return
+        exported = []
+        for out_path in out_paths:
+            try:
+                exported.append(finalize_partial(partial_path_for(out_path), out_path))
+            except OSError as e:
+                print(f"Could not finalize {out_path}: {e}")
+                discard_partial(partial_path_for(out_path))
+        if len(exported) == 1:
+            message = f"Exported: {exported[0]}"
+        else:
+            message = f"Exported {len(exported)} clips to {clips_dir}"
+        self.job_finished.emit(len(exported) == len(out_paths), message, exported)
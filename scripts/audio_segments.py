@@ -0,0 +1,131 @@
+from __future__ import annotations
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from scripts.waveform_cache import RMS_BLOCK, load_or_build_pyramid
+
+Segment = Tuple[int, int]  # (start_ms, end_ms)
+
+# Detection defaults, in the units the UI talks about
+MIN_SILENCE_MS = 300    # shorter pauses are bridged
+MIN_SEGMENT_MS = 250    # shorter bursts are dropped
+PAD_MS = 60             # pre/post roll around each segment
+HYSTERESIS_DB = 6.0     # segments extend while the level stays within this of the threshold
+
+
+def estimate_threshold_db(db: np.ndarray) -> float:
+    """Pick a gate level between the noise floor and the programme level of a file."""
+    floor = float(np.percentile(db, 10))
+    loud = float(np.percentile(db, 95))
+    threshold = floor + max(6.0, (loud - floor) * 0.25)
+    return max(-60.0, min(-20.0, threshold))
+
+
+def detect_segments(rms: np.ndarray, sr: int, duration_ms: int,
+                    threshold_db: Optional[float] = None,
+                    min_silence_ms: int = MIN_SILENCE_MS,
+                    min_segment_ms: int = MIN_SEGMENT_MS,
+                    pad_ms: int = PAD_MS) -> List[Segment]:
+    """Find non-silent spans in an RMS envelope (one value per RMS_BLOCK samples).
+
+    Frames above the threshold start a segment; the segment is extended over
+    neighbouring frames within HYSTERESIS_DB below it, so soft onsets and decays
+    stay attached. Everything is done with array operations, no per-frame loop.
+    """
+    if rms is None or len(rms) == 0 or not sr:
+        return []
+    db = 20.0 * np.log10(np.maximum(rms.astype(np.float32), 1e-6))
+    if threshold_db is None:
+        threshold_db = estimate_threshold_db(db)
+    high = db > threshold_db
+    low = db > threshold_db - HYSTERESIS_DB
+    if not high.any():
+        return []
+
+    # Runs of the low mask that contain at least one high frame
+    edges = np.diff(np.concatenate(([0], low.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = np.maximum.reduceat(high.astype(np.int8), starts).astype(bool)
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return []
+
+    frame_ms = RMS_BLOCK * 1000.0 / sr
+    # Bridge pauses shorter than min_silence_ms
+    gaps = (starts[1:] - ends[:-1]) * frame_ms
+    split = gaps >= min_silence_ms
+    starts = np.concatenate((starts[:1], starts[1:][split]))
+    ends = np.concatenate((ends[:-1][split], ends[-1:]))
+    # Drop bursts shorter than min_segment_ms
+    long_enough = (ends - starts) * frame_ms >= min_segment_ms
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    start_ms = np.clip(np.round(starts * frame_ms) - pad_ms, 0, duration_ms).astype(np.int64)
+    end_ms = np.clip(np.round(ends * frame_ms) + pad_ms, 0, duration_ms).astype(np.int64)
+    return [(int(s), int(e)) for s, e in zip(start_ms, end_ms) if e > s]
+
+
+def analyze_file(path: str, threshold_db: Optional[float] = None) -> Tuple[str, List[Segment]]:
+    """Process-pool entry point: segments for one file, using (and filling) the waveform cache."""
+    try:
+        pyramid = load_or_build_pyramid(path)
+    except Exception as e:
+        print(f"Error analyzing {path}: {e}")
+        return path, []
+    if pyramid is None:
+        return path, []
+    return path, detect_segments(pyramid.rms, pyramid.sr, pyramid.duration_ms, threshold_db)
+
+
+class SegmentAnalyzer(QObject):
+    """Runs analyze_file over many files in a process pool without blocking the GUI.
+
+    The pool is driven from a plain thread; results arrive through queued signals.
+    """
+
+    file_analyzed = pyqtSignal(str, list)   # path, segments
+    progress = pyqtSignal(int, int)         # done, total
+    finished = pyqtSignal(dict)             # path -> segments
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        super().__init__()
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.cancel_requested = False
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def analyze_async(self, paths: Sequence[str], threshold_db: Optional[float] = None) -> None:
+        self.cancel_requested = False
+        self._thread = threading.Thread(target=self._run, args=(list(paths), threshold_db), daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self.cancel_requested = True
+
+    def _run(self, paths: List[str], threshold_db: Optional[float]) -> None:
+        results: Dict[str, List[Segment]] = {}
+        total = len(paths)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(analyze_file, p, threshold_db) for p in paths]
+            for done, future in enumerate(as_completed(futures), 1):
+                if self.cancel_requested:
+                    for f in futures:
+                        f.cancel()
+                    break
+                try:
+                    path, segments = future.result()
+                except Exception as e:
+                    print(f"Segment analysis failed: {e}")
+                    continue
+                results[path] = segments
+                self.file_analyzed.emit(path, segments)
+                self.progress.emit(done, total)
+        self.finished.emit(results)
@@ -1,31 +1,143 @@
 import os
-import ffmpeg
 import shutil
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from scripts.folder_scanner import VIDEO_EXTENSIONS, iter_folder
+from scripts.search_index import ensure_metadata, probe_search_metadata
+
+PROBE_WORKERS = 8  # ffprobe is mostly process start-up and I/O wait
+
+
+def _codec_folder(row):
+    return (row[5] or "unknown").upper()
+
+
+def _resolution_folder(row):
+    return f"{row[3]}p" if row[3] else "unknown"
+
+
+def _fps_folder(row):
+    fps = row[6] if len(row) > 6 else 0
+    if not fps:
+        return "unknown"
+    return f"{fps:.2f}".rstrip("0").rstrip(".") + "fps"
+
+
+# Sort key -> subfolder name for a metadata row (see search_index.METADATA_FILE)
+SORT_KEYS = {
+    "codec": _codec_folder,
+    "resolution": _resolution_folder,
+    "fps": _fps_folder,
+}
+
 
 def is_av1_video(filepath):
     """Return True if the given video file is AV1 video, else False."""
-    try:
-        probe = ffmpeg.probe(filepath)
-        for stream in probe.get('streams', []):
-            if stream.get('codec_type') == 'video' and stream.get('codec_name', '').lower() == 'av1':
-                return True
-    except Exception:
-        pass
-    return False
+    meta = probe_search_metadata(filepath)
+    return meta is not None and meta[3].lower() == 'av1'
 
 
-def move_av1_videos(folder, subfolder_name="AV1"):
-    """Scan the folder for AV1 videos and move them to a subfolder."""
+def plan_moves(folder, key, match=None, subfolder=None, workers=PROBE_WORKERS, progress=None, cancelled=None):
+    """Return [(source, destination)] sorting the videos directly in folder by key.
+
+    Each file goes to folder/<SORT_KEYS[key](row)>. With match, only files whose
+    subfolder name equals it (case-insensitive) move, into subfolder if given.
+    Metadata comes from the shared ffprobe cache; only new or changed files are probed.
+    """
     if not os.path.isdir(folder):
         raise ValueError(f"Not a directory: {folder}")
-    av1_dir = os.path.join(folder, subfolder_name)
-    os.makedirs(av1_dir, exist_ok=True)
+    name_for = SORT_KEYS[key]
+    files = [(os.path.join(folder, name), row[0], row[1]) for name, row in iter_folder(folder)
+             if name.lower().endswith(VIDEO_EXTENSIONS)]
+    rows = ensure_metadata(files, workers=workers, progress=progress, cancelled=cancelled)
+    moves = []
+    for path, _, _ in files:
+        row = rows.get(path)
+        if row is None:
+            continue
+        target = name_for(row)
+        if match is not None:
+            if target.lower() != match.lower():
+                continue
+            target = subfolder or target
+        moves.append((path, os.path.join(folder, target, os.path.basename(path))))
+    return moves
+
+
+def move_files(moves, progress=None, cancelled=None):
+    """Move each (source, destination), creating folders and never overwriting.
+    Returns the list of moved file names."""
     moved = []
-    for entry in os.scandir(folder):
-        if entry.is_file() and entry.name.lower().endswith((".mp4", ".mkv", ".avi", ".mov", ".wmv")):
-            full_path = entry.path
-            if is_av1_video(full_path):
-                dest_path = os.path.join(av1_dir, entry.name)
-                shutil.move(full_path, dest_path)
-                moved.append(entry.name)
+    for i, (source, dest) in enumerate(moves, 1):
+        if cancelled is not None and cancelled():
+            break
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        base, ext = os.path.splitext(dest)
+        counter = 1
+        while os.path.exists(dest):
+            dest = f"{base}_{counter}{ext}"
+            counter += 1
+        try:
+            shutil.move(source, dest)
+            moved.append(os.path.basename(source))
+        except OSError as e:
+            print(f"Could not move {source}: {e}")
+        if progress is not None:
+            progress(i, len(moves))
     return moved
+
+
+def move_av1_videos(folder, subfolder_name="AV1"):
+    """Scan the folder for AV1 videos and move them to a subfolder."""
+    return move_files(plan_moves(folder, "codec", match="av1", subfolder=subfolder_name))
+
+
+class MediaSorter(QObject):
+    """Runs plan_moves + move_files on a worker thread and reports progress.
+
+    progress carries (phase, done, total) with phase "probe" or "move"; finished
+    carries the moved names and a summary line.
+    """
+
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(list, str)
+    failed = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.busy = False
+        self.cancel_requested = False
+
+    def start(self, folder, key, match=None, subfolder=None):
+        if self.busy:
+            return False
+        self.busy = True
+        self.cancel_requested = False
+        threading.Thread(target=self._run, args=(folder, key, match, subfolder), daemon=True).start()
+        return True
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def _run(self, folder, key, match, subfolder):
+        cancelled = lambda: self.cancel_requested
+        try:
+            moves = plan_moves(folder, key, match, subfolder,
+                               progress=lambda done, total: self.progress.emit("probe", done, total),
+                               cancelled=cancelled)
+            moved = move_files(moves, progress=lambda done, total: self.progress.emit("move", done, total),
+                               cancelled=cancelled)
+        except Exception as e:
+            self.busy = False
+            self.failed.emit(str(e))
+            return
+        self.busy = False
+        folders = sorted({os.path.basename(os.path.dirname(dest)) for _, dest in moves})
+        if moved:
+            message = f"Moved {len(moved)} file(s) into {', '.join(folders)}"
+        else:
+            message = "No matching videos found." if match else "Nothing to sort."
+        if self.cancel_requested:
+            message += " (cancelled)"
+        self.finished.emit(moved, message)
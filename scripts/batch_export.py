@@ -0,0 +1,206 @@
+"""Batch trim/crop/scale/caption export without the GUI.
+
+Runs the same export as the B key for many clips at once, on a pool of workers.
+The source is either a job file saved from the GUI (Ctrl+B) or a folder; for a
+folder the clips checked for export, their crop regions and trim points are
+read from the GUI's session database.
+
+    python -m scripts.batch_export export_job.json [--workers 4]
+    python -m scripts.batch_export /videos/set1 [--all] [--session session_data.db]
+                                  [--trim-length 113] [--longest-edge 1024]
+                                  [--prefix NAME] [--caption TEXT] [--images]
+                                  [--output DIR] [--dry-run]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from scripts.export_core import (
+    ClipExport, build_export_plan, export_images, load_job_file, probe_clip, write_caption_file
+)
+from scripts.export_jobs import remove_temp_files, run_encode_step, sweep_partials
+from scripts.folder_scanner import VIDEO_EXTENSIONS
+from scripts.session_store import SESSION_DB, SessionStore
+
+BAR_WIDTH = 30
+
+
+def clips_from_folder(folder, session_path, export_all, options):
+    """ClipExports for the videos in folder, with crops and trim points from the session."""
+    names = sorted(
+        (e.name for e in os.scandir(folder) if e.is_file() and e.name.lower().endswith(VIDEO_EXTENSIONS)),
+        key=str.lower,
+    )
+    store = SessionStore(session_path) if session_path and os.path.exists(session_path) else None
+    try:
+        checked = None
+        settings = {}
+        if store is not None:
+            checked = {e["original_path"] for e in store.get("folders", folder, []) if e.get("export_enabled")}
+            settings = {key: store.get("settings", key) for key in ("trim_length", "longest_edge")}
+        clips = []
+        for name in names:
+            path = os.path.join(folder, name)
+            if not export_all and checked is not None and path not in checked:
+                continue
+            clips.append(ClipExport(
+                path, name,
+                crop=store.get("crop_regions", name) if store is not None else None,
+                trim_start=store.get("trim_points", name, 0) if store is not None else 0,
+                trim_length=options.trim_length or settings.get("trim_length") or 113,
+                longest_edge=options.longest_edge or settings.get("longest_edge") or 1024,
+                prefix=options.prefix,
+                export_image=options.images,
+                caption=options.caption,
+            ))
+        return clips
+    finally:
+        if store is not None:
+            store.close()
+
+
+class BatchExporter:
+    """Runs export plans on a thread pool; each worker drives its own ffmpeg processes."""
+
+    def __init__(self, workers):
+        self.workers = max(1, workers)
+        self.cancel_requested = False
+        self._processes = set()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self.cancel_requested = True
+        with self._lock:
+            for process in list(self._processes):
+                if process.poll() is None:
+                    try:
+                        process.terminate()
+                    except Exception:
+                        pass
+
+    def _track(self, process):
+        with self._lock:
+            self._processes.add(process)
+
+    def run_plan(self, plan, output_root):
+        """Write one clip's stills and encodes. Returns (ok, message)."""
+        os.makedirs(os.path.join(output_root, "cropped"), exist_ok=True)
+        os.makedirs(os.path.join(output_root, "uncropped"), exist_ok=True)
+        if not export_images(plan, cancelled=lambda: self.cancel_requested):
+            return False, "Export cancelled"
+        for step in plan.steps:
+            if self.cancel_requested:
+                return False, "Export cancelled"
+            ok, error = run_encode_step(step, on_start=self._track, cancelled=lambda: self.cancel_requested)
+            if not ok:
+                return False, error
+            if step.final_path not in plan.temp_paths:
+                write_caption_file(step.final_path, plan.clip.caption)
+        remove_temp_files(plan.cleanup)
+        return True, ", ".join(os.path.basename(p) for p in plan.outputs())
+
+    def run(self, plans, output_root):
+        failures = []
+        done = 0
+        started = time.monotonic()
+        print_progress(0, len(plans), started)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.run_plan, plan, output_root): plan for plan in plans}
+            try:
+                for future in as_completed(futures):
+                    plan = futures[future]
+                    try:
+                        ok, message = future.result()
+                    except Exception as e:
+                        ok, message = False, str(e)
+                    done += 1
+                    if not ok:
+                        failures.append((plan.clip.display_name, message))
+                    print_progress(done, len(plans), started, plan.clip.display_name)
+            except KeyboardInterrupt:
+                print("\nCancelling...")
+                self.cancel()
+                for future in futures:
+                    future.cancel()
+                raise
+        return failures
+
+
+def print_progress(done, total, started, label=""):
+    filled = int(BAR_WIDTH * done / total) if total else BAR_WIDTH
+    elapsed = time.monotonic() - started
+    eta = f" ETA {elapsed / done * (total - done):.0f}s" if done and done < total else ""
+    line = f"\r[{'#' * filled}{'.' * (BAR_WIDTH - filled)}] {done}/{total}{eta} {label[:40]:<40}"
+    sys.stderr.write(line)
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="job file saved from the GUI, or a folder of videos")
+    parser.add_argument("--session", default=SESSION_DB, help="session database for crops/trim points (folder source)")
+    parser.add_argument("--all", action="store_true", help="export every video in the folder, not only checked ones")
+    parser.add_argument("--trim-length", type=int, help="frames per clip (default: session value or 113)")
+    parser.add_argument("--longest-edge", type=int, help="cropped output size (default: session value or 1024)")
+    parser.add_argument("--prefix", default="", help="name outputs <prefix>_00001... instead of after the source")
+    parser.add_argument("--caption", default="", help="write this caption as a .txt next to every output")
+    parser.add_argument("--images", action="store_true", help="also export a still at each trim point")
+    parser.add_argument("--output", help="folder to create cropped/ and uncropped/ in (default: the source folder)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--dry-run", action="store_true", help="print the planned outputs and ffmpeg commands only")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.source):
+        folder = os.path.abspath(args.source)
+        clips = clips_from_folder(folder, args.session, args.all, args)
+    else:
+        try:
+            folder, clips = load_job_file(args.source)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: could not read job file {args.source}: {e}")
+            return 2
+    output_root = os.path.abspath(args.output or folder)
+    if not clips:
+        print("Nothing to export (no checked clips; use --all to export the whole folder).")
+        return 0
+
+    sweep_partials(os.path.join(output_root, "cropped"), os.path.join(output_root, "uncropped"))
+    reserved = set()
+    plans = []
+    for clip in clips:
+        if not os.path.exists(clip.video_path):
+            print(f"Skipping {clip.display_name}: file not found")
+            continue
+        orig_w, orig_h, fps = probe_clip(clip.video_path)
+        if not orig_w or not orig_h:
+            print(f"Skipping {clip.display_name}: could not open video")
+            continue
+        plans.append(build_export_plan(clip, output_root, orig_w, orig_h, fps, reserved))
+
+    if args.dry_run:
+        for plan in plans:
+            print(plan.clip.display_name)
+            for path in plan.outputs():
+                print(f"  -> {path}")
+            for step in plan.steps:
+                print(f"     {' '.join(step.cmd)}")
+        return 0
+
+    print(f"Exporting {len(plans)} clip(s) with {args.workers} worker(s) to {output_root}")
+    try:
+        failures = BatchExporter(args.workers).run(plans, output_root)
+    except KeyboardInterrupt:
+        return 130
+    for name, message in failures:
+        print(f"FAILED {name}: {message}")
+    print(f"Done: {len(plans) - len(failures)} exported, {len(failures)} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""Headless playback and seek benchmark.
+
+Generates test clips with ffmpeg (varied codec, resolution and GOP), opens the
+real VideoCropper window on the offscreen Qt platform and drives its
+VideoEditor through the operations used most: open + first frame, step ±1,
+jump ±trim_length (113), random scrubs and sustained playback. Latencies are
+recorded through perf_trace, so the report also breaks each clip down into
+decode / seek / convert / scale / paint.
+
+    python -m scripts.benchmark_playback [--clips bench_clips] [--out benchmark_playback.json]
+                                         [--only h264] [--iterations 60] [--play-seconds 5]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+
+# Must be set before the first QApplication is created
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name, encoder, width, height, GOP (keyframe interval), container
+CLIP_SPECS = (
+    ("h264_720p_gop250", "libx264", 1280, 720, 250, "mp4"),
+    ("h264_1080p_gop30", "libx264", 1920, 1080, 30, "mp4"),
+    ("h264_1080p_intra", "libx264", 1920, 1080, 1, "mp4"),
+    ("hevc_1080p_gop250", "libx265", 1920, 1080, 250, "mp4"),
+    ("vp9_720p_gop120", "libvpx-vp9", 1280, 720, 120, "webm"),
+    ("mpeg4_480p_gop12", "mpeg4", 854, 480, 12, "avi"),
+)
+CLIP_FPS = 30
+CLIP_SECONDS = 20
+WINDOW_SIZE = (1280, 800)
+
+
+def available_encoders():
+    try:
+        result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return set()
+    return {line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1 and line.startswith(" ")}
+
+
+def generate_clips(clip_dir, only=None):
+    """Create any missing test clips in clip_dir; return [(name, path)] of the usable ones."""
+    os.makedirs(clip_dir, exist_ok=True)
+    encoders = available_encoders()
+    if not encoders:
+        print("Error: ffmpeg not found on PATH.")
+        return []
+    clips = []
+    for name, encoder, width, height, gop, container in CLIP_SPECS:
+        if only and only not in name:
+            continue
+        path = os.path.join(clip_dir, f"{name}.{container}")
+        if not os.path.exists(path):
+            if encoder not in encoders:
+                print(f"Skipping {name}: ffmpeg has no {encoder} encoder")
+                continue
+            print(f"Generating {name}...")
+            cmd = [
+                "ffmpeg", "-y", "-v", "error",
+                "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={CLIP_FPS}:duration={CLIP_SECONDS}",
+                "-c:v", encoder, "-g", str(gop), "-pix_fmt", "yuv420p",
+            ]
+            if encoder == "libx265":
+                cmd += ["-x265-params", f"keyint={gop}:min-keyint={gop}:log-level=error"]
+            elif encoder == "libvpx-vp9":
+                cmd += ["-b:v", "2M", "-deadline", "realtime", "-cpu-used", "8"]
+            tmp = path + ".partial." + container
+            completed = subprocess.run(cmd + [tmp], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            if completed.returncode != 0:
+                print(f"Error generating {name}: {completed.stderr.strip()}")
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                continue
+            os.replace(tmp, path)
+        clips.append((name, path))
+    return clips
+
+
+class PlaybackBenchmark:
+    """Drives one VideoCropper's editor through the benchmark operations for each clip."""
+
+    def __init__(self, app, window, iterations, play_seconds, seed=113):
+        self.app = app
+        self.window = window
+        self.editor = window.editor
+        self.iterations = iterations
+        self.play_seconds = play_seconds
+        self.rng = random.Random(seed)
+
+    def _timed(self, op, func, *args):
+        # processEvents lets the offscreen paint happen inside the measurement
+        from scripts import perf_trace
+        start = time.perf_counter_ns()
+        func(*args)
+        self.app.processEvents()
+        perf_trace.record(f"bench.{op}", start, time.perf_counter_ns())
+
+    def _open(self, path):
+        import cv2
+        from scripts import perf_trace
+        start = time.perf_counter_ns()
+        cap = cv2.VideoCapture(path)
+        opened = cap.isOpened()
+        int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        perf_trace.record("bench.open", start, time.perf_counter_ns())
+        cap.release()
+        return opened
+
+    def _load(self, name, path):
+        self.editor.stop_playback()
+        self.window.current_video = name
+        self.window.crop_regions[name] = None
+        self._timed("first_frame", self.editor.load_video, {"original_path": path, "display_name": name})
+
+    def _seek_to(self, frame):
+        self.editor.scrub_video(frame)
+        self.window.slider.setValue(frame)
+        self.app.processEvents()
+
+    def _steps(self, op, step):
+        last = self.window.frame_count - 1
+        for _ in range(self.iterations):
+            # Start far enough from either end that the move is never clamped away
+            self._seek_to(self.rng.randint(abs(step), max(abs(step), last - abs(step))))
+            self._timed(op, self.editor.move_trim, step)
+
+    def _playback(self):
+        from PyQt6.QtCore import QEventLoop, QTimer
+        from scripts import perf_trace
+        self._seek_to(0)
+        decoded = perf_trace.stats("decode")
+        before = decoded.count if decoded is not None else 0
+        dropped_before = perf_trace.counter("play.dropped")
+        self.window.is_playing = True
+        start = time.perf_counter()
+        self.editor.play_forward()
+        loop = QEventLoop()
+        QTimer.singleShot(int(self.play_seconds * 1000), loop.quit)
+        loop.exec()
+        elapsed = time.perf_counter() - start
+        self.editor.stop_playback()
+        frames = perf_trace.stats("decode").count - before if perf_trace.stats("decode") else 0
+        return {
+            "seconds": round(elapsed, 3),
+            "frames": frames,
+            "fps": round(frames / elapsed, 2) if elapsed else 0.0,
+            "target_fps": round(self.window.video_fps, 2),
+            "dropped": perf_trace.counter("play.dropped") - dropped_before,
+        }
+
+    def run_clip(self, name, path):
+        from scripts import perf_trace
+        perf_trace.reset()
+        for _ in range(max(1, self.iterations // 10)):
+            if not self._open(path):
+                return {"error": "could not open"}
+        self._load(name, path)
+        if not self.window.frame_count:
+            return {"error": "no frames"}
+        for _ in range(max(1, self.iterations // 10) - 1):
+            self._load(name, path)
+        self._steps("step+1", 1)
+        self._steps("step-1", -1)
+        jump = self.window.trim_length
+        self._steps(f"jump+{jump}", jump)
+        self._steps(f"jump-{jump}", -jump)
+        last = self.window.frame_count - 1
+        for _ in range(self.iterations):
+            self._timed("scrub", self.editor.scrub_video, self.rng.randint(0, last))
+        playback = self._playback()
+        spans = perf_trace.summary()
+        return {
+            "frames": self.window.frame_count,
+            "resolution": f"{self.window.original_width}x{self.window.original_height}",
+            "operations": {key[len("bench."):]: value for key, value in spans.items() if key.startswith("bench.")},
+            "pipeline": {key: value for key, value in spans.items() if not key.startswith("bench.")},
+            "playback": playback,
+        }
+
+
+def print_report(results):
+    for name, result in results.items():
+        if "error" in result:
+            print(f"\n{name}: {result['error']}")
+            continue
+        print(f"\n{name} ({result['resolution']}, {result['frames']} frames)")
+        for op, s in result["operations"].items():
+            print(f"  {op:<12} p50 {s['p50_ms']:8.2f} ms  p95 {s['p95_ms']:8.2f} ms  p99 {s['p99_ms']:8.2f} ms  (n={s['count']})")
+        p = result["playback"]
+        print(f"  {'playback':<12} {p['fps']:.1f} / {p['target_fps']:.1f} fps, {p['dropped']} dropped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", default=os.path.join(ROOT, "bench_clips"), help="where test clips are generated and reused")
+    parser.add_argument("--out", default="benchmark_playback.json")
+    parser.add_argument("--only", help="run only clips whose name contains this")
+    parser.add_argument("--iterations", type=int, default=60, help="samples per operation (percentiles cover the last 256)")
+    parser.add_argument("--play-seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=113)
+    args = parser.parse_args(argv)
+
+    clip_dir = os.path.abspath(args.clips)
+    out_path = os.path.abspath(args.out)
+    clips = generate_clips(clip_dir, args.only)
+    if not clips:
+        print("No clips to benchmark.")
+        return 1
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    from PyQt6.QtWidgets import QApplication
+    from scripts import perf_trace
+    from scripts.video_cropper import VideoCropper
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    perf_trace.set_enabled(True)
+    # Run the window in a scratch directory so the user's session, folder
+    # settings and caches are neither read nor written; its folder is the clips.
+    work_dir = tempfile.mkdtemp(prefix="sharkbit_bench_")
+    previous_cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        with open("folder_settings.json", "w") as f:
+            json.dump({"default_video_folder": clip_dir}, f)
+        window = VideoCropper()
+        window.resize(*WINDOW_SIZE)
+        window.show()
+        app.processEvents()
+        window.auto_play_on_change = False
+        window.auto_advance_enabled = False
+        bench = PlaybackBenchmark(app, window, args.iterations, args.play_seconds, args.seed)
+        results = {}
+        for name, path in clips:
+            print(f"Benchmarking {name}...")
+            results[name] = bench.run_clip(name, path)
+        window.close()
+    finally:
+        os.chdir(previous_cwd)
+
+    import cv2
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        "iterations": args.iterations,
+        "window": list(WINDOW_SIZE),
+        "clips": results,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(results)
+    print(f"\nWrote {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Cold-start import check.
+
+Imports main.py's startup modules in a fresh interpreter under ``-X importtime``
+and fails if their cumulative import time exceeds a budget, or if a heavy
+optional module that should load on first use was imported at startup.
+
+    python -m scripts.check_import_time [--budget-ms 1500] [--top 15]
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+# What main.py imports before the window is constructed
+STARTUP_IMPORTS = "import scripts.video_cropper, scripts.video_list_view"
+# Loaded only when their feature is first used
+LAZY_MODULES = ("torch", "librosa", "pyqtgraph", "yt_dlp", "numba", "pynvml", "cpuinfo")
+DEFAULT_BUDGET_MS = 1500
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(statement=STARTUP_IMPORTS):
+    """Return [(module, self_us, cumulative_us, depth)] for statement in a fresh interpreter."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="heaviest top-level imports to list")
+    args = parser.parse_args(argv)
+
+    try:
+        rows = measure()
+    except RuntimeError as e:
+        print(f"Import failed: {e}")
+        return 2
+    # Drop what the interpreter imports on its own (site, encodings, ...)
+    baseline = {r[0] for r in measure("pass") if r[3] == 0}
+    top_level = [r for r in rows if r[3] == 0 and r[0] not in baseline]
+    total_ms = sum(r[2] for r in top_level) / 1000
+    print(f"Startup imports: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for module, _, cumulative_us, _ in sorted(top_level, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+    failed = False
+    imported = {r[0].split(".")[0] for r in rows}
+    eager = [m for m in LAZY_MODULES if m in imported]
+    if eager:
+        print(f"FAIL: imported at startup but should load on first use: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: startup imports over budget by {total_ms - args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
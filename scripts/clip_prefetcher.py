@@ -0,0 +1,115 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+
+class PrefetchedClip:
+    """An opened capture positioned just after its decoded first frame, plus the
+    properties load_video would otherwise probe on the GUI thread."""
+
+    def __init__(self, path, cap, frame, frame_count, width, height, fps, file_size):
+        self.path = path
+        self.cap = cap
+        self.frame = frame
+        self.frame_count = frame_count
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.file_size = file_size
+
+    def release(self):
+        try:
+            self.cap.release()
+        except Exception:
+            pass
+
+
+def open_clip(path):
+    """Open path, probe it and decode frame 0. Returns a PrefetchedClip or None."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    ret, frame = cap.read()
+    if not ret or not width or not height:
+        cap.release()
+        return None
+    try:
+        file_size = os.path.getsize(path)
+    except OSError:
+        file_size = None
+    return PrefetchedClip(path, cap, frame, frame_count, width, height, fps, file_size)
+
+
+class ClipPrefetcher:
+    """Keeps the neighbours of the current file opened and decoded in the background.
+
+    prefetch() names the paths that should be warm; anything else is released.
+    take() hands a finished clip over to the caller, who then owns its capture.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._slots = {}  # path -> Future[PrefetchedClip | None]
+        self._lock = threading.Lock()
+
+    def prefetch(self, paths):
+        wanted = [p for p in dict.fromkeys(paths) if p]
+        with self._lock:
+            for path in list(self._slots):
+                if path not in wanted:
+                    self._discard(self._slots.pop(path))
+            for path in wanted:
+                if path not in self._slots:
+                    self._slots[path] = self._executor.submit(open_clip, path)
+
+    def take(self, path):
+        """Return the warmed clip for path if it is ready, else None (never blocks)."""
+        with self._lock:
+            future = self._slots.get(path)
+            if future is None or not future.done():
+                return None
+            del self._slots[path]
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Prefetch failed for {path}: {e}")
+            return None
+
+    def release(self, path):
+        """Drop (and close) any prefetched capture of path, e.g. before moving the file."""
+        with self._lock:
+            future = self._slots.pop(path, None)
+        if future is not None:
+            self._discard(future)
+            if not future.done():
+                # Deleting needs the handle closed now, not whenever the open finishes
+                try:
+                    future.result(timeout=5)
+                except Exception:
+                    pass
+
+    def release_all(self):
+        with self._lock:
+            futures = list(self._slots.values())
+            self._slots.clear()
+        for future in futures:
+            self._discard(future)
+
+    @staticmethod
+    def _discard(future):
+        def _close(f):
+            try:
+                clip = f.result()
+            except Exception:
+                return
+            if clip is not None:
+                clip.release()
+        # Runs immediately if done, otherwise when the open finishes
+        future.add_done_callback(_close)
@@ -2,6 +2,7 @@ from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
 from PyQt6.QtGui import QMouseEvent, QWheelEvent, QPainter, QPixmap, QImage
 from PyQt6.QtCore import Qt, QRectF
 import cv2
+from scripts import perf_trace
 
 class CustomGraphicsView(QGraphicsView):
     def __init__(self, parent=None):
@@ -74,6 +75,10 @@ class CustomGraphicsView(QGraphicsView):
             self.fitInView(self.scene.sceneRect(), self.aspect_ratio_mode)
         super().resizeEvent(event)
     
+    def paintEvent(self, event):
+        with perf_trace.span("paint"):
+            super().paintEvent(event)
+
     def clear(self):
         """Clear the display."""
         self.pixmap_item.setPixmap(QPixmap())
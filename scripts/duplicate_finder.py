@@ -0,0 +1,243 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import (
+    QDialog, QHBoxLayout, QLabel, QMessageBox, QPushButton, QTreeWidget, QTreeWidgetItem, QVBoxLayout
+)
+
+from scripts.folder_scanner import VIDEO_EXTENSIONS, iter_folder
+from scripts.perceptual_hash import SAMPLE_POINTS, BKTree, signature_distance, video_signature
+from scripts.search_index import PHASH_COLUMN, ensure_metadata, save_phashes
+
+HASH_WORKERS = 4        # decoding a handful of frames; cv2 releases the GIL
+SAVE_EVERY = 200        # hashes written back to the metadata store in chunks
+# Average differing bits per sampled frame (of 64) still counted as the same video
+DUPLICATE_BITS_PER_FRAME = 6
+TRASH_FOLDER = "trash_backup"
+
+
+def library_videos(roots):
+    """[(path, size, mtime)] for the videos below roots, skipping hidden and trash folders."""
+    files = []
+    seen = set()
+    for root in roots:
+        for folder, dirs, _ in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d != TRASH_FOLDER]
+            if folder in seen:
+                continue
+            seen.add(folder)
+            try:
+                files.extend((os.path.join(folder, name), row[0], row[1]) for name, row in iter_folder(folder)
+                             if name.lower().endswith(VIDEO_EXTENSIONS))
+            except OSError as e:
+                print(f"Error listing {folder}: {e}")
+    return files
+
+
+def _hash_video(path):
+    try:
+        signature = video_signature(path)
+    except Exception as e:
+        print(f"Error hashing {path}: {e}")
+        signature = None
+    # An empty list marks an undecodable file so it isn't retried on every scan
+    return [f"{h:016x}" for h in signature] if signature else []
+
+
+def find_duplicates(files, bits_per_frame=DUPLICATE_BITS_PER_FRAME, workers=HASH_WORKERS,
+                    progress=None, cancelled=None):
+    """Groups of likely duplicate videos among files [(path, size, mtime)].
+
+    Each group is a list of (path, metadata row), best copy first (largest
+    resolution, then largest file); every other copy is within the duplicate
+    radius of that first one. Signatures are computed only for files whose
+    metadata row has none yet and are saved back to the metadata store.
+    progress(phase, done, total) reports "probe" and "hash" phases.
+    """
+    probe_progress = (lambda done, total: progress("probe", done, total)) if progress is not None else None
+    rows = ensure_metadata(files, progress=probe_progress, cancelled=cancelled)
+    stats = {path: (size, mtime) for path, size, mtime in files}
+    missing = [path for path, row in rows.items() if len(row) <= PHASH_COLUMN]
+    if missing and not (cancelled is not None and cancelled()):
+        pending = {}
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_hash_video, path): path for path in missing}
+            for future in as_completed(futures):
+                path = futures[future]
+                hashes = future.result()
+                rows[path] = rows[path][:PHASH_COLUMN] + [hashes]
+                pending[path] = (*stats[path], hashes)
+                done += 1
+                if progress is not None:
+                    progress("hash", done, len(missing))
+                if len(pending) >= SAVE_EVERY:
+                    save_phashes(pending)
+                    pending = {}
+                if cancelled is not None and cancelled():
+                    for waiting in futures:
+                        waiting.cancel()
+                    break
+        if pending:
+            save_phashes(pending)
+
+    tree = BKTree(signature_distance)
+    signatures = {}
+    for path, row in rows.items():
+        hashes = row[PHASH_COLUMN] if len(row) > PHASH_COLUMN else None
+        if hashes and len(hashes) == len(SAMPLE_POINTS):
+            signatures[path] = tuple(int(h, 16) for h in hashes)
+            tree.add(signatures[path], path)
+
+    # Each group is a best copy and the files within the radius of it, so a chain
+    # of near neighbours (A~B~C with A and C far apart) never lands in one group.
+    def quality(path):
+        row = rows[path]
+        return -row[2] * row[3], -row[0], path.lower()
+
+    radius = bits_per_frame * len(SAMPLE_POINTS)
+    grouped = set()
+    result = []
+    for path in sorted(signatures, key=quality):
+        if path in grouped:
+            continue
+        copies = [other for _, other in tree.query(signatures[path], radius)
+                  if other != path and other not in grouped]
+        if not copies:
+            continue
+        grouped.add(path)
+        grouped.update(copies)
+        result.append([(p, rows[p]) for p in [path] + sorted(copies, key=quality)])
+    result.sort(key=lambda g: (-len(g), g[0][0].lower()))
+    return result
+
+
+class DuplicateFinder(QObject):
+    """Runs library_videos + find_duplicates on a worker thread.
+
+    progress carries (phase, done, total) with phase "list", "probe" or "hash";
+    finished carries the groups from find_duplicates.
+    """
+
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.busy = False
+        self.cancel_requested = False
+
+    def start(self, roots):
+        if self.busy:
+            return False
+        self.busy = True
+        self.cancel_requested = False
+        threading.Thread(target=self._run, args=(list(roots),), daemon=True).start()
+        return True
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def _run(self, roots):
+        try:
+            self.progress.emit("list", 0, 0)
+            files = library_videos(roots)
+            groups = find_duplicates(files, progress=self.progress.emit,
+                                     cancelled=lambda: self.cancel_requested)
+        except Exception as e:
+            self.busy = False
+            self.failed.emit(str(e))
+            return
+        self.busy = False
+        self.finished.emit(groups)
+
+
+def _describe(row):
+    size_mb = row[0] / (1024 * 1024)
+    return [f"{row[2]}x{row[3]}", f"{size_mb:.1f} MB", f"{row[4]:.1f}s", (row[5] or "?").upper()]
+
+
+class DuplicatesDialog(QDialog):
+    """Likely duplicate videos, one group per tree node.
+
+    Every copy but the first (largest resolution, then largest file) starts
+    checked; checked files are moved to the trash_backup folder next to them with
+    the main window's trash_files.
+    """
+
+    def __init__(self, main_app, groups, parent=None):
+        super().__init__(parent)
+        self.main_app = main_app
+        self.setWindowTitle("Duplicate Videos")
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["File", "Resolution", "Size", "Duration", "Codec", "Folder"])
+        self.tree.setRootIsDecorated(True)
+        layout.addWidget(self.tree, 1)
+        for i, group in enumerate(groups, 1):
+            group_item = QTreeWidgetItem(self.tree, [f"Group {i} ({len(group)} files)"])
+            group_item.setFlags(group_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
+            for j, (path, row) in enumerate(group):
+                item = QTreeWidgetItem(group_item, [os.path.basename(path), *_describe(row), os.path.dirname(path)])
+                item.setData(0, Qt.ItemDataRole.UserRole, path)
+                item.setToolTip(0, path)
+                item.setCheckState(0, Qt.CheckState.Unchecked if j == 0 else Qt.CheckState.Checked)
+            group_item.setExpanded(True)
+        for column in range(self.tree.columnCount()):
+            self.tree.resizeColumnToContents(column)
+
+        buttons = QHBoxLayout()
+        self.trash_button = QPushButton(f"Move checked to {TRASH_FOLDER}")
+        self.trash_button.clicked.connect(self.trash_checked)
+        buttons.addWidget(self.trash_button)
+        buttons.addStretch(1)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+        self._update_summary()
+        self.resize(1000, 600)
+
+    def _file_items(self):
+        for i in range(self.tree.topLevelItemCount()):
+            group_item = self.tree.topLevelItem(i)
+            for j in range(group_item.childCount()):
+                yield group_item, group_item.child(j)
+
+    def _update_summary(self):
+        groups = self.tree.topLevelItemCount()
+        files = sum(1 for _ in self._file_items())
+        self.summary_label.setText(f"{groups} group(s) of likely duplicates, {files} files."
+                                   if groups else "No duplicates found.")
+        self.trash_button.setEnabled(groups > 0)
+
+    def trash_checked(self):
+        checked = [(group_item, item) for group_item, item in self._file_items()
+                   if item.checkState(0) == Qt.CheckState.Checked]
+        if not checked:
+            return
+        reply = QMessageBox.question(
+            self, "Move to Trash",
+            f"Move {len(checked)} file(s) to their {TRASH_FOLDER} folders?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        moves = []
+        for group_item, item in checked:
+            path = item.data(0, Qt.ItemDataRole.UserRole)
+            moves.append((path, os.path.join(os.path.dirname(path), TRASH_FOLDER)))
+            group_item.removeChild(item)
+        # Moved in the background and journaled, so Ctrl+Z in the main window undoes this batch
+        self.main_app.trash_files(moves)
+        for i in reversed(range(self.tree.topLevelItemCount())):
+            if self.tree.topLevelItem(i).childCount() < 2:
+                self.tree.takeTopLevelItem(i)
+        self._update_summary()
@@ -0,0 +1,251 @@
+import os
+import json
+import cv2
+import ffmpeg
+
+from scripts.export_jobs import EncodeStep, container_format_for, partial_path_for, write_bytes_atomic
+
+JOB_VERSION = 1
+
+# Export logic shared by the GUI (VideoExporter) and the batch CLI (batch_export):
+# everything here takes plain values, nothing reads widgets.
+
+
+def compute_crop_filter(crop, orig_w, orig_h, longest_edge):
+    """Return (crop_scale_filter, out_w, out_h) exactly as export_videos encodes it,
+    or None when the crop region is empty after clamping to the frame.
+    The crop is clamped and rounded down to even dimensions, and the scale target
+    is longest_edge rounded down to even (ffmpeg's scale=W:-2 keeps the height even).
+    """
+    x, y, w, h = crop
+    x = max(0, x)
+    y = max(0, y)
+    w = min(w, orig_w - x)
+    h = min(h, orig_h - y)
+    if w <= 0 or h <= 0:
+        return None
+    edge = longest_edge - (longest_edge % 2)
+    if h % 2 != 0:
+        h -= 1
+    if w % 2 != 0:
+        w -= 1
+    if w <= 0 or h <= 0:
+        return None
+    # Mirrors ffmpeg's av_rescale rounding for scale=W:-2
+    out_h = ((h * edge + w) // (2 * w)) * 2
+    return f"crop={w}:{h}:{x}:{y},scale={edge}:-2", edge, out_h
+
+
+def trim_filter(trim_length):
+    return f'trim=start_frame=0:end_frame={trim_length},setpts=PTS-STARTPTS'
+
+
+def _taken(path, reserved):
+    # A .partial file is an encode in progress whose final name doesn't exist yet
+    return path in reserved or os.path.exists(path) or os.path.exists(partial_path_for(path))
+
+
+def get_unique_filename(file_path, reserved=()):
+    """file_path, or file_path with _1, _2, ... appended if it exists, is being
+    encoded (<path>.partial exists) or is in reserved."""
+    base, ext = os.path.splitext(file_path)
+    counter = 1
+    unique_file = file_path
+    while _taken(unique_file, reserved):
+        unique_file = f"{base}_{counter}{ext}"
+        counter += 1
+    return unique_file
+
+
+def write_caption_file(output_file, caption):
+    """Write caption next to output_file as <base>.txt (nothing for an empty caption)."""
+    caption = (caption or "").strip()
+    if caption:
+        base, _ = os.path.splitext(output_file)
+        txt_file = base + ".txt"
+        with open(txt_file, "w") as f:
+            f.write(caption)
+        print(f"Exported caption for {output_file} to {txt_file}")
+
+
+def write_image(image_path, frame):
+    """Encode a frame in memory and write it atomically via a .partial file."""
+    ext = os.path.splitext(image_path)[1] or ".png"
+    ok, buf = cv2.imencode(ext, frame)
+    if not ok:
+        print(f"Could not encode image for {image_path}")
+        return False
+    return write_bytes_atomic(image_path, buf.tobytes())
+
+
+def probe_clip(video_path):
+    """(width, height, fps) of video_path as OpenCV reports them."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                cap.get(cv2.CAP_PROP_FPS))
+    finally:
+        cap.release()
+
+
+class ClipExport:
+    """Everything one clip's export depends on: the source, its saved crop and trim point,
+    and the export options from the left panel."""
+
+    def __init__(self, video_path, display_name, crop=None, trim_start=0, trim_length=113,
+                 longest_edge=1024, prefix="", export_image=False, caption=""):
+        self.video_path = video_path
+        self.display_name = display_name
+        self.crop = tuple(crop) if crop else None
+        self.trim_start = int(trim_start or 0)
+        self.trim_length = int(trim_length)
+        self.longest_edge = int(longest_edge)
+        self.prefix = (prefix or "").strip()
+        self.export_image = bool(export_image)
+        self.caption = caption or ""
+
+
+class ExportPlan:
+    """Output paths and ffmpeg steps for one ClipExport, decided before anything is written."""
+
+    def __init__(self, clip, fps):
+        self.clip = clip
+        self.fps = fps
+        self.images = []        # (path, crop or None for the full frame)
+        self.steps = []         # EncodeSteps, run in order
+        self.cleanup = []       # intermediates removed once all steps succeeded
+        self.temp_paths = set() # step outputs that are intermediates (no caption)
+
+    def outputs(self):
+        return [p for p, _ in self.images] + [s.final_path for s in self.steps if s.final_path not in self.temp_paths]
+
+
+def build_export_plan(clip, folder_path, orig_w, orig_h, fps, reserved=None):
+    """Plan clip's export into folder_path/cropped and folder_path/uncropped.
+
+    Names follow export_videos: <name>[_cropped].<ext>, or <prefix>_<nnnnn>... with a
+    prefix. Paths are made unique against the disk and against reserved, which is
+    updated, so plans built one after another for a batch never collide.
+    """
+    reserved = reserved if reserved is not None else set()
+    fps = fps if fps and fps > 0 else 30
+    output_folder = os.path.join(folder_path, "cropped")
+    uncropped_folder = os.path.join(folder_path, "uncropped")
+    plan = ExportPlan(clip, fps)
+    counter = 0
+
+    def claim(path):
+        path = get_unique_filename(path, reserved)
+        reserved.add(path)
+        return path
+
+    def numbered(suffix):
+        nonlocal counter
+        counter += 1
+        return f"{clip.prefix}_{counter:05d}{suffix}"
+
+    # Library and search entries are named by a path; outputs use the file name only
+    base_name, ext = os.path.splitext(os.path.basename(clip.display_name))
+    crop = clip.crop
+    if clip.export_image:
+        if crop:
+            x, y, w, h = crop
+            if x >= 0 and y >= 0 and w > 0 and h > 0 and (x + w) <= orig_w and (y + h) <= orig_h:
+                name = numbered("_cropped.png") if clip.prefix else f"{base_name}_cropped.png"
+                plan.images.append((claim(os.path.join(output_folder, name)), crop))
+        name = numbered(".png") if clip.prefix else f"{base_name}.png"
+        plan.images.append((claim(os.path.join(uncropped_folder, name)), None))
+
+    # Trimmed uncropped version first (written to a .partial file by the worker)
+    name = numbered(ext) if clip.prefix else f"{base_name}{ext}"
+    uncropped_path = claim(os.path.join(uncropped_folder, name))
+    seek_time = clip.trim_start / fps
+    duration = clip.trim_length / fps
+    uncropped_cmd = (
+        ffmpeg.input(clip.video_path, ss=seek_time)
+        .output(partial_path_for(uncropped_path),
+                vf=trim_filter(clip.trim_length),
+                af='aresample=async=1',  # Fix audio sync
+                t=duration,  # Set duration in seconds
+                map_metadata='-1',
+                f=container_format_for(uncropped_path))
+        .overwrite_output()
+        .compile()
+    )
+    plan.steps.append(EncodeStep(uncropped_cmd, uncropped_path))
+
+    # The cropped version uses the trimmed uncropped clip as its source
+    crop_filter = compute_crop_filter(crop, orig_w, orig_h, clip.longest_edge) if crop else None
+    if crop_filter:
+        vf, _, _ = crop_filter
+        name = numbered(f"_cropped{ext}") if clip.prefix else f"{base_name}_cropped{ext}"
+        output_path = claim(os.path.join(output_folder, name))
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", uncropped_path,
+            "-vf", vf,
+            "-c:a", "aac",  # Use AAC audio codec
+            "-map", "0:v:0",  # Map first video stream
+            "-map", "0:a?",  # Map audio if present
+            "-map_metadata", "-1",
+            "-f", container_format_for(output_path),
+            partial_path_for(output_path)
+        ]
+        plan.steps.append(EncodeStep(cmd, output_path))
+        # The trimmed uncropped clip is only an intermediate source for the crop;
+        # it is removed once the cropped encode has been finalized.
+        plan.cleanup.append(uncropped_path)
+        plan.temp_paths.add(uncropped_path)
+    return plan
+
+
+def export_images(plan, cancelled=None):
+    """Write the plan's stills from the frame at the trim point. Returns False if cancelled."""
+    if not plan.images:
+        return True
+    cap = cv2.VideoCapture(plan.clip.video_path)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, plan.clip.trim_start)
+        ret, frame = cap.read()
+    finally:
+        cap.release()
+    if not ret:
+        return True
+    for image_path, crop in plan.images:
+        if crop:
+            x, y, w, h = crop
+            image = frame[y:y+h, x:x+w]
+            if image.size == 0:
+                continue
+        else:
+            image = frame
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        if write_image(image_path, image):
+            kind = "cropped" if crop else "uncropped"
+            print(f"Exported {kind} image for {plan.clip.display_name} to {image_path}")
+            write_caption_file(image_path, plan.clip.caption)
+        if cancelled is not None and cancelled():
+            return False
+    return True
+
+
+def save_job_file(path, folder_path, clips):
+    """Write clips (ClipExports) as a job file batch_export can run without the GUI."""
+    job = {
+        "version": JOB_VERSION,
+        "folder": folder_path,
+        "clips": [dict(vars(clip), crop=list(clip.crop) if clip.crop else None) for clip in clips],
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_job_file(path):
+    """(folder_path, [ClipExport]) from a job file written by save_job_file."""
+    with open(path, "r", encoding="utf-8") as f:
+        job = json.load(f)
+    if job.get("version") != JOB_VERSION:
+        raise ValueError(f"unsupported job file version {job.get('version')!r}")
+    return job["folder"], [ClipExport(**clip) for clip in job["clips"]]
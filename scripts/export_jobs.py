@@ -0,0 +1,230 @@
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from scripts import perf_trace
+
+# Every encode is written to "<final>.partial" first and only renamed into place
+# once ffmpeg exits cleanly, so a crash or cancel never leaves a truncated clip
+# with a real media extension in cropped/ or uncropped/.
+PARTIAL_SUFFIX = ".partial"
+
+# ffmpeg can no longer guess the muxer from a ".partial" name, so map it explicitly.
+_CONTAINER_FORMATS = {
+    ".mp4": "mp4",
+    ".m4v": "mp4",
+    ".mov": "mov",
+    ".mkv": "matroska",
+    ".webm": "webm",
+    ".avi": "avi",
+    ".wmv": "asf",
+    ".mp3": "mp3",
+    ".m4a": "ipod",
+    ".aac": "adts",
+    ".wav": "wav",
+    ".flac": "flac",
+    ".ogg": "ogg",
+}
+
+
+def partial_path_for(final_path):
+    """Return the temporary path an encode for final_path is written to."""
+    return final_path + PARTIAL_SUFFIX
+
+
+def container_format_for(path):
+    """Return the ffmpeg muxer name for the extension of path (ignoring .partial)."""
+    if path.endswith(PARTIAL_SUFFIX):
+        path = path[:-len(PARTIAL_SUFFIX)]
+    ext = os.path.splitext(path)[1].lower()
+    return _CONTAINER_FORMATS.get(ext, ext.lstrip(".") or "mp4")
+
+
+def _fsync_file(path):
+    with open(path, "rb+") as f:
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(folder):
+    # Directory fsync makes the rename durable on POSIX; Windows has no equivalent.
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def finalize_partial(partial_path, final_path):
+    """fsync the finished partial file and atomically rename it to final_path."""
+    _fsync_file(partial_path)
+    os.replace(partial_path, final_path)
+    _fsync_dir(os.path.dirname(os.path.abspath(final_path)))
+    return final_path
+
+
+def discard_partial(partial_path):
+    try:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    except OSError as e:
+        print(f"Could not remove partial file {partial_path}: {e}")
+
+
+def write_bytes_atomic(final_path, data):
+    """Write an already-encoded buffer (e.g. a PNG) via a partial file and rename."""
+    partial = partial_path_for(final_path)
+    try:
+        with open(partial, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, final_path)
+        return True
+    except Exception as e:
+        print(f"Error writing {final_path}: {e}")
+        discard_partial(partial)
+        return False
+
+
+def sweep_partials(*folders):
+    """Remove orphaned .partial files left behind by a crash or cancel.
+    Returns the list of removed paths.
+    """
+    removed = []
+    for folder in folders:
+        if not folder or not os.path.isdir(folder):
+            continue
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(PARTIAL_SUFFIX):
+                        try:
+                            os.remove(entry.path)
+                            removed.append(entry.path)
+                        except OSError as e:
+                            print(f"Could not remove orphaned partial {entry.path}: {e}")
+        except OSError as e:
+            print(f"Error sweeping {folder}: {e}")
+    if removed:
+        print(f"Removed {len(removed)} orphaned partial export(s)")
+    return removed
+
+
+class EncodeStep:
+    """One ffmpeg invocation writing to partial_path, renamed to final_path on success."""
+
+    def __init__(self, cmd, final_path, label=""):
+        self.cmd = cmd
+        self.final_path = final_path
+        self.partial_path = partial_path_for(final_path)
+        self.label = label or os.path.basename(final_path)
+
+
+def run_encode_step(step, on_start=None, cancelled=None):
+    """Run one EncodeStep's ffmpeg command and rename its partial file into place.
+
+    on_start(process) receives the Popen so the caller can terminate it;
+    cancelled() is checked once ffmpeg exits. Returns (ok, error message).
+    """
+    print("Running FFmpeg command:", step.cmd)
+    try:
+        with perf_trace.span("export.step"):
+            process = subprocess.Popen(
+                step.cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+            )
+            if on_start is not None:
+                on_start(process)
+            _, stderr = process.communicate()
+        returncode = process.returncode
+    except FileNotFoundError:
+        discard_partial(step.partial_path)
+        return False, "ffmpeg not found. Please install ffmpeg and ensure it's in PATH."
+    was_cancelled = cancelled is not None and cancelled()
+    if returncode != 0 or was_cancelled:
+        discard_partial(step.partial_path)
+        if was_cancelled:
+            return False, "Export cancelled"
+        last = stderr.strip().splitlines()[-1] if stderr and stderr.strip() else f"code {returncode}"
+        return False, f"Export failed: {last}"
+    try:
+        finalize_partial(step.partial_path, step.final_path)
+    except OSError as e:
+        discard_partial(step.partial_path)
+        return False, f"Export failed: could not finalize {step.final_path}: {e}"
+    return True, ""
+
+
+def remove_temp_files(paths):
+    """Remove a finished job's intermediates (e.g. the trimmed source of a crop)."""
+    for path in paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"Cleaned up temporary file: {path}")
+        except OSError as e:
+            print(f"Could not remove temporary file {path}: {e}")
+
+
+class ExportJobRunner(QObject):
+    """Runs export jobs (a sequence of EncodeSteps) off the GUI thread.
+
+    Steps of a job run in order; a failed step aborts the rest of the job.
+    Paths listed in cleanup are removed by the worker after the job succeeds.
+    Each job remembers the generation it was submitted in; cancel() starts a new
+    generation, which cancels the running job and every job still queued while
+    later submits run normally.
+    """
+
+    status_changed = pyqtSignal(str)
+    step_finished = pyqtSignal(str)        # final path of a completed step
+    job_finished = pyqtSignal(bool, str)   # success, message
+
+    def __init__(self, max_workers=1):
+        super().__init__()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._process = None
+        self._generation = 0
+
+    def submit(self, steps, cleanup=()):
+        return self._executor.submit(self._run_job, self._generation, list(steps), list(cleanup))
+
+    def cancel(self):
+        self._generation += 1
+        proc = self._process
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+
+    def _run_job(self, generation, steps, cleanup):
+        cancelled = lambda: generation != self._generation
+        for step in steps:
+            if cancelled():
+                self.job_finished.emit(False, "Export cancelled")
+                return False
+            self.status_changed.emit(f"Encoding {step.label}...")
+            ok, error = self._run_step(step, cancelled)
+            if not ok:
+                self.job_finished.emit(False, error)
+                return False
+            self.step_finished.emit(step.final_path)
+        remove_temp_files(cleanup)
+        self.job_finished.emit(True, "Export completed successfully")
+        return True
+
+    def _run_step(self, step, cancelled):
+        try:
+            return run_encode_step(step, on_start=self._set_process, cancelled=cancelled)
+        finally:
+            self._process = None
+
+    def _set_process(self, process):
+        self._process = process
@@ -0,0 +1,176 @@
+import os
+import subprocess
+import threading
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal, Qt, QTimer
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel
+
+from scripts.export_core import compute_crop_filter, trim_filter
+
+
+def build_preview_plan(video_path, orig_w, orig_h, fps, trim_start, trim_length, crop, longest_edge):
+    """Describe the filter graph and output size an export of these settings would use.
+    Returns a dict; 'filter' is the exact trim (+ crop/scale) chain export_videos encodes.
+    """
+    vf = trim_filter(trim_length)
+    out_w, out_h = orig_w, orig_h
+    cropped = False
+    if crop:
+        crop_filter = compute_crop_filter(crop, orig_w, orig_h, longest_edge)
+        if crop_filter:
+            crop_vf, out_w, out_h = crop_filter
+            vf = f"{vf},{crop_vf}"
+            cropped = True
+    fps = fps if fps and fps > 0 else 30
+    return {
+        "video_path": video_path,
+        "seek_time": trim_start / fps,
+        "fps": fps,
+        "trim_length": trim_length,
+        "filter": vf,
+        "width": out_w,
+        "height": out_h,
+        "cropped": cropped,
+    }
+
+
+def render_preview_frames(plan, max_frames):
+    """Run the plan's filter graph through an ffmpeg rawvideo pipe and return RGB frames."""
+    w, h = plan["width"], plan["height"]
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-ss", str(plan["seek_time"]),
+        "-i", plan["video_path"],
+        "-vf", plan["filter"],
+        "-frames:v", str(max_frames),
+        "-an",
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "pipe:1",
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        err = result.stderr.decode(errors="ignore").strip().splitlines()
+        raise RuntimeError(err[-1] if err else f"ffmpeg exited with {result.returncode}")
+    frame_size = w * h * 3
+    count = len(result.stdout) // frame_size if frame_size else 0
+    if count == 0:
+        raise RuntimeError("ffmpeg produced no frames for this filter graph")
+    data = np.frombuffer(result.stdout, dtype=np.uint8, count=count * frame_size)
+    return list(data.reshape(count, h, w, 3))
+
+
+def measure_encoded_bytes(plan, max_frames):
+    """Encode the same frames with the export's default video encoder into memory
+    and return the number of bytes produced (nothing is written to disk)."""
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-ss", str(plan["seek_time"]),
+        "-i", plan["video_path"],
+        "-vf", plan["filter"],
+        "-frames:v", str(max_frames),
+        "-an",
+        "-c:v", "libx264",
+        "-f", "h264",
+        "pipe:1",
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if result.returncode != 0:
+        return None
+    return len(result.stdout)
+
+
+class ExportPreviewer(QObject):
+    """Renders the first second of an export's crop/scale pipeline in a background thread."""
+
+    preview_ready = pyqtSignal(dict)
+    preview_failed = pyqtSignal(str)
+
+    def __init__(self, max_seconds=1.0):
+        super().__init__()
+        self.max_seconds = max_seconds
+
+    def preview_async(self, plan):
+        thread = threading.Thread(target=self._run, args=(plan,), daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self, plan):
+        try:
+            n = max(1, min(plan["trim_length"], int(round(plan["fps"] * self.max_seconds))))
+            frames = render_preview_frames(plan, n)
+            encoded = measure_encoded_bytes(plan, len(frames))
+            result = dict(plan)
+            result["frames"] = frames
+            if encoded:
+                # Extrapolate from the previewed frames to the full trim length.
+                # The first frames include a keyframe, so this errs on the high side.
+                result["projected_bytes"] = int(encoded * plan["trim_length"] / len(frames))
+            else:
+                result["projected_bytes"] = None
+            self.preview_ready.emit(result)
+        except FileNotFoundError:
+            self.preview_failed.emit("ffmpeg not found. Please install ffmpeg and ensure it's in PATH.")
+        except Exception as e:
+            self.preview_failed.emit(f"Preview failed: {e}")
+
+
+class ExportPreviewDialog(QDialog):
+    """Loops the previewed frames at the clip's frame rate with the final output size."""
+
+    def __init__(self, parent, result):
+        super().__init__(parent)
+        self.setWindowTitle(f"Export Preview - {os.path.basename(result['video_path'])}")
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint)
+        self._frames = result["frames"]
+        self._index = 0
+
+        layout = QVBoxLayout(self)
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label.setMinimumSize(320, 180)
+        layout.addWidget(self.image_label, 1)
+
+        size = result.get("projected_bytes")
+        size_str = f"~{size / (1024 * 1024):.2f} MB (video)" if size else "N/A"
+        kind = "Cropped" if result["cropped"] else "Uncropped"
+        self.info_label = QLabel(
+            f"<b>{kind} output:</b> {result['width']}x{result['height']} &nbsp; "
+            f"<b>Frames:</b> {result['trim_length']} &nbsp; "
+            f"<b>Projected size:</b> {size_str}<br>"
+            f"<small>{result['filter']}</small>"
+        )
+        self.info_label.setWordWrap(True)
+        layout.addWidget(self.info_label)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._next_frame)
+        self.timer.start(max(5, int(1000 / result["fps"])))
+        self._show_frame(0)
+        self.resize(min(1200, max(480, result["width"] + 40)), min(900, max(360, result["height"] + 100)))
+
+    def _show_frame(self, index):
+        frame = self._frames[index]
+        h, w, ch = frame.shape
+        q_img = QImage(frame.data, w, h, ch * w, QImage.Format.Format_RGB888)
+        pixmap = QPixmap.fromImage(q_img)
+        target = self.image_label.size()
+        self.image_label.setPixmap(pixmap.scaled(
+            target.width(), target.height(),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        ))
+
+    def _next_frame(self):
+        self._index = (self._index + 1) % len(self._frames)
+        self._show_frame(self._index)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Escape, Qt.Key.Key_B):
+            self.close()
+            return
+        super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
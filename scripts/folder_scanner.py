@@ -0,0 +1,162 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.wmv')
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg')
+MEDIA_EXTENSIONS = VIDEO_EXTENSIONS + AUDIO_EXTENSIONS
+
+# Per-folder indexes live outside the media folders: writing a file into the
+# folder would itself change the directory mtime the index is validated against.
+INDEX_DIR = ".folder_index"
+INDEX_VERSION = 1
+
+
+def _index_path(folder):
+    key = hashlib.md5(os.path.normcase(os.path.abspath(folder)).encode()).hexdigest()
+    return os.path.join(INDEX_DIR, f"{key}.json")
+
+
+def load_folder_index(folder):
+    """Return the saved index for folder as {"dir_mtime_ns": int, "entries": {name: [size, mtime, ctime]}}, or None."""
+    path = _index_path(folder)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION or data.get("folder") != os.path.abspath(folder):
+            return None
+        return data
+    except Exception as e:
+        print(f"Error loading folder index: {e}")
+        return None
+
+
+def save_folder_index(folder, dir_mtime_ns, entries):
+    path = _index_path(folder)
+    tmp = None
+    try:
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        # Unique temp file: the GUI scanner and library threads may save the same folder at once
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=INDEX_DIR)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "folder": os.path.abspath(folder),
+                "dir_mtime_ns": dir_mtime_ns,
+                "entries": entries,
+            }, f)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Error saving folder index: {e}")
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def iter_folder(folder):
+    """Yield (name, [size, mtime, ctime]) for the media files directly in folder.
+
+    If the directory mtime matches the saved index the names come from the index and
+    the folder isn't listed, but each indexed file is still stat'ed: overwriting a
+    file in place changes its size/mtime without changing the directory mtime.
+    Otherwise the folder is listed with scandir and every file is stat'ed. Either
+    way the index is rewritten when anything changed.
+    """
+    dir_mtime_ns = os.stat(folder).st_mtime_ns
+    index = load_folder_index(folder)
+    if index is not None and index.get("dir_mtime_ns") == dir_mtime_ns:
+        entries = index["entries"]
+        changed = False
+        for name, row in entries.items():
+            try:
+                st = os.stat(os.path.join(folder, name))
+            except OSError:
+                continue
+            fresh = [st.st_size, st.st_mtime, st.st_ctime]
+            if fresh != row:
+                entries[name] = row = fresh
+                changed = True
+            yield name, row
+        if changed:
+            save_folder_index(folder, dir_mtime_ns, entries)
+        return
+    entries = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not entry.name.lower().endswith(MEDIA_EXTENSIONS):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                row = [st.st_size, st.st_mtime, st.st_ctime]
+            except OSError:
+                continue
+            entries[entry.name] = row
+            yield entry.name, row
+    save_folder_index(folder, dir_mtime_ns, entries)
+
+
+def make_entry(folder, name, stat_row, display_name=None):
+    size, mtime, ctime = stat_row
+    return {
+        "original_path": os.path.join(folder, name),
+        "display_name": display_name or name,
+        "copy_number": 0,
+        "size": size,
+        "mtime": mtime,
+        "ctime": ctime,
+    }
+
+
+class FolderScanner(QObject):
+    """Scans a folder on a worker thread and streams file entries back in batches.
+
+    Every signal carries the generation of the scan it belongs to; starting a new
+    scan makes results of the previous one stale.
+    """
+
+    batch_ready = pyqtSignal(int, list)       # generation, list of entry dicts
+    scan_finished = pyqtSignal(int, str, int)  # generation, folder, total entries
+    scan_failed = pyqtSignal(int, str)
+
+    BATCH_SIZE = 500
+
+    def __init__(self):
+        super().__init__()
+        self._generation = 0
+
+    def scan_async(self, folder, extensions):
+        self._generation += 1
+        gen = self._generation
+        threading.Thread(target=self._run, args=(gen, folder, tuple(extensions)), daemon=True).start()
+        return gen
+
+    def _run(self, gen, folder, extensions):
+        batch = []
+        total = 0
+        try:
+            for name, row in iter_folder(folder):
+                if gen != self._generation:
+                    return
+                if not name.lower().endswith(extensions):
+                    continue
+                batch.append(make_entry(folder, name, row))
+                if len(batch) >= self.BATCH_SIZE:
+                    self.batch_ready.emit(gen, batch)
+                    total += len(batch)
+                    batch = []
+        except OSError as e:
+            self.scan_failed.emit(gen, f"Error loading folder contents: {e}")
+            return
+        if batch:
+            self.batch_ready.emit(gen, batch)
+            total += len(batch)
+        self.scan_finished.emit(gen, folder, total)
@@ -0,0 +1,291 @@
+import os
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+from scripts.folder_scanner import iter_folder, make_entry
+
+# Directory tree cache shared by the folder tree and library mode:
+# path -> [dir_mtime_ns, [subfolder names]]. File listings per folder live in
+# the folder_scanner index; this only records which subfolders exist.
+TREE_FILE = "library_tree.json"
+TREE_VERSION = 1
+
+# Folders the app writes its own output to; library mode doesn't list their contents
+OUTPUT_FOLDERS = frozenset(("trash_backup", "cropped", "uncropped", "Screenshots", "Clips"))
+
+# inotify watches are a per-user kernel resource; stay well below the usual default
+MAX_WATCHED_DIRS = 4096
+
+
+def load_tree_cache():
+    if not os.path.exists(TREE_FILE):
+        return {}
+    try:
+        with open(TREE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TREE_VERSION:
+            return {}
+        return data.get("dirs", {})
+    except Exception as e:
+        print(f"Error loading library tree: {e}")
+        return {}
+
+
+def save_tree_cache(dirs):
+    fd, tmp = tempfile.mkstemp(prefix=TREE_FILE + ".", suffix=".tmp",
+                               dir=os.path.dirname(os.path.abspath(TREE_FILE)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": TREE_VERSION, "dirs": dirs}, f)
+        os.replace(tmp, TREE_FILE)
+    except Exception as e:
+        print(f"Error saving library tree: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def list_subdirs(path, cache, lock):
+    """Return sorted subfolder names of path, from cache when the directory mtime still matches.
+    cache is only touched while holding lock; the listing itself runs unlocked."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    with lock:
+        cached = cache.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    names = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir() and not entry.name.startswith('.'):
+                    names.append(entry.name)
+            except OSError:
+                continue
+    names.sort(key=str.lower)
+    with lock:
+        cache[path] = [mtime_ns, names]
+    return names
+
+
+class DirectoryLister(QObject):
+    """Lists subfolders off the GUI thread for the lazily populated folder tree."""
+
+    listed = pyqtSignal(str, list)  # path, subfolder names
+
+    def __init__(self, cache=None):
+        super().__init__()
+        # Read and written by the lister thread and LibraryScanner threads
+        self.cache = cache if cache is not None else load_tree_cache()
+        self.lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._dirty = False
+
+    def cached(self, path):
+        """Subfolder names from the cache without touching the disk, or None."""
+        with self.lock:
+            entry = self.cache.get(path)
+        return entry[1] if entry is not None else None
+
+    def subdirs(self, path):
+        """Subfolder names of path, listed on the calling thread (see list_subdirs)."""
+        names = list_subdirs(path, self.cache, self.lock)
+        self._dirty = True
+        return names
+
+    def forget(self, folder):
+        """Drop folder and every cached path below it; returns the paths dropped below it."""
+        prefix = folder.rstrip(os.sep) + os.sep
+        with self.lock:
+            below = [p for p in self.cache if p.startswith(prefix)]
+            for path in below:
+                del self.cache[path]
+            self.cache.pop(folder, None)
+        self._dirty = True
+        return below
+
+    def request(self, path):
+        self._executor.submit(self._list, path)
+
+    def _list(self, path):
+        try:
+            names = self.subdirs(path)
+        except OSError as e:
+            print(f"Error listing subfolders: {e}")
+            names = []
+        self.listed.emit(path, names)
+
+    def flush(self, force=False):
+        if self._dirty or force:
+            self._dirty = False
+            with self.lock:
+                dirs = dict(self.cache)
+            save_tree_cache(dirs)
+
+
+class LibraryScanner(QObject):
+    """Recursive index over a set of root folders, kept current with QFileSystemWatcher.
+
+    scan() walks every root on a worker thread, reusing the per-folder file index
+    and the directory tree cache, and streams entries back in batches. Afterwards
+    every indexed directory is watched (inotify on Linux); a change rescans only
+    that directory, plus any subfolders that appeared in it, and is reported as
+    folder_changed with the folder's complete new listing. Entries are named by
+    their path below the roots, so same-named files in different folders stay apart.
+    """
+
+    batch_ready = pyqtSignal(int, list)        # generation, list of entry dicts
+    scan_finished = pyqtSignal(int, int)       # generation, total entries
+    folder_changed = pyqtSignal(str, list)     # folder, all entries now in it ([] if removed)
+    _tree_scanned = pyqtSignal(int, list)      # generation, directories to watch
+
+    BATCH_SIZE = 500
+    CHANGE_DELAY_MS = 300
+
+    def __init__(self, lister):
+        super().__init__()
+        self.lister = lister
+        self.roots = []
+        self.extensions = ()
+        self._name_base = None
+        self._generation = 0
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._pending = set()
+        self._change_timer = QTimer(self)
+        self._change_timer.setSingleShot(True)
+        self._change_timer.setInterval(self.CHANGE_DELAY_MS)
+        self._change_timer.timeout.connect(self._rescan_pending)
+        self._tree_scanned.connect(self._watch)
+
+    def scan(self, roots, extensions):
+        self.roots = [r for r in dict.fromkeys(roots) if r and os.path.isdir(r)]
+        self.extensions = tuple(extensions)
+        try:
+            self._name_base = os.path.commonpath(self.roots) if self.roots else None
+        except ValueError:
+            # Roots on different drives: name entries by their full path
+            self._name_base = None
+        self._generation += 1
+        self._pending.clear()
+        self._unwatch_all()
+        threading.Thread(target=self._run, args=(self._generation, list(self.roots)), daemon=True).start()
+        return self._generation
+
+    def stop(self):
+        """Leave library mode: drop watches and make in-flight results stale."""
+        self._generation += 1
+        self._pending.clear()
+        self._change_timer.stop()
+        self._unwatch_all()
+
+    def _entries(self, folder):
+        """Entries for the media files directly in folder, named relative to the roots."""
+        entries = []
+        for name, row in iter_folder(folder):
+            if name.lower().endswith(self.extensions):
+                path = os.path.join(folder, name)
+                display_name = os.path.relpath(path, self._name_base) if self._name_base else path
+                entries.append(make_entry(folder, name, row, display_name))
+        return entries
+
+    def _subdirs(self, folder):
+        return [name for name in self.lister.subdirs(folder) if name not in OUTPUT_FOLDERS]
+
+    def _walk(self, root, gen):
+        """Yield (directory, entries) for root and everything below it, breadth first."""
+        queue = [root]
+        while queue:
+            if gen != self._generation:
+                return
+            folder = queue.pop(0)
+            try:
+                entries = self._entries(folder)
+                subdirs = self._subdirs(folder)
+            except OSError as e:
+                print(f"Error indexing {folder}: {e}")
+                continue
+            queue.extend(os.path.join(folder, name) for name in subdirs)
+            yield folder, entries
+
+    def _run(self, gen, roots):
+        batch = []
+        total = 0
+        folders = []
+        for root in roots:
+            for folder, entries in self._walk(root, gen):
+                folders.append(folder)
+                batch.extend(entries)
+                if len(batch) >= self.BATCH_SIZE:
+                    self.batch_ready.emit(gen, batch)
+                    total += len(batch)
+                    batch = []
+        if gen != self._generation:
+            return
+        if batch:
+            self.batch_ready.emit(gen, batch)
+            total += len(batch)
+        self.lister.flush(force=True)
+        self.scan_finished.emit(gen, total)
+        self._tree_scanned.emit(gen, folders)
+
+    def _watch(self, gen, folders):
+        if gen != self._generation:
+            return
+        room = MAX_WATCHED_DIRS - len(self._watcher.directories())
+        if room < len(folders):
+            print(f"Library: watching {max(room, 0)} of {len(folders)} folders (watch limit)")
+        if room > 0:
+            self._watcher.addPaths(folders[:room])
+
+    def _unwatch_all(self):
+        watched = self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+
+    def _on_directory_changed(self, path):
+        # Copies and extracts fire many events per folder; coalesce them
+        self._pending.add(path)
+        self._change_timer.start()
+
+    def _rescan_pending(self):
+        folders, self._pending = sorted(self._pending), set()
+        gen = self._generation
+        threading.Thread(target=self._run_changes, args=(gen, folders), daemon=True).start()
+
+    def _run_changes(self, gen, folders):
+        new_dirs = []
+        for folder in folders:
+            if gen != self._generation:
+                return
+            if not os.path.isdir(folder):
+                # Removed or renamed away: drop it and everything indexed below it
+                self._drop_tree(folder)
+                continue
+            known = set(self.lister.cached(folder) or []).difference(OUTPUT_FOLDERS)
+            try:
+                entries = self._entries(folder)
+                subdirs = self._subdirs(folder)
+            except OSError as e:
+                print(f"Error rescanning {folder}: {e}")
+                continue
+            self.folder_changed.emit(folder, entries)
+            for name in known.difference(subdirs):
+                self._drop_tree(os.path.join(folder, name))
+            for name in subdirs:
+                if name not in known:
+                    for sub_folder, sub_entries in self._walk(os.path.join(folder, name), gen):
+                        new_dirs.append(sub_folder)
+                        self.folder_changed.emit(sub_folder, sub_entries)
+        self.lister.flush(force=True)
+        if new_dirs:
+            self._tree_scanned.emit(gen, new_dirs)
+
+    def _drop_tree(self, folder):
+        """Forget folder and everything indexed below it."""
+        for path in self.lister.forget(folder):
+            self.folder_changed.emit(path, [])
+        self.folder_changed.emit(folder, [])
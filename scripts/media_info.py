@@ -0,0 +1,261 @@
+import os
+import json
+import hashlib
+import subprocess
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Info panel (I key) results per file hash: hash -> info dict (see read_media_info)
+INFO_CACHE_FILE = "media_info_cache.json"
+INFO_CACHE_VERSION = 2  # 2: entries from failed probes are no longer cached
+MAX_CACHED = 5000  # oldest entries are dropped first
+
+# Format tags ComfyUI / VHS and other tools put the prompt or workflow in
+COMMENT_TAGS = ('comment', 'description', 'title', 'purl', 'purl:comment', 'purl:description')
+
+
+def file_hash(path):
+    """Generate a hash for the file based on path, size, and modification time"""
+    try:
+        stat = os.stat(path)
+        hash_data = f"{path}_{stat.st_size}_{stat.st_mtime}"
+        return hashlib.md5(hash_data.encode()).hexdigest()
+    except OSError:
+        return hashlib.md5(path.encode()).hexdigest()
+
+
+def _is_show_text(node):
+    kind = node.get("type") or node.get("class_type") or ""
+    if not kind and isinstance(node.get("properties"), dict):
+        kind = node["properties"].get("Node name for S&R", "")
+    return isinstance(kind, str) and kind.startswith("ShowText")
+
+
+def _strings(value):
+    if isinstance(value, str):
+        if value.strip():
+            yield value.strip()
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def extract_prompts(data):
+    """Texts of every ShowText node in a ComfyUI workflow or prompt graph, in order.
+
+    Walks the parsed JSON instead of pattern-matching a re-serialized string, so
+    nested graphs (group nodes, subgraphs) and workflows embedded as JSON strings
+    (VHS writes {"prompt": "<json>", "workflow": "<json>"}) are covered too.
+    """
+    found = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            text = node.strip()
+            if text.startswith("{") and len(text) > 2:
+                try:
+                    stack.append(json.loads(text))
+                except ValueError:
+                    pass
+            continue
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+        if _is_show_text(node):
+            values = node.get("widgets_values")
+            if values is None and isinstance(node.get("inputs"), dict):
+                # API-format prompt; a list here is a link to another node, not text
+                text = node["inputs"].get("text")
+                values = text if isinstance(text, str) else None
+            found.extend(_strings(values))
+        stack.extend(reversed(list(node.values())))
+    return list(dict.fromkeys(found))
+
+
+def _parse_comment(comment):
+    """(prompts, fallback text) for a format comment holding ComfyUI JSON."""
+    start = comment.find('{')
+    end = comment.rfind('}') + 1
+    if start == -1 or end <= start:
+        return [], comment
+    try:
+        data = json.loads(comment[start:end])
+    except ValueError as e:
+        print(f"Error parsing prompt JSON: {e}")
+        return [], comment
+    prompts = extract_prompts(data)
+    if prompts:
+        return prompts, None
+    display_text = None
+    if isinstance(data, dict) and "widgets_values" in data:
+        widgets_values = data["widgets_values"]
+        if widgets_values and isinstance(widgets_values, list):
+            first_value = widgets_values[0]
+            if isinstance(first_value, list) and first_value:
+                display_text = first_value[0]
+            else:
+                display_text = str(first_value)
+    return [], display_text or json.dumps(data, indent=2)
+
+
+def _frame_rate(rate):
+    num, _, den = (rate or "0").partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def read_media_info(path):
+    """Everything the info panel shows for path, from one ffprobe call.
+
+    Returns {"fields": [[label, value], ...], "prompts": [...], "prompt_text": str or None,
+    "probed": bool}. When ffprobe is missing, times out or fails, only the file
+    fields are filled in and probed is False; such results are shown but not cached.
+    """
+    st = os.stat(path)
+    fields = [
+        ["File", os.path.basename(path)],
+        ["Path", path],
+        ["Size", f"{st.st_size / (1024*1024):.2f} MB"],
+        ["Created", datetime.fromtimestamp(st.st_ctime).strftime('%Y-%m-%d %H:%M:%S')],
+        ["Modified", datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M:%S')],
+    ]
+    info = {"fields": fields, "prompts": [], "prompt_text": None, "probed": False}
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=30
+        )
+        if result.returncode != 0:
+            print(f"ffprobe failed for {path} (exit code {result.returncode})")
+            return info
+        data = json.loads(result.stdout)
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        print(f"Error getting ffprobe metadata: {e}")
+        return info
+    info["probed"] = True
+    fmt = data.get('format') or {}
+    video = next((s for s in data.get('streams') or [] if s.get('codec_type') == 'video'), None)
+    try:
+        duration = float(fmt.get('duration') or (video or {}).get('duration') or 0)
+    except ValueError:
+        duration = 0.0
+    if video is not None:
+        fps = _frame_rate(video.get('avg_frame_rate')) or _frame_rate(video.get('r_frame_rate'))
+        frames = video.get('nb_frames')
+        frames = int(frames) if frames and str(frames).isdigit() else int(round(duration * fps))
+        fields += [
+            ["Resolution", f"{video.get('width', 0)}x{video.get('height', 0)}"],
+            ["FPS", f"{fps:.2f}"],
+            ["Frames", frames],
+        ]
+    fields.append(["Duration (s)", f"{duration:.2f}"])
+    if fmt:
+        fields += [
+            ['Format', fmt.get('format_name', 'N/A')],
+            ['Bitrate', f"{int(fmt.get('bit_rate', 0)) / 1000:.1f} kb/s" if 'bit_rate' in fmt else 'N/A'],
+        ]
+    if video is not None:
+        fields += [
+            ['Video Codec', video.get('codec_long_name', video.get('codec_name', 'N/A'))],
+            ['Bit Depth', f"{video.get('bits_per_raw_sample', video.get('bits_per_sample', 'N/A'))} bits"],
+            ['Color Space', video.get('color_space', 'N/A')],
+            ['Color Range', video.get('color_range', 'N/A')],
+            ['Color Primaries', video.get('color_primaries', 'N/A')],
+            ['Color Transfer', video.get('color_transfer', 'N/A')],
+        ]
+    tags = fmt.get('tags') or {}
+    comment = next((tags[key].strip() for key in COMMENT_TAGS if key in tags and tags[key].strip()), None)
+    if comment and 'prompt' in comment:
+        info["prompts"], info["prompt_text"] = _parse_comment(comment)
+    return info
+
+
+def load_info_cache():
+    if not os.path.exists(INFO_CACHE_FILE):
+        return {}
+    try:
+        with open(INFO_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INFO_CACHE_VERSION:
+            return {}
+        return data.get("files", {})
+    except Exception as e:
+        print(f"Error loading media info cache: {e}")
+        return {}
+
+
+def save_info_cache(files):
+    tmp = INFO_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INFO_CACHE_VERSION, "files": files}, f)
+        os.replace(tmp, INFO_CACHE_FILE)
+    except Exception as e:
+        print(f"Error saving media info cache: {e}")
+
+
+class MediaInfoCache(QObject):
+    """Info panel data computed on worker threads and cached per file hash.
+
+    get() answers from memory; request() and prefetch() fill the cache in the
+    background and announce each result with info_ready.
+    """
+
+    info_ready = pyqtSignal(str, dict)  # path, info
+
+    def __init__(self):
+        super().__init__()
+        self._files = load_info_cache()
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._dirty = False
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+    def get(self, path):
+        return self._files.get(file_hash(path))
+
+    def request(self, path):
+        key = file_hash(path)
+        with self._lock:
+            if key in self._files or key in self._in_flight:
+                return
+            self._in_flight.add(key)
+        self._executor.submit(self._read, path, key)
+
+    def prefetch(self, paths):
+        for path in paths:
+            self.request(path)
+
+    def _read(self, path, key):
+        try:
+            info = read_media_info(path)
+        except Exception as e:
+            # Any failure must still clear _in_flight below, or the file is never requested again
+            print(f"Error reading metadata for {path}: {e}")
+            info = None
+        with self._lock:
+            self._in_flight.discard(key)
+            # A failed probe is shown but not cached, so the next request tries again
+            if info is not None and info.get("probed"):
+                self._files.pop(key, None)
+                self._files[key] = info
+                while len(self._files) > MAX_CACHED:
+                    self._files.pop(next(iter(self._files)))
+                self._dirty = True
+        if info is not None:
+            self.info_ready.emit(path, info)
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            files = dict(self._files)
+        save_info_cache(files)
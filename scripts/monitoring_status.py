@@ -1,13 +1,16 @@
 import sys
 import os
+import threading
+from PyQt6.QtCore import QObject, QPointF, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QWidget
 sys.path.append(os.path.join(os.path.dirname(__file__), 'Monitoring'))
 
-from Monitoring.hardware import CHardwareInfo
+# Seconds between hardware samples
+MONITOR_RATE_S = 2.0
 
-def get_monitoring_status():
-    # Enable all switches for full info
-    hw = CHardwareInfo(switchCPU=True, switchGPU=True, switchHDD=False, switchRAM=True, switchVRAM=True)
-    status = hw.getStatus()
+
+def format_status(status):
     # Format for display (first GPU only)
     gpu = status['gpus'][0] if status['gpus'] else {}
     gpu_util = gpu.get('gpu_utilization', None)
@@ -32,5 +35,124 @@ def get_monitoring_status():
     ram_str = f"RAM: {status.get('ram_used_percent', '-')}%"
     return f"{gpu_str} | {vram_str} | {cpu_str} | {ram_str}"
 
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def format_process_tooltip(process):
+    """Per-process breakdown for the sparkline tooltip."""
+    if not process:
+        return "Process stats unavailable"
+
+    def line(name, sample, count=None):
+        io = sample.get('io_rate', -1)
+        io_str = f"{format_bytes(io)}/s" if io >= 0 else "n/a"
+        label = f"{name} x{count}" if count and count > 1 else name
+        return (f"{label}: CPU {sample['cpu']:.0f}%  RSS {format_bytes(sample['rss'])}  "
+                f"I/O {io_str}  threads {sample['threads']}")
+
+    lines = [line("SharkBit", process['self'])]
+    for name, group in sorted(process['children'].items()):
+        lines.append(line(name, group, group['count']))
+    lines.append(line("Total", process['total']))
+    return "\n".join(lines)
+
+
+def get_monitoring_status():
+    from Monitoring.hardware import CHardwareInfo
+    # Enable all switches for full info
+    hw = CHardwareInfo(switchCPU=True, switchGPU=True, switchHDD=False, switchRAM=True, switchVRAM=True)
+    return format_status(hw.getStatus())
+
+
+class HardwareMonitor(QObject):
+    """One long-lived Monitoring.monitor.CMonitor for the whole app.
+
+    The Monitoring package (torch, pynvml, cpuinfo) is imported and CHardwareInfo
+    is built on a background thread; samples are then taken on the CMonitor thread
+    and delivered through status_ready, which Qt queues onto the GUI thread.
+    """
+
+    status_ready = pyqtSignal(dict)
+    monitor_failed = pyqtSignal(str)
+
+    def __init__(self, rate=MONITOR_RATE_S):
+        super().__init__()
+        self.rate = rate
+        self._monitor = None
+        self._starting = False
+
+    def start(self):
+        if self._monitor is not None or self._starting:
+            return
+        self._starting = True
+        threading.Thread(target=self._start, daemon=True).start()
+
+    def _start(self):
+        try:
+            from Monitoring.monitor import CMonitor
+            self._monitor = CMonitor(self.rate, switchCPU=True, switchGPU=True, switchHDD=False,
+                                     switchRAM=True, switchVRAM=True, callback=self.status_ready.emit,
+                                     switchProcess=True)
+        except Exception as e:
+            self.monitor_failed.emit(str(e))
+        finally:
+            self._starting = False
+
+    def set_rate(self, rate):
+        """Sampling interval in seconds; 0 pauses sampling."""
+        self.rate = rate
+        if self._monitor is not None:
+            self._monitor.setRate(rate)
+
+    def stop(self):
+        if self._monitor is not None:
+            self._monitor.stopMonitor()
+
+
+class ProcessSparkline(QWidget):
+    """Small CPU history of SharkBit plus its ffmpeg/yt-dlp children for the status row.
+
+    The bright line is the total, the dim one SharkBit alone; the tooltip has the
+    latest per-process breakdown.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.history = []
+        self.setFixedSize(90, 22)
+        self.setToolTip("Process stats will appear shortly")
+
+    def update_status(self, status):
+        self.history = status.get('process_history') or []
+        self.setToolTip(format_process_tooltip(status.get('process')))
+        self.update()
+
+    def paintEvent(self, event):
+        if len(self.history) < 2:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        w, h = self.width() - 2, self.height() - 2
+        # Multi-core processes go past 100%; scale to whatever the window holds
+        top = max(100.0, max(sample[2] for sample in self.history))
+        step = w / (len(self.history) - 1)
+
+        def polyline(index):
+            return QPolygonF([QPointF(1 + i * step, 1 + h - h * sample[index] / top)
+                              for i, sample in enumerate(self.history)])
+
+        palette = self.palette()
+        painter.setPen(QPen(palette.mid().color(), 1))
+        painter.drawPolyline(polyline(1))
+        painter.setPen(QPen(palette.highlight().color(), 1.5))
+        painter.drawPolyline(polyline(2))
+        painter.end()
+
+
 if __name__ == "__main__":
     print(get_monitoring_status())
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+
+HASH_SIZE = 8          # 8x8 low-frequency DCT block -> 64-bit hash
+_DCT_SIZE = 32
+
+
+def frame_hash(frame):
+    """64-bit perceptual hash (pHash) of a BGR or grayscale frame, as an int.
+
+    The frame is reduced to 32x32 gray, transformed with a DCT, and each of the
+    8x8 lowest frequencies (DC excluded from the median) becomes one bit:
+    above or below the median. Re-encodes, rescales and small brightness changes
+    keep most bits; different shots flip about half of them.
+    """
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (_DCT_SIZE, _DCT_SIZE), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(small))[:HASH_SIZE, :HASH_SIZE]
+    median = np.median(dct.flatten()[1:])
+    value = 0
+    for bit in (dct.flatten() > median):
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+# Positions (fraction of the frame count) sampled for a video signature
+SAMPLE_POINTS = (0.1, 0.3, 0.5, 0.7, 0.9)
+
+
+def video_signature(path, points=SAMPLE_POINTS):
+    """Tuple of frame_hash values at the given positions of the video, or None if
+    any of them can't be decoded. Re-encodes and rescaled copies of a clip get
+    signatures a few bits apart; trimmed copies don't line up and won't match."""
+    cap = cv2.VideoCapture(path)
+    try:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total <= 0:
+            return None
+        hashes = []
+        for point in points:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, min(total - 1, int(total * point)))
+            ret, frame = cap.read()
+            if not ret:
+                return None
+            hashes.append(frame_hash(frame))
+        return tuple(hashes)
+    finally:
+        cap.release()
+
+
+def signature_distance(a, b):
+    """Sum of the per-sample Hamming distances; a metric, so usable with BKTree."""
+    return sum(hamming(x, y) for x, y in zip(a, b))
+
+
+class BKTree:
+    """Burkhard-Keller tree for near-neighbour queries under a metric.
+
+    Each child edge is labelled with its distance to the parent, so a query only
+    descends into children whose label is within radius of the query's distance
+    to the parent (triangle inequality) instead of comparing against every key.
+    """
+
+    def __init__(self, distance=hamming):
+        self.distance = distance
+        self._root = None  # [key, items, {distance: child}]
+
+    def add(self, key, item):
+        if self._root is None:
+            self._root = [key, [item], {}]
+            return
+        node = self._root
+        while True:
+            d = self.distance(key, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [key, [item], {}]
+                return
+            node = child
+
+    def query(self, key, radius):
+        """[(distance, item)] for every item whose key is within radius of key."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            d = self.distance(key, node[0])
+            if d <= radius:
+                found.extend((d, item) for item in node[1])
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return found
@@ -0,0 +1,62 @@
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import QLabel
+
+from scripts import perf_trace
+
+# (label, span name) rows of the overlay, in pipeline order
+OVERLAY_SPANS = (
+    ("decode", "decode"),
+    ("convert", "convert"),
+    ("scale", "scale"),
+    ("paint", "paint"),
+    ("seek", "seek"),
+    ("multi", "multi.tick"),
+)
+
+
+class PerfOverlay(QLabel):
+    """Semi-transparent readout of perf_trace data drawn over the video view."""
+
+    REFRESH_MS = 500
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("perf_overlay")
+        font = QFont("monospace")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPointSize(9)
+        self.setFont(font)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: #9fef00; padding: 4px;")
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_active(self, active):
+        if active:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(self.REFRESH_MS)
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def refresh(self):
+        lines = []
+        for label, name in OVERLAY_SPANS:
+            s = perf_trace.stats(name)
+            if s is not None and s.count:
+                lines.append(f"{label:<8}{s.mean_ms():6.2f} ms  p95 {s.percentile_ms(95):6.2f}")
+        fps = perf_trace.gauge_value("play.fps")
+        target = perf_trace.gauge_value("play.target_fps")
+        if fps is not None:
+            lines.append(f"{'fps':<8}{fps:6.1f} / {target or 0:.1f}")
+        lines.append(f"{'dropped':<8}{perf_trace.counter('play.dropped'):6d}")
+        drift = perf_trace.gauge_value("audio.drift_ms")
+        if drift is not None:
+            lines.append(f"{'drift':<8}{drift:+6.0f} ms")
+        self.setText("\n".join(lines) if lines else "collecting...")
+        self.adjustSize()
+        self.move(8, 8)
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import threading
+from array import array
+from collections import deque
+
+# Tracing is off unless SHARKBIT_TRACE=1 or it is switched on at runtime (F3).
+# While off, span() returns one shared no-op context manager, so an
+# instrumented hot path pays a global lookup and a call, nothing more.
+ENABLED = os.environ.get("SHARKBIT_TRACE") == "1"
+
+RECENT_SIZE = 256          # per-span ring of recent durations (ms)
+BUCKETS = 24               # log2 histogram: bucket i counts durations < 2**i microseconds
+TRACE_EVENTS = 200_000     # Chrome trace events kept (oldest dropped first)
+
+_stats = {}
+_counters = {}
+_gauges = {}
+_events = deque(maxlen=TRACE_EVENTS)
+_lock = threading.Lock()
+_epoch_ns = time.perf_counter_ns()
+
+
+class SpanStats:
+    """Fixed-size statistics for one span name: a ring of recent durations and a log2 histogram."""
+
+    __slots__ = ("recent", "pos", "count", "total_ms", "buckets")
+
+    def __init__(self):
+        self.recent = array("d", [0.0] * RECENT_SIZE)
+        self.pos = 0
+        self.count = 0
+        self.total_ms = 0.0
+        self.buckets = array("Q", [0] * BUCKETS)
+
+    def add(self, duration_ns):
+        ms = duration_ns / 1e6
+        self.recent[self.pos] = ms
+        self.pos = (self.pos + 1) % RECENT_SIZE
+        self.count += 1
+        self.total_ms += ms
+        self.buckets[min(BUCKETS - 1, (duration_ns // 1000).bit_length())] += 1
+
+    def recent_values(self):
+        n = min(self.count, RECENT_SIZE)
+        return list(self.recent[:n]) if self.count <= RECENT_SIZE else list(self.recent)
+
+    def mean_ms(self):
+        values = self.recent_values()
+        return sum(values) / len(values) if values else 0.0
+
+    def percentile_ms(self, p):
+        values = sorted(self.recent_values())
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+def span(name):
+    """with span("decode"): ... records the block's duration while tracing is enabled."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def record(name, start_ns, end_ns):
+    """Record an interval measured elsewhere (e.g. across threads or callbacks)."""
+    if not ENABLED:
+        return
+    stats = _stats.get(name)
+    if stats is None:
+        with _lock:
+            stats = _stats.setdefault(name, SpanStats())
+    stats.add(end_ns - start_ns)
+    _events.append(("X", name, start_ns, end_ns - start_ns, threading.get_ident()))
+
+
+def count(name, n=1):
+    """Add n to a running counter (dropped frames, cache misses, ...)."""
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def gauge(name, value):
+    """Set the latest value of a measurement (audio drift, achieved fps, ...)."""
+    if ENABLED:
+        _gauges[name] = value
+        _events.append(("C", name, time.perf_counter_ns(), value, threading.get_ident()))
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _counters.clear()
+        _gauges.clear()
+        _events.clear()
+
+
+def stats(name):
+    return _stats.get(name)
+
+
+def counter(name):
+    return _counters.get(name, 0)
+
+
+def gauge_value(name, default=None):
+    return _gauges.get(name, default)
+
+
+def summary():
+    """{span: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} over the recent window of each span."""
+    result = {}
+    for name, s in list(_stats.items()):
+        values = s.recent_values()
+        result[name] = {
+            "count": s.count,
+            "mean_ms": round(s.mean_ms(), 3),
+            "p50_ms": round(s.percentile_ms(50), 3),
+            "p95_ms": round(s.percentile_ms(95), 3),
+            "p99_ms": round(s.percentile_ms(99), 3),
+            "max_ms": round(max(values), 3) if values else 0.0,
+        }
+    return result
+
+
+def export_chrome_trace(path):
+    """Write the recorded spans and gauges as Chrome trace JSON (chrome://tracing, Perfetto)."""
+    pid = os.getpid()
+    trace = []
+    for kind, name, start_ns, value, tid in list(_events):
+        ts = (start_ns - _epoch_ns) / 1000
+        if kind == "X":
+            trace.append({"name": name, "ph": "X", "ts": ts, "dur": value / 1000, "pid": pid, "tid": tid})
+        else:
+            trace.append({"name": name, "ph": "C", "ts": ts, "pid": pid, "tid": tid, "args": {name: value}})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms",
+                   "otherData": {"counters": dict(_counters), "summary": summary()}}, f)
+    return len(trace)
@@ -1,12 +1,21 @@
 import os
 import time
+import threading
+import cv2
 from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtGui import QImage, QPixmap
-from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtCore import QBuffer, QIODevice, QObject, pyqtSignal
 
-# Small thread pool for background disk writes
+# Small thread pool for background encoding and disk writes
 _executor = ThreadPoolExecutor(max_workers=2)
 
+# Still formats for full-resolution screenshots: extension -> cv2.imencode params
+ENCODE_PARAMS = {
+    "jpg": [cv2.IMWRITE_JPEG_QUALITY, 95],
+    "png": [cv2.IMWRITE_PNG_COMPRESSION, 3],
+    "webp": [cv2.IMWRITE_WEBP_QUALITY, 95],
+}
+
 
 def _ensure_dir(path):
     try:
@@ -110,3 +119,164 @@ def save_video_screenshot(entry: dict, pixmap: QPixmap, crop_regions: dict, orig
         return True
     except Exception:
         return False
+
+
+def _clamp_region(region, width, height):
+    """Crop region (x, y, w, h) in source pixels clamped to the frame, or None if empty."""
+    x, y, w, h = (int(v) for v in region)
+    x = max(0, min(x, width - 1))
+    y = max(0, min(y, height - 1))
+    w = min(w, width - x)
+    h = min(h, height - y)
+    if w <= 0 or h <= 0:
+        return None
+    return x, y, w, h
+
+
+def _read_frame(video_path, frame_index):
+    cap = cv2.VideoCapture(video_path)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, max(0, frame_index))
+        ret, frame = cap.read()
+        return frame if ret else None
+    finally:
+        cap.release()
+
+
+def _encode_and_write(frame, video_path, frame_index, full_path, crop_path, region, fmt):
+    """Worker: re-decode if no frame was given, then crop, encode and write one screenshot."""
+    image = frame if frame is not None else _read_frame(video_path, frame_index)
+    if image is None:
+        print(f"Screenshot: could not decode frame {frame_index} of {video_path}")
+        return
+    params = ENCODE_PARAMS.get(fmt, [])
+    ok, buf = cv2.imencode(f".{fmt}", image, params)
+    if ok:
+        _write_bytes(full_path, buf.tobytes())
+    if crop_path and region:
+        box = _clamp_region(region, image.shape[1], image.shape[0])
+        if box is not None:
+            x, y, w, h = box
+            ok, buf = cv2.imencode(f".{fmt}", image[y:y+h, x:x+w], params)
+            if ok:
+                _write_bytes(crop_path, buf.tobytes())
+
+
+def save_frame_screenshot(entry: dict, frame, crop_region, folder_path: str, fmt: str = "jpg",
+                          video_path: str = None, frame_index: int = -1) -> bool:
+    """Source-resolution screenshot from a decoded BGR frame.
+
+    Only file names are chosen on the calling (GUI) thread; the crop (in source
+    pixel coordinates, no rescaling), encoding and writes run in _executor. With
+    frame=None the frame is re-decoded from video_path at frame_index in the
+    worker instead. Returns True once the work is scheduled.
+    """
+    if frame is None and (not video_path or frame_index < 0):
+        return False
+    fmt = fmt.lower().lstrip(".")
+    if fmt == "jpeg":
+        fmt = "jpg"
+    base_folder = folder_path if folder_path else os.getcwd()
+    screenshots_dir = os.path.join(base_folder, "Screenshots")
+    _ensure_dir(screenshots_dir)
+    display = entry.get("display_name") or os.path.basename(video_path or "frame")
+    base_name = os.path.splitext(os.path.basename(display))[0]
+    full_path = _unique_path(screenshots_dir, base_name + "_frame", fmt)
+    crop_path = _unique_path(screenshots_dir, base_name + "_crop", fmt) if crop_region else None
+    _executor.submit(_encode_and_write, frame, video_path, frame_index, full_path, crop_path, crop_region, fmt)
+    return True
+
+
+class BurstCapture(QObject):
+    """Writes every frame of a range as full-resolution stills (Shift+C).
+
+    One thread decodes the range sequentially with its own capture; stills are
+    cropped, encoded and written by a pool of WRITERS. At most MAX_PENDING frames
+    wait for a writer; beyond that the decoder blocks, so memory stays bounded
+    however fast decoding is. With dedupe_distance set, a frame whose perceptual
+    hash is within that many bits of the last written frame is skipped.
+    """
+
+    progress = pyqtSignal(int, int)         # frames decoded, frames in range
+    finished = pyqtSignal(int, int, str)    # stills written, near-duplicates skipped, folder
+    failed = pyqtSignal(str)
+
+    WRITERS = 4
+    MAX_PENDING = 16
+
+    def __init__(self):
+        super().__init__()
+        self.busy = False
+        self.cancel_requested = False
+
+    def start(self, entry, video_path, start, count, crop_region, folder_path, fmt="jpg", dedupe_distance=None):
+        if self.busy:
+            return False
+        self.busy = True
+        self.cancel_requested = False
+        threading.Thread(
+            target=self._run,
+            args=(entry, video_path, int(start), int(count), crop_region, folder_path, fmt, dedupe_distance),
+            daemon=True,
+        ).start()
+        return True
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def _run(self, entry, video_path, start, count, crop_region, folder_path, fmt, dedupe_distance):
+        try:
+            written, skipped, folder = self._capture(entry, video_path, start, count, crop_region,
+                                                     folder_path, fmt, dedupe_distance)
+        except Exception as e:
+            self.busy = False
+            self.failed.emit(str(e))
+            return
+        self.busy = False
+        self.finished.emit(written, skipped, folder)
+
+    def _capture(self, entry, video_path, start, count, crop_region, folder_path, fmt, dedupe_distance):
+        if dedupe_distance is not None:
+            from scripts.perceptual_hash import frame_hash, hamming
+        fmt = fmt.lower().lstrip(".")
+        screenshots_dir = os.path.join(folder_path or os.getcwd(), "Screenshots")
+        _ensure_dir(screenshots_dir)
+        base_name = os.path.splitext(os.path.basename(entry.get("display_name") or video_path))[0]
+        # One timestamp per burst keeps names unique across bursts without per-file exists checks
+        stem = f"{base_name}_burst{int(time.time() * 1000)}"
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Could not open {video_path}")
+        slots = threading.BoundedSemaphore(self.MAX_PENDING)
+        writers = ThreadPoolExecutor(max_workers=self.WRITERS)
+        written = skipped = 0
+        last_hash = None
+        try:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            for i in range(count):
+                if self.cancel_requested:
+                    break
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if i % 10 == 0:
+                    self.progress.emit(i, count)
+                if dedupe_distance is not None:
+                    h = frame_hash(frame)
+                    if last_hash is not None and hamming(h, last_hash) <= dedupe_distance:
+                        skipped += 1
+                        continue
+                    last_hash = h
+                index = start + i
+                full_path = os.path.join(screenshots_dir, f"{stem}_f{index:06d}_frame.{fmt}")
+                crop_path = os.path.join(screenshots_dir, f"{stem}_f{index:06d}_crop.{fmt}") if crop_region else None
+                slots.acquire()  # back-pressure: wait for a writer when MAX_PENDING frames are queued
+                future = writers.submit(_encode_and_write, frame, video_path, index, full_path, crop_path, crop_region, fmt)
+                future.add_done_callback(lambda _: slots.release())
+                written += 1
+        finally:
+            cap.release()
+            writers.shutdown(wait=True)
+        self.progress.emit(count, count)
+        return written, skipped, screenshots_dir
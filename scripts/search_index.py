@@ -0,0 +1,450 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from scripts.folder_scanner import iter_folder
+
+# ffprobe results per file, validated by size and mtime:
+# path -> [size, mtime, width, height, duration, codec, fps]
+METADATA_FILE = "search_metadata.json"
+METADATA_ROW_LEN = 7  # shorter rows predate the fps column and are probed again
+PROBE_WORKERS = 4
+PHASH_COLUMN = METADATA_ROW_LEN  # optional video signature (hex frame hashes) after the probed columns
+
+# Trigram/prefix postings per folder, valid while the folder's mtime is unchanged
+POSTINGS_DIR = ".search_index"
+POSTINGS_VERSION = 1
+
+# Search, sorting and duplicate detection all update the store from worker
+# threads; each read-merge-save of METADATA_FILE holds this lock.
+_store_lock = threading.Lock()
+
+FACET_KEYS = {
+    "codec": "codec",
+    "c": "codec",
+    "width": "width",
+    "w": "width",
+    "height": "height",
+    "h": "height",
+    "res": "height",
+    "dur": "duration",
+    "duration": "duration",
+    "d": "duration",
+    "fps": "fps",
+}
+_FACET_RE = re.compile(r"^([a-z]+)(:|>=|<=|>|<|=)(.+)$")
+_WORD_SPLIT_RE = re.compile(r"[^0-9a-z]+")
+
+
+def _parse_rate(rate):
+    num, _, den = (rate or "0").partition("/")
+    try:
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+    return round(value, 3)
+
+
+def probe_search_metadata(path):
+    """Return (width, height, duration_s, codec, fps) for the first video stream (or first stream)."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error',
+             '-show_entries', 'stream=codec_type,codec_name,width,height,avg_frame_rate:format=duration',
+             '-of', 'json', path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=30
+        )
+        info = json.loads(result.stdout or '{}')
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+    streams = info.get('streams') or []
+    if not streams:
+        return None
+    stream = next((s for s in streams if s.get('codec_type') == 'video'), streams[0])
+    try:
+        duration = float((info.get('format') or {}).get('duration') or 0)
+    except ValueError:
+        duration = 0.0
+    return (stream.get('width') or 0, stream.get('height') or 0, round(duration, 2),
+            stream.get('codec_name') or '', _parse_rate(stream.get('avg_frame_rate')))
+
+
+def parse_query(query):
+    """Split a query into lowercase text terms and (field, op, value) facet filters.
+
+    Facets: codec:h264, res:1080 (height), width>=1920, dur<30 (seconds), fps>=50.
+    res:1920x1080 is also accepted.
+    """
+    terms, facets = [], []
+    for token in query.lower().split():
+        match = _FACET_RE.match(token)
+        if match and match.group(1) in FACET_KEYS:
+            key, op, value = match.groups()
+            field = FACET_KEYS[key]
+            if key == "res" and "x" in value:
+                w, _, h = value.partition("x")
+                facets.append(("width", "=", w))
+                facets.append(("height", "=", h))
+                continue
+            facets.append((field, "=" if op == ":" else op, value))
+        else:
+            terms.append(token)
+    return terms, facets
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def folder_postings(folder, names):
+    """(postings, prefixes) for the files names in folder, by position in names.
+
+    postings maps each trigram of the lowercased path to the ids containing it;
+    prefixes maps the 1- and 2-character prefixes of the file name's words.
+    """
+    postings, prefixes = {}, {}
+    for doc_id, name in enumerate(names):
+        key = os.path.join(folder, name).lower()
+        for gram in _trigrams(key):
+            postings.setdefault(gram, []).append(doc_id)
+        for word in _WORD_SPLIT_RE.split(name.lower()):
+            for n in (1, 2):
+                if len(word) >= n:
+                    ids = prefixes.setdefault(word[:n], [])
+                    if not ids or ids[-1] != doc_id:
+                        ids.append(doc_id)
+    return postings, prefixes
+
+
+def _postings_path(folder):
+    key = hashlib.md5(os.path.normcase(os.path.abspath(folder)).encode()).hexdigest()
+    return os.path.join(POSTINGS_DIR, f"{key}.json")
+
+
+def load_folder_postings(folder, dir_mtime_ns, names):
+    """Saved (postings, prefixes) for folder, or None unless they were built for
+    exactly this directory mtime and listing."""
+    path = _postings_path(folder)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Error loading search postings: {e}")
+        return None
+    if (data.get("version") != POSTINGS_VERSION or data.get("folder") != os.path.abspath(folder)
+            or data.get("dir_mtime_ns") != dir_mtime_ns or data.get("names") != names):
+        return None
+    return data["postings"], data["prefixes"]
+
+
+def save_folder_postings(folder, dir_mtime_ns, names, postings, prefixes):
+    path = _postings_path(folder)
+    try:
+        os.makedirs(POSTINGS_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=POSTINGS_DIR)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": POSTINGS_VERSION, "folder": os.path.abspath(folder),
+                       "dir_mtime_ns": dir_mtime_ns, "names": names,
+                       "postings": postings, "prefixes": prefixes}, f)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Error saving search postings: {e}")
+
+
+class SearchIndex:
+    """Trigram/prefix index over file paths plus ffprobe facets.
+
+    Text terms of three or more characters are answered by intersecting trigram
+    posting sets and verifying the substring; shorter terms use a word-prefix map.
+    The postings are assembled from per-folder parts (see folder_postings), which
+    SearchIndexer keeps on disk for folders that haven't changed.
+    """
+
+    def __init__(self, docs, metadata, parts):
+        """parts: [(offset, postings, prefixes)], one per folder, whose ids start at
+        offset in docs."""
+        self.docs = docs                       # list of (path, folder)
+        self.keys = [p.lower() for p, _ in docs]
+        self.metadata = metadata               # path -> [size, mtime, width, height, duration, codec, fps]
+        self.postings = {}
+        self.prefixes = {}
+        for offset, postings, prefixes in parts:
+            for gram, ids in postings.items():
+                self.postings.setdefault(gram, set()).update(offset + i for i in ids)
+            for prefix, ids in prefixes.items():
+                self.prefixes.setdefault(prefix, set()).update(offset + i for i in ids)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def with_metadata(self, metadata):
+        """The same text index over a newer metadata store."""
+        index = SearchIndex.__new__(SearchIndex)
+        index.docs, index.keys, index.postings, index.prefixes = self.docs, self.keys, self.postings, self.prefixes
+        index.metadata = metadata
+        return index
+
+    def _candidates(self, term):
+        if len(term) >= 3:
+            sets = sorted((self.postings.get(g, set()) for g in _trigrams(term)), key=len)
+            if not sets or not sets[0]:
+                return set()
+            result = set(sets[0])
+            for s in sets[1:]:
+                result &= s
+                if not result:
+                    break
+            return result
+        return set(self.prefixes.get(term, set()))
+
+    def _facet_ok(self, doc_id, facets):
+        row = self.metadata.get(self.docs[doc_id][0])
+        if row is None:
+            return False
+        values = {"width": row[2], "height": row[3], "duration": row[4], "codec": row[5],
+                  "fps": row[6] if len(row) > 6 else 0}
+        for field, op, value in facets:
+            actual = values[field]
+            if field == "codec":
+                if value not in (actual or "").lower():
+                    return False
+                continue
+            try:
+                target = float(value.rstrip("ps"))
+            except ValueError:
+                return False
+            if op == "=" and actual != target:
+                return False
+            if op == ">" and not actual > target:
+                return False
+            if op == "<" and not actual < target:
+                return False
+            if op == ">=" and not actual >= target:
+                return False
+            if op == "<=" and not actual <= target:
+                return False
+        return True
+
+    def search(self, query, extensions=None, limit=5000):
+        """Return matching paths for query, in index order."""
+        terms, facets = parse_query(query)
+        candidates = None
+        for term in terms:
+            ids = self._candidates(term)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        ids = sorted(candidates) if candidates is not None else range(len(self.docs))
+        results = []
+        for doc_id in ids:
+            key = self.keys[doc_id]
+            if extensions and not key.endswith(extensions):
+                continue
+            if any(t not in key for t in terms):
+                continue
+            if facets and not self._facet_ok(doc_id, facets):
+                continue
+            results.append(self.docs[doc_id][0])
+            if len(results) >= limit:
+                break
+        return results
+
+
+def load_metadata_store():
+    if not os.path.exists(METADATA_FILE):
+        return {}
+    try:
+        with open(METADATA_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading search metadata: {e}")
+        return {}
+
+
+def is_current(row, size, mtime):
+    return row is not None and len(row) >= METADATA_ROW_LEN and row[0] == size and row[1] == mtime
+
+
+def ensure_metadata(files, workers=PROBE_WORKERS, progress=None, cancelled=None):
+    """Return {path: metadata row} for files [(path, size, mtime)], probing only
+    the ones the store has no current row for.
+
+    Probes run on a thread pool; new rows are saved back to the store so the next
+    caller (search facets, sorting, triage) gets them for free. progress(done, total)
+    is called as probes finish; cancelled() stops early and returns what is known.
+    """
+    store = load_metadata_store()
+    rows = {}
+    stale = []
+    for path, size, mtime in files:
+        row = store.get(path)
+        if is_current(row, size, mtime):
+            rows[path] = row
+        else:
+            stale.append((path, size, mtime))
+    if not stale:
+        return rows
+    done = 0
+    updates = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(probe_search_metadata, path): (path, size, mtime) for path, size, mtime in stale}
+        for future in as_completed(futures):
+            path, size, mtime = futures[future]
+            meta = future.result()
+            if meta is not None:
+                rows[path] = updates[path] = [size, mtime, *meta]
+            done += 1
+            if progress is not None:
+                progress(done, len(stale))
+            if cancelled is not None and cancelled():
+                for pending in futures:
+                    pending.cancel()
+                break
+    merge_metadata_rows(updates)
+    return rows
+
+
+def merge_metadata_rows(updates):
+    """Write {path: row} into the store and return the merged store.
+
+    The store is re-read under the lock so rows saved meanwhile by other workers
+    are kept; a phash column already stored for the same size and mtime survives
+    a re-probe of that file.
+    """
+    with _store_lock:
+        store = load_metadata_store()
+        for path, row in updates.items():
+            old = store.get(path)
+            if len(row) <= PHASH_COLUMN and is_current(old, row[0], row[1]) and len(old) > PHASH_COLUMN:
+                row = row[:PHASH_COLUMN] + old[PHASH_COLUMN:]
+            store[path] = row
+        save_metadata_store(store)
+    return store
+
+
+def save_phashes(signatures):
+    """Store {path: (size, mtime, [hex frame hash, ...])} in the phash column of the metadata rows.
+
+    The store is re-read under the lock so rows probed meanwhile by other workers
+    are kept; rows that went stale are skipped (their file changed since it was
+    hashed). Probing a changed file rewrites its row without the column, so the
+    hash is recomputed when the file changes.
+    """
+    with _store_lock:
+        store = load_metadata_store()
+        for path, (size, mtime, hashes) in signatures.items():
+            row = store.get(path)
+            if is_current(row, size, mtime):
+                store[path] = row[:PHASH_COLUMN] + [hashes]
+        save_metadata_store(store)
+
+
+def save_metadata_store(store):
+    """Write store atomically through a uniquely named temp file next to METADATA_FILE.
+    Callers updating the store go through merge_metadata_rows or save_phashes."""
+    fd, tmp = tempfile.mkstemp(prefix=METADATA_FILE + ".", suffix=".tmp",
+                               dir=os.path.dirname(os.path.abspath(METADATA_FILE)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(store, f)
+        os.replace(tmp, METADATA_FILE)
+    except Exception as e:
+        print(f"Error saving search metadata: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+class SearchIndexer(QObject):
+    """Builds SearchIndex objects on a worker thread.
+
+    Listings come from the per-folder scan index and trigram postings from
+    POSTINGS_DIR, so unchanged folders are neither listed nor re-indexed. The
+    text index is published first; ffprobe facets for files not in the metadata
+    store are then probed in parallel and a second index is published.
+    """
+
+    index_ready = pyqtSignal(object)        # SearchIndex
+    metadata_progress = pyqtSignal(int, int)
+
+    def __init__(self):
+        super().__init__()
+        self.index = None
+        self._folders = None
+        self._generation = 0
+
+    def ensure(self, folders):
+        """Rebuild in the background unless an index for exactly these folders exists or is being built."""
+        folders = [f for f in dict.fromkeys(folders) if f and os.path.isdir(f)]
+        if folders == self._folders:
+            return
+        self._folders = folders
+        self._generation += 1
+        gen = self._generation
+        threading.Thread(target=self._run, args=(gen, folders), daemon=True).start()
+
+    def invalidate(self):
+        self._folders = None
+
+    def _run(self, gen, folders):
+        docs = []
+        rows = []
+        parts = []
+        for folder in folders:
+            try:
+                dir_mtime_ns = os.stat(folder).st_mtime_ns
+                listing = list(iter_folder(folder))
+            except OSError as e:
+                print(f"Error indexing {folder}: {e}")
+                continue
+            if gen != self._generation:
+                return
+            names = [name for name, _ in listing]
+            saved = load_folder_postings(folder, dir_mtime_ns, names)
+            if saved is None:
+                saved = folder_postings(folder, names)
+                save_folder_postings(folder, dir_mtime_ns, names, *saved)
+            parts.append((len(docs), *saved))
+            docs.extend((os.path.join(folder, name), folder) for name in names)
+            rows.extend(row for _, row in listing)
+        store = load_metadata_store()
+        index = SearchIndex(docs, store, parts)
+        self._publish(gen, index)
+
+        # Sizes and mtimes come from the folder index, so no extra stat per file
+        stale = []
+        for (path, _), (size, mtime, _) in zip(docs, rows):
+            cached = store.get(path)
+            if not is_current(cached, size, mtime):
+                stale.append((path, size, mtime))
+        if not stale:
+            return
+        done = 0
+        updates = {}
+        with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+            for (path, size, mtime), meta in zip(stale, pool.map(lambda s: probe_search_metadata(s[0]), stale)):
+                if gen != self._generation:
+                    return
+                if meta is not None:
+                    updates[path] = [size, mtime, *meta]
+                done += 1
+                if done % 200 == 0:
+                    self.metadata_progress.emit(done, len(stale))
+        self.metadata_progress.emit(done, len(stale))
+        store = merge_metadata_rows(updates)
+        self._publish(gen, index.with_metadata(store))
+
+    def _publish(self, gen, index):
+        if gen != self._generation:
+            return
+        self.index = index
+        self.index_ready.emit(index)
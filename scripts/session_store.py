@@ -0,0 +1,246 @@
+import os
+import json
+import sqlite3
+import threading
+
+SESSION_DB = "session_data.db"
+
+# Every table is a key -> JSON value map
+TABLES = ("settings", "folders", "crop_regions", "trim_points")
+# Marker in settings once session_data.json has been imported
+LEGACY_IMPORT_KEY = "legacy_json_imported"
+
+_DELETED = object()
+
+
+class TrackedDict(dict):
+    """dict that reports every assignment and deletion to on_change(key, value).
+
+    crop_regions and trim_points are mutated directly all over the app; wrapping
+    them turns each of those writes into a single-row upsert without touching
+    the call sites. With lookup(key) -> (found, value), keys not in memory are
+    fetched on first access instead of loading the whole table up front.
+    """
+
+    def __init__(self, data, on_change, lookup=None):
+        super().__init__(data)
+        self._on_change = on_change
+        self._lookup = lookup
+
+    def _fetch(self, key):
+        if self._lookup is None or dict.__contains__(self, key):
+            return
+        found, value = self._lookup(key)
+        if found:
+            super().__setitem__(key, value)
+
+    def __contains__(self, key):
+        self._fetch(key)
+        return super().__contains__(key)
+
+    def __missing__(self, key):
+        self._fetch(key)
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        self._fetch(key)
+        return super().get(key, default)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._on_change(key, value)
+
+    def __delitem__(self, key):
+        self._fetch(key)
+        super().__delitem__(key)
+        self._on_change(key, _DELETED)
+
+    def pop(self, key, *default):
+        if key in self:  # fetches first, so the deletion reaches the store
+            value = super().pop(key)
+            self._on_change(key, _DELETED)
+            return value
+        return super().pop(key, *default)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+class SessionStore:
+    """Session state in SQLite (WAL) with per-key upserts.
+
+    put() only records the change; a writer thread with its own connection waits
+    FLUSH_DELAY for more changes to coalesce and then commits them all in one
+    transaction, so a save never blocks the GUI and never leaves a half-written
+    file behind. Reads see pending changes first.
+    """
+
+    FLUSH_DELAY = 0.5  # seconds
+
+    def __init__(self, path=SESSION_DB):
+        self.path = path
+        self._conn = self._connect()
+        with self._conn:
+            for table in TABLES:
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._pending = self._empty()
+        self._cond = threading.Condition()
+        self._urgent = False
+        self._writing = False
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _empty():
+        return {table: {} for table in TABLES}
+
+    def _has_pending(self):
+        return any(self._pending.values())
+
+    # Reads
+    def get(self, table, key, default=None):
+        found, value = self.lookup(table, key)
+        return value if found else default
+
+    def lookup(self, table, key):
+        """(found, value) for one key; a primary-key read, pending changes first."""
+        with self._cond:
+            value = self._pending[table].get(key)
+        if value is _DELETED:
+            return False, None
+        if value is None:
+            row = self._conn.execute(f"SELECT value FROM {table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            value = row[0]
+        return True, json.loads(value)
+
+    def items(self, table):
+        rows = dict(self._conn.execute(f"SELECT key, value FROM {table}"))
+        with self._cond:
+            rows.update(self._pending[table])
+        return {key: json.loads(value) for key, value in rows.items() if value is not _DELETED}
+
+    def tracked(self, table, lazy=False):
+        """The table as a TrackedDict whose writes go back to the store.
+
+        lazy=True starts empty and reads each key the first time it is asked for.
+        """
+        on_change = lambda key, value: self._record(table, key, value)
+        if lazy:
+            return TrackedDict({}, on_change, lookup=lambda key: self.lookup(table, key))
+        return TrackedDict(self.items(table), on_change)
+
+    # Writes
+    def put(self, table, key, value):
+        self._record(table, key, value)
+
+    def delete(self, table, key):
+        self._record(table, key, _DELETED)
+
+    def _record(self, table, key, value):
+        # Serialize now, so later mutation by the GUI can't race the writer thread
+        encoded = value if value is _DELETED else json.dumps(value)
+        with self._cond:
+            was_idle = not self._has_pending()
+            self._pending[table][key] = encoded
+            if was_idle:
+                self._cond.notify_all()
+
+    def flush(self, wait=True):
+        """Write pending changes now instead of after the debounce delay."""
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+            if wait:
+                while self._has_pending() or self._writing:
+                    self._cond.wait()
+
+    def close(self):
+        self.flush(wait=True)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join(timeout=5)
+        self._conn.close()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            with self._cond:
+                while not self._has_pending() and not self._closed:
+                    self._cond.wait()
+                if not self._closed and not self._urgent:
+                    # Debounce: let a burst of edits land in one transaction
+                    self._cond.wait(self.FLUSH_DELAY)
+                batch, self._pending = self._pending, self._empty()
+                self._urgent = False
+                self._writing = True
+            try:
+                if any(batch.values()):
+                    self._write(conn, batch)
+            except sqlite3.Error as e:
+                print(f"Error saving session: {e}")
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+                if self._closed and not self._has_pending():
+                    break
+        conn.close()
+
+    @staticmethod
+    def _write(conn, batch):
+        with conn:  # one atomic commit per batch
+            for table, rows in batch.items():
+                upserts = [(key, value) for key, value in rows.items() if value is not _DELETED]
+                deletes = [(key,) for key, value in rows.items() if value is _DELETED]
+                if upserts:
+                    conn.executemany(f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)", upserts)
+                if deletes:
+                    conn.executemany(f"DELETE FROM {table} WHERE key = ?", deletes)
+
+    # Migration
+    def import_json(self, json_path):
+        """One-time import of the old session_data.json. The file itself is left in place."""
+        if self.get("settings", LEGACY_IMPORT_KEY) or not os.path.exists(json_path):
+            return False
+        try:
+            with open(json_path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error: could not import {json_path}: {e}")
+            return False
+        folders = dict(data.get("folder_sessions", {}))
+        if data.get("folder_path") and "video_files" in data:
+            folders[data["folder_path"]] = data["video_files"]
+        settings = {key: data[key] for key in ("folder_path", "longest_edge", "trim_length", "grid_layout_mode") if key in data}
+        settings[LEGACY_IMPORT_KEY] = True
+        tables = {
+            "settings": settings,
+            "folders": folders,
+            "crop_regions": data.get("crop_regions", {}),
+            "trim_points": data.get("trim_points", {}),
+        }
+        with self._conn:
+            for table, rows in tables.items():
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in rows.items()]
+                )
+        print(f"Imported session from {json_path}")
+        return True
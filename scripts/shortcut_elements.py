@@ -22,6 +22,13 @@ def keyPressEvent(self, event):
             self.loader.clear_crop_region()
             self.update_status("Crop cleared")
             return
+        # --- Performance overlay on F3, Chrome trace export on Shift+F3 ---
+        elif event.key() == Qt.Key.Key_F3:
+            if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+                self.export_perf_trace()
+            else:
+                self.toggle_perf_overlay()
+            return
         # --- Trigger refresh on \ key ---
         elif event.key() == Qt.Key.Key_Backslash:
             if hasattr(self, 'loader'):
@@ -42,7 +49,6 @@ def keyPressEvent(self, event):
         elif event.key() == Qt.Key.Key_Z and event.modifiers() == Qt.KeyboardModifier.ControlModifier:
             if hasattr(self, 'undo_delete_video'):
                 self.undo_delete_video()
-                self.update_status("Undo: Restored last deleted video")
             return
             
         # --- Toggle mute with CAPSLOCK or ] key ---
@@ -64,9 +70,8 @@ def keyPressEvent(self, event):
             if hasattr(self, 'video_list') and hasattr(self, 'video_files'):
                 selected_item = self.video_list.currentItem()
                 if selected_item:
-                    video_name = selected_item.text()
-                    # Find the matching entry in video_files based on display name
-                    entry = next((e for e in self.video_files if e["display_name"] == video_name), None)
+                    # Find the entry shown in the selected row
+                    entry = self.loader.entry_at(self.video_list.row(selected_item))
                     if entry and "original_path" in entry:
                         clipboard = QApplication.clipboard()
                         clipboard.setText(entry["original_path"])
@@ -818,6 +823,12 @@ def keyPressEvent(self, event):
                 
                 self.update_status(f"Multi-video: Jumped to random positions ({len(self.multi_video_widgets)} videos)")
             
+            return
+        elif key == Qt.Key.Key_B and modifiers == Qt.KeyboardModifier.ShiftModifier and self.current_video:
+            self.exporter.preview_export()
+            return
+        elif key == Qt.Key.Key_B and modifiers == Qt.KeyboardModifier.ControlModifier:
+            self.exporter.save_export_job()
             return
         elif key == Qt.Key.Key_B and self.current_video:
             self.exporter.export_videos()
@@ -835,11 +846,15 @@ def keyPressEvent(self, event):
             self.take_screenshot()
             event.accept()
             return
+        elif key == Qt.Key.Key_C and modifiers == Qt.KeyboardModifier.ShiftModifier:
+            self.take_burst_screenshots()
+            event.accept()
+            return
         elif key == Qt.Key.Key_I and modifiers == Qt.KeyboardModifier.NoModifier:
             # Show metadata when I key is pressed
             if hasattr(self, 'current_video') and self.current_video:
                 # Get the current video entry
-                entry = next((e for e in self.video_files if e["display_name"] == self.current_video), None)
+                entry = self.loader.find_entry(self.current_video)
                 if entry:
                     # Call the display_video_metadata method to show detailed metadata
                     if hasattr(self, 'display_video_metadata'):
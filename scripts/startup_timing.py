@@ -0,0 +1,25 @@
+import time
+
+# Wall-clock breakdown of startup, printed once the first folder listing is on screen
+_start = time.perf_counter()
+_marks = []
+_reported = False
+
+
+def mark(label):
+    """Record that the startup phase ending now is called label."""
+    if not _reported:
+        _marks.append((label, time.perf_counter()))
+
+
+def report():
+    """Print each phase with its own duration and the running total (only the first call prints)."""
+    global _reported
+    if _reported or not _marks:
+        return
+    _reported = True
+    print("Startup timing:")
+    previous = _start
+    for label, t in _marks:
+        print(f"  {label:<28} {(t - previous) * 1000:8.1f} ms  (total {(t - _start) * 1000:8.1f} ms)")
+        previous = t
@@ -8,6 +8,7 @@ from PyQt6.QtGui import QFont, QPalette, QColor, QAction, QIcon
 import os
 import json
 from PyQt6.QtCore import QStandardPaths
+from scripts.video_list_view import mirror_list_widget_rules
 
 class ThemeSelector(QDialog):
     def __init__(self, parent=None):
@@ -312,7 +313,7 @@ class ThemeSelector(QDialog):
                 
                 with open(theme_file, "r") as f:
                     stylesheet = f.read()
-                    QApplication.instance().setStyleSheet(stylesheet)
+                    QApplication.instance().setStyleSheet(mirror_list_widget_rules(stylesheet))
                     if hasattr(self.parent, 'update_status'):
                         self.parent.update_status(f"Theme applied: {theme_name}")
                     # Save the current theme
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Deletes that Ctrl+Z can undo, oldest first; survives restarts
+JOURNAL_FILE = "trash_journal.json"
+JOURNAL_VERSION = 1
+MAX_BATCHES = 200  # oldest batches are dropped (their files stay in trash_backup)
+
+MOVE_ATTEMPTS = 5
+
+
+def unique_path(path, separator="__"):
+    """path, or <base><separator><n><ext> for the first n that doesn't exist."""
+    if not os.path.exists(path):
+        return path
+    base, ext = os.path.splitext(path)
+    i = 1
+    while os.path.exists(f"{base}{separator}{i}{ext}"):
+        i += 1
+    return f"{base}{separator}{i}{ext}"
+
+
+def move_file(src_path, dest_path, attempts=MOVE_ATTEMPTS):
+    """Move src_path to dest_path, retrying while the file is locked (WinError 32).
+
+    Uses os.replace on the same drive (atomic) and shutil.move across drives.
+    Returns None on success or the last error message.
+    """
+    same_drive = os.path.splitdrive(src_path)[0].lower() == os.path.splitdrive(dest_path)[0].lower()
+    error = None
+    for attempt in range(attempts):
+        try:
+            if same_drive:
+                os.replace(src_path, dest_path)
+            else:
+                shutil.move(src_path, dest_path)
+            return None
+        except FileNotFoundError as e:
+            return str(e)
+        except PermissionError as e:
+            # Likely a handle not yet closed by a decoder; wait and retry
+            error = str(e)
+            time.sleep(0.15 * (attempt + 1))
+        except OSError as e:
+            # e.g. a rename across mount points; copy instead
+            error = str(e)
+            same_drive = False
+    return error
+
+
+def move_to_trash(src_path, trash_dir):
+    """Move src_path into trash_dir as <name>, or <name>__<n> if that is taken.
+    Returns (backup_path, None) on success or (None, error)."""
+    try:
+        os.makedirs(trash_dir, exist_ok=True)
+    except OSError as e:
+        return None, str(e)
+    dest_path = unique_path(os.path.join(trash_dir, os.path.basename(src_path)))
+    error = move_file(src_path, dest_path)
+    return (None, error) if error else (dest_path, None)
+
+
+def restore_from_trash(backup_path, original_path):
+    """Move backup_path back to original_path (uniquified as <name>_<n> if a new
+    file took its place). Returns (restored_path, None) or (None, error)."""
+    if not os.path.exists(backup_path):
+        return None, f"Backup file not found: {backup_path}"
+    try:
+        os.makedirs(os.path.dirname(original_path), exist_ok=True)
+    except OSError as e:
+        return None, str(e)
+    dest_path = unique_path(original_path, separator="_")
+    error = move_file(backup_path, dest_path)
+    return (None, error) if error else (dest_path, None)
+
+
+class TrashJournal:
+    """Stack of delete batches saved to JOURNAL_FILE after every change.
+
+    A batch is a list of items {"original_path", "backup_path", "index", "entry"}:
+    where the file was, where it went, its row in the file list and its video_files
+    entry (None for files that weren't listed).
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.batches = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != JOURNAL_VERSION:
+                return []
+            return data.get("batches", [])
+        except Exception as e:
+            print(f"Error loading trash journal: {e}")
+            return []
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": JOURNAL_VERSION, "batches": self.batches}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"Error saving trash journal: {e}")
+
+    def __len__(self):
+        return len(self.batches)
+
+    def push(self, batch):
+        self.batches.append(batch)
+        del self.batches[:-MAX_BATCHES]
+        self._save()
+
+    def pop(self):
+        if not self.batches:
+            return None
+        batch = self.batches.pop()
+        self._save()
+        return batch
+
+
+class TrashWorker(QObject):
+    """Moves files to and from trash on one worker thread, in submission order.
+
+    trashed carries (moved items with their exact backup_path, failed items with
+    an "error"); restored carries (restored items with their "restored_path",
+    failed items with an "error").
+    """
+
+    trashed = pyqtSignal(list, list)
+    restored = pyqtSignal(list, list)
+
+    def __init__(self):
+        super().__init__()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def trash(self, items):
+        """items: [{"original_path", "trash_dir", ...}]; other keys are passed through."""
+        self._executor.submit(self._trash, [dict(item) for item in items])
+
+    def restore(self, batch):
+        self._executor.submit(self._restore, [dict(item) for item in batch])
+
+    def _trash(self, items):
+        moved, failed = [], []
+        for item in items:
+            backup_path, error = move_to_trash(item["original_path"], item.pop("trash_dir"))
+            if error:
+                print(f"Could not move {item['original_path']} to trash: {error}")
+                failed.append(dict(item, error=error))
+            else:
+                moved.append(dict(item, backup_path=backup_path))
+        self.trashed.emit(moved, failed)
+
+    def _restore(self, items):
+        restored, failed = [], []
+        for item in items:
+            restored_path, error = restore_from_trash(item["backup_path"], item["original_path"])
+            if error:
+                print(f"Could not restore {item['backup_path']}: {error}")
+                failed.append(dict(item, error=error))
+            else:
+                restored.append(dict(item, restored_path=restored_path))
+        self.restored.emit(restored, failed)
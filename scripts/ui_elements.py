@@ -4,13 +4,13 @@ print("ui_elements.py imported")  # DEBUG
 from PyQt6.QtWidgets import (
     QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QLineEdit, QComboBox, QListWidget,
     QCheckBox, QSpinBox, QSlider, QTreeWidget, QTreeWidgetItem, QWidget, QGridLayout,
-    QSizePolicy, QGraphicsPixmapItem, QApplication, QProgressBar
+    QSizePolicy, QGraphicsPixmapItem, QApplication, QProgressBar, QMenu
 )
 from PyQt6.QtGui import QPixmap, QPainter, QIcon, QImage
 from PyQt6.QtCore import Qt, QTimer, QSize
 from scripts.custom_graphics_view import CustomGraphicsView
 from scripts.custom_graphics_scene import CustomGraphicsScene
-from scripts.audio_editor import AudioEditor
+from scripts.video_list_view import mirror_list_widget_rules
 
 
 def initUI(self):
@@ -42,6 +42,8 @@ def initUI(self):
             
             # Swap main view widgets
             try:
+                if self.audio_mode:
+                    self.ensure_audio_editor()
                 if hasattr(self, 'graphics_view') and self.graphics_view is not None:
                     self.graphics_view.setVisible(not self.audio_mode)
                 if hasattr(self, 'audio_editor') and self.audio_editor is not None:
@@ -91,6 +93,13 @@ def initUI(self):
     self.favorite_button.clicked.connect(self.toggle_favorite_folder)
     button_layout.addWidget(self.favorite_button)
     # --- End Favorite Folder Toggle ---
+    # Library mode: every file below the favorite folders, kept current by a watcher
+    self.library_button = QPushButton("📚 Library")
+    self.library_button.setCheckable(True)
+    self.library_button.setChecked(getattr(self, 'library_mode', False))
+    self.library_button.setToolTip("List media from all favorite folders and their subfolders")
+    self.library_button.clicked.connect(self.toggle_library_mode)
+    button_layout.addWidget(self.library_button)
     folder_nav_layout.addLayout(button_layout)
 
     # Folder tree to the right of buttons
@@ -98,6 +107,7 @@ def initUI(self):
     self.folder_tree.setHeaderHidden(True)
     self.folder_tree.setMaximumHeight(150)
     self.folder_tree.itemClicked.connect(self.on_folder_tree_clicked)
+    self.folder_tree.itemExpanded.connect(self.on_folder_tree_expanded)
     folder_nav_layout.addWidget(self.folder_tree)
 
     left_panel.addLayout(folder_nav_layout)
@@ -105,7 +115,14 @@ def initUI(self):
     # Search bar
     self.search_bar = QLineEdit()
     self.search_bar.setPlaceholderText("Search audio..." if getattr(self, 'audio_mode', False) else "Search videos...")
-    self.search_bar.textChanged.connect(lambda text: self.loader.search_videos(text))
+    self.search_bar.setToolTip("Searches this folder plus favorite and recent folders.\n"
+                               "Filters: codec:h264  res:1080  width>=1920  dur<30")
+    # Debounce typing so a query runs once the user pauses
+    self.search_timer = QTimer(self)
+    self.search_timer.setSingleShot(True)
+    self.search_timer.setInterval(150)
+    self.search_timer.timeout.connect(lambda: self.loader.search_videos(self.search_bar.text()))
+    self.search_bar.textChanged.connect(lambda text: self.search_timer.start())
     left_panel.addWidget(self.search_bar)
 
     # Sorting dropdown
@@ -159,6 +176,17 @@ def initUI(self):
     self.move_av1_button.setToolTip("Scan current folder and move all AV1 videos to an 'AV1' subfolder.")
     self.move_av1_button.clicked.connect(self.on_move_av1_clicked)
     loop_av1_layout.addWidget(self.move_av1_button)
+    self.sort_media_button = QPushButton("Sort")
+    self.sort_media_button.setToolTip("Move the videos in the current folder into subfolders by codec, resolution or fps.")
+    sort_menu = QMenu(self.sort_media_button)
+    for label, key in (("By codec", "codec"), ("By resolution", "resolution"), ("By fps", "fps")):
+        sort_menu.addAction(label, lambda key=key: self.start_media_sort(key))
+    self.sort_media_button.setMenu(sort_menu)
+    loop_av1_layout.addWidget(self.sort_media_button)
+    self.find_duplicates_button = QPushButton("Dupes")
+    self.find_duplicates_button.setToolTip("Find likely duplicate videos in the library by perceptual hash. Click again to cancel.")
+    self.find_duplicates_button.clicked.connect(self.start_duplicate_scan)
+    loop_av1_layout.addWidget(self.find_duplicates_button)
     left_panel.addLayout(loop_av1_layout)
 
     # --- YouTube URL Section ---
@@ -250,6 +278,10 @@ def initUI(self):
     self.export_image_checkbox = QCheckBox("Export Image at Trim Point")
     self.export_image_checkbox.setChecked(False)
     left_panel.addWidget(self.export_image_checkbox)
+    self.burst_dedupe_checkbox = QCheckBox("Burst: Skip Near-Duplicates")
+    self.burst_dedupe_checkbox.setToolTip("Shift+C writes every frame of the highlighted loop; skip frames that look the same as the last one written")
+    self.burst_dedupe_checkbox.setChecked(True)
+    left_panel.addWidget(self.burst_dedupe_checkbox)
     
     main_layout.addLayout(left_panel, 1)
 
@@ -299,6 +331,10 @@ def initUI(self):
     self.monitoring_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
     # self.monitoring_label.setStyleSheet("font-size: 12px; color: #ECEFF4;")
     clock_monitor_layout.addWidget(self.monitoring_label, stretch=2)
+    # CPU history of this process and its ffmpeg/yt-dlp children (details in the tooltip)
+    from scripts.monitoring_status import ProcessSparkline
+    self.process_sparkline = ProcessSparkline()
+    clock_monitor_layout.addWidget(self.process_sparkline)
     self.clock_label = QLabel()
     self.clock_label.setObjectName("clock_label")
     self.clock_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
@@ -315,26 +351,14 @@ def initUI(self):
     update_clock()
 
 
-    # Periodically update system status
-    def update_monitoring():
-        try:
-            import importlib.util
-            import sys
-            import os
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            module_path = os.path.join(script_dir, 'monitoring_status.py')
-            spec = importlib.util.spec_from_file_location('monitoring_status', module_path)
-            monitoring_status = importlib.util.module_from_spec(spec)
-            sys.modules['monitoring_status'] = monitoring_status
-            spec.loader.exec_module(monitoring_status)
-            status = monitoring_status.get_monitoring_status()
-            self.monitoring_label.setText(status)
-        except Exception as e:
-            self.monitoring_label.setText(f"Monitor error: {e}")
-    self.monitoring_timer = QTimer()
-    self.monitoring_timer.timeout.connect(update_monitoring)
-    self.monitoring_timer.start(2000)  # Update every 2 seconds
-    update_monitoring()
+    # System status from one background hardware monitor. Its backend imports torch
+    # and pynvml, so it is started once the window is up.
+    from scripts.monitoring_status import HardwareMonitor, format_status
+    self.hardware_monitor = HardwareMonitor()
+    self.hardware_monitor.status_ready.connect(lambda status: self.monitoring_label.setText(format_status(status)))
+    self.hardware_monitor.status_ready.connect(self.process_sparkline.update_status)
+    self.hardware_monitor.monitor_failed.connect(lambda message: self.monitoring_label.setText(f"Monitor error: {message}"))
+    QTimer.singleShot(0, self.hardware_monitor.start)
     
     # Moved slider above the video display
     from scripts.scene_slider import SceneSlider
@@ -357,25 +381,12 @@ def initUI(self):
     self.graphics_view.installEventFilter(self)
     right_panel.addWidget(self.graphics_view, 1)
 
-    # Audio editor panel (hidden by default, appears in Audio Mode)
-    try:
-        self.audio_editor = AudioEditor(self)
-    except Exception:
-        self.audio_editor = None
-    if self.audio_editor is not None:
-        self.audio_editor.setVisible(bool(getattr(self, 'audio_mode', False)))
-        right_panel.addWidget(self.audio_editor, 1)
-        # Ensure video view visibility is opposite
-        try:
-            self.graphics_view.setVisible(not getattr(self, 'audio_mode', False))
-        except Exception:
-            pass
-        # Click-to-seek wiring
-        try:
-            if hasattr(self, 'audio_player') and self.audio_player is not None:
-                self.audio_editor.playheadSeekRequested.connect(lambda ms: self.audio_player.setPosition(int(ms)))
-        except Exception:
-            pass
+    # Audio editor panel (appears in Audio Mode). It pulls in pyqtgraph, so it is
+    # only built the first time Audio Mode is used; see ensure_audio_editor.
+    self.audio_editor = None
+    self._media_panel = right_panel
+    if getattr(self, 'audio_mode', False):
+        self.ensure_audio_editor()
     
     self.thumbnail_label = QWidget(self)
     self.thumbnail_label.setObjectName("thumbnail_label")
@@ -418,6 +429,12 @@ def initUI(self):
     self.submit_button = QPushButton("Export Cropped Videos")
     self.submit_button.clicked.connect(self.exporter.export_videos)
     button_row.addWidget(self.submit_button)
+
+    # Export preview button (renders the first second of the export in memory)
+    self.preview_export_button = QPushButton("Preview Export")
+    self.preview_export_button.setToolTip("Preview final crop/scale output and size without writing files (Shift+B)")
+    self.preview_export_button.clicked.connect(self.exporter.preview_export)
+    button_row.addWidget(self.preview_export_button)
     
     # Scene detection button
     self.detect_scenes_button = QPushButton("Detect Scenes")
@@ -514,6 +531,34 @@ def crop_rect_finalized(self, rect):
     self.check_current_video_item()
     
 
+def ensure_audio_editor(self):
+    """Build the audio editor panel on first use and return it (None if it can't be built)."""
+    if getattr(self, 'audio_editor', None) is not None:
+        return self.audio_editor
+    try:
+        from scripts.audio_editor import AudioEditor
+        self.audio_editor = AudioEditor(self)
+    except Exception as e:
+        print(f"Audio editor unavailable: {e}")
+        self.audio_editor = None
+        return None
+    # Sits right below the video view, with visibility opposite to it
+    panel = self._media_panel
+    panel.insertWidget(panel.indexOf(self.graphics_view) + 1, self.audio_editor, 1)
+    self.audio_editor.setVisible(bool(getattr(self, 'audio_mode', False)))
+    try:
+        self.graphics_view.setVisible(not getattr(self, 'audio_mode', False))
+    except Exception:
+        pass
+    # Click-to-seek wiring
+    try:
+        if hasattr(self, 'audio_player') and self.audio_player is not None:
+            self.audio_editor.playheadSeekRequested.connect(lambda ms: self.audio_player.setPosition(int(ms)))
+    except Exception:
+        pass
+    return self.audio_editor
+
+
 def open_theme_selector(self):
         """Open the theme selector dialog"""
         from scripts.theme_selector import ThemeSelector
@@ -583,7 +628,7 @@ def cycle_theme(self):
         
         if theme and os.path.exists(theme):
             with open(theme, 'r') as f:
-                QApplication.instance().setStyleSheet(f.read())
+                QApplication.instance().setStyleSheet(mirror_list_widget_rules(f.read()))
             # Update status to show current theme
             if hasattr(self, 'update_status'):
                 self.update_status(f"Theme: {theme_name}")
@@ -606,6 +651,17 @@ def toggle_fullscreen(self):
             self.showFullScreen()
             self._is_fullscreen = True
 
+def toggle_library_mode(self, checked=None):
+    """Switch between browsing one folder and the recursive library of favorite folders."""
+    self.library_mode = self.library_button.isChecked() if checked is None else bool(checked)
+    self.library_button.setChecked(self.library_mode)
+    if not self.library_mode:
+        self.loader.stop_library()
+    self.loader.load_folder_contents()
+    if self.folder_path:
+        self.update_folder_tree(self.folder_path)
+
+
 def toggle_favorite_folder(self):
     """Toggle between favorite and non-favorite folders using FolderManager"""
     if not hasattr(self, 'folder_manager'):
@@ -701,7 +757,7 @@ def update_file_count(self):
 
 def take_screenshot(self):
         # Find the current video entry (dict) by display name
-        entry = next((e for e in self.video_files if e["display_name"] == self.current_video), None)
+        entry = self.loader.find_entry(self.current_video)
         if not entry or self.pixmap_item.pixmap().isNull():
             self.update_status("No video loaded.")
             return
@@ -723,23 +779,95 @@ def take_screenshot(self):
     
 
 def on_move_av1_clicked(self):
+    self.start_media_sort("codec", match="av1", subfolder="AV1")
+
+def start_media_sort(self, key, match=None, subfolder=None):
+    """Probe and move the current folder's videos into subfolders on a worker thread."""
     from PyQt6.QtWidgets import QMessageBox
-    import os
-    try:
-        from scripts.av1_utils import move_av1_videos
-        folder = self.folder_path
-        if not folder or not os.path.isdir(folder):
-            QMessageBox.warning(self, "No Folder", "No valid folder selected.")
-            return
-        moved = move_av1_videos(folder)
-        if moved:
-            msg = f"Moved {len(moved)} AV1 videos to 'AV1' subfolder:\n" + "\n".join(moved)
-        else:
-            msg = "No AV1 videos found."
-        QMessageBox.information(self, "AV1 Move Complete", msg)
-        self.loader.load_folder_contents()  # Refresh UI
-    except Exception as e:
-        QMessageBox.critical(self, "Error", f"Failed to move AV1 videos:\n{e}")
+    folder = self.folder_path
+    if not folder or not os.path.isdir(folder):
+        QMessageBox.warning(self, "No Folder", "No valid folder selected.")
+        return
+    if getattr(self, 'media_sorter', None) is None:
+        from scripts.av1_utils import MediaSorter
+        self.media_sorter = MediaSorter()
+        self.media_sorter.progress.connect(self._on_media_sort_progress)
+        self.media_sorter.finished.connect(self._on_media_sort_finished)
+        self.media_sorter.failed.connect(self._on_media_sort_failed)
+    # Files are about to move; don't hold the current clip open (Windows file locks)
+    self.release_current_media_handles()
+    if not self.media_sorter.start(folder, key, match, subfolder):
+        self.update_status("A sort is already running.")
+        return
+    self.move_av1_button.setEnabled(False)
+    self.sort_media_button.setEnabled(False)
+    self.update_status("Probing videos...")
+
+def _on_media_sort_progress(self, phase, done, total):
+    verb = "Probing" if phase == "probe" else "Moving"
+    self.update_status(f"{verb} videos: {done}/{total}")
+
+def _finish_media_sort(self):
+    self.move_av1_button.setEnabled(True)
+    self.sort_media_button.setEnabled(True)
+    self.loader.load_folder_contents()  # Refresh UI
+
+def _on_media_sort_finished(self, moved, message):
+    from PyQt6.QtWidgets import QMessageBox
+    self._finish_media_sort()
+    self.update_status(message)
+    if moved:
+        shown = moved[:50]
+        more = f"\n... and {len(moved) - len(shown)} more" if len(moved) > len(shown) else ""
+        message = message + ":\n" + "\n".join(shown) + more
+    QMessageBox.information(self, "Sort Complete", message)
+
+def _on_media_sort_failed(self, error):
+    from PyQt6.QtWidgets import QMessageBox
+    self._finish_media_sort()
+    QMessageBox.critical(self, "Error", f"Failed to sort videos:\n{error}")
+
+def start_duplicate_scan(self):
+    """Hash the library's videos on a worker thread and list likely duplicates; clicking again cancels."""
+    from PyQt6.QtWidgets import QMessageBox
+    finder = getattr(self, 'duplicate_finder', None)
+    if finder is not None and finder.busy:
+        finder.cancel()
+        self.update_status("Cancelling duplicate scan...")
+        return
+    roots = self.loader.library_roots()
+    if not roots:
+        QMessageBox.warning(self, "No Folder", "No valid folder selected.")
+        return
+    if finder is None:
+        from scripts.duplicate_finder import DuplicateFinder
+        self.duplicate_finder = DuplicateFinder()
+        self.duplicate_finder.progress.connect(self._on_duplicate_scan_progress)
+        self.duplicate_finder.finished.connect(self._on_duplicate_scan_finished)
+        self.duplicate_finder.failed.connect(self._on_duplicate_scan_failed)
+    self.duplicate_finder.start(roots)
+    self.find_duplicates_button.setText("Cancel")
+    self.update_status("Listing videos...")
+
+def _on_duplicate_scan_progress(self, phase, done, total):
+    if phase == "list":
+        self.update_status("Listing videos...")
+        return
+    verb = "Probing" if phase == "probe" else "Hashing"
+    self.update_status(f"{verb} videos: {done}/{total}")
+
+def _on_duplicate_scan_finished(self, groups):
+    from scripts.duplicate_finder import DuplicatesDialog
+    self.find_duplicates_button.setText("Dupes")
+    cancelled = " (cancelled)" if self.duplicate_finder.cancel_requested else ""
+    self.update_status(f"Found {len(groups)} group(s) of likely duplicates{cancelled}")
+    dialog = DuplicatesDialog(self, groups, self)
+    dialog.exec()
+
+def _on_duplicate_scan_failed(self, error):
+    from PyQt6.QtWidgets import QMessageBox
+    self.find_duplicates_button.setText("Dupes")
+    QMessageBox.critical(self, "Error", f"Failed to scan for duplicates:\n{error}")
 
 def check_current_video_item(self):
     # Find the list item corresponding to the current video and mark it checked.
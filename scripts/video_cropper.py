@@ -1,22 +1,20 @@
-import sys, os, cv2, ffmpeg, json, numpy as np, re
+import sys, os, cv2
 from scripts.custom_graphics_view import CustomGraphicsView
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QFileDialog, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
-    QListWidget, QSlider, QGraphicsPixmapItem, QLineEdit, QSpinBox,
+    QSlider, QGraphicsPixmapItem, QLineEdit, QSpinBox,
     QSizePolicy, QCheckBox, QListWidgetItem, QComboBox, QMessageBox,
     QTreeWidget, QTreeWidgetItem, QGridLayout, QFrame, QScrollArea, QTabWidget
 )
 from PyQt6.QtGui import QPixmap, QImage, QPainter, QColor, QPen, QIcon, QMouseEvent, QDrag
 from PyQt6.QtCore import Qt, QTimer, QUrl, QMimeData, QPoint
 from PyQt6.QtGui import QTextOption, QTextCursor
-import shutil
 import datetime
+import threading
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtWidgets import QTextEdit, QDialog, QVBoxLayout, QPushButton
 import cv2
-import json
-import subprocess
 from datetime import datetime
 
 # Custom scene (modified to use the new crop region)
@@ -24,11 +22,13 @@ from scripts.custom_graphics_scene import CustomGraphicsScene
 
 # Import helper modules
 from scripts.video_loader import VideoLoader
+from scripts.video_list_view import VideoListView
 from scripts.video_editor import VideoEditor
 from scripts.video_exporter import VideoExporter
-from scripts.scene_detector import SceneDetector
 from scripts.folder_manager import FolderManager
 from scripts.drag_drop_helper import DragDropHelper
+from scripts import startup_timing
+from scripts import perf_trace
 
 # Import UI methods from ui_elements.py
 from scripts.ui_elements import (
@@ -40,13 +40,27 @@ from scripts.ui_elements import (
     crop_rect_finalized,
     check_current_video_item,
     toggle_favorite_folder,
+    toggle_library_mode,
     cycle_theme,
     update_file_count,
     toggle_fullscreen,
     open_theme_selector,
+    ensure_audio_editor,
     on_move_av1_clicked,
+    start_media_sort,
+    _on_media_sort_progress,
+    _finish_media_sort,
+    _on_media_sort_finished,
+    _on_media_sort_failed,
+    start_duplicate_scan,
+    _on_duplicate_scan_progress,
+    _on_duplicate_scan_finished,
+    _on_duplicate_scan_failed,
 )
 
+# Marks folder tree items whose subfolders have been listed
+FOLDER_LISTED_ROLE = Qt.ItemDataRole.UserRole.value + 1
+
 class ClickableLabel(QLabel):
     def __init__(self, parent=None, grid_index=None, click_callback=None):
         super().__init__(parent)
@@ -543,6 +557,13 @@ class VideoCropper(QWidget):
                 except Exception:
                     pass
                 self.cap = None
+            # The last decoded frame belongs to the released clip
+            if getattr(self, 'editor', None) is not None:
+                self.editor.last_frame = None
+                self.editor.last_frame_index = -1
+            # Prefetched neighbours hold open handles too
+            if getattr(self, 'clip_prefetcher', None) is not None:
+                self.clip_prefetcher.release_all()
         except Exception:
             pass
 
@@ -572,8 +593,8 @@ class VideoCropper(QWidget):
                 self.current_audio_path = path
             except Exception:
                 pass
-            # Load waveform into audio editor if present
-            if hasattr(self, 'audio_editor') and self.audio_editor is not None:
+            # Load waveform into audio editor (built on first use)
+            if self.ensure_audio_editor() is not None:
                 try:
                     self.audio_editor.load(path)
                     # Connect playhead sync once
@@ -592,8 +613,9 @@ class VideoCropper(QWidget):
             print(f"load_audio_entry error: {e}")
 
     def export_current_audio_clip(self):
-        """Export the selected trim segment to a 'Clips' subfolder beside the source file using ffmpeg.
-        Works only in Audio Mode with a loaded audio file.
+        """Export the queued regions (or the current selection) to a 'Clips' subfolder beside the source file.
+        Works only in Audio Mode with a loaded audio file. Clips are cut in a single ffmpeg pass on a
+        background worker, using stream copy when the source codec allows it.
         """
         try:
             if not getattr(self, 'audio_mode', False):
@@ -607,93 +629,101 @@ class VideoCropper(QWidget):
             if editor is None:
                 self.update_status("Waveform not available")
                 return
-            s_ms, e_ms = editor.get_trim_points()
-            if e_ms <= s_ms:
-                self.update_status("Invalid trim range")
-                return
-            # Build output path
-            import os, subprocess, shlex
-            folder = os.path.dirname(src)
-            clips_dir = os.path.join(folder, 'Clips')
-            os.makedirs(clips_dir, exist_ok=True)
-            base = os.path.splitext(os.path.basename(src))[0]
-            out_name = f"{base}_{s_ms}ms_{e_ms}ms.mp3"
-            out_path = os.path.join(clips_dir, out_name)
-            # ffmpeg command: -ss before -i for fast, and -to duration; re-encode to mp3 for compatibility
-            start_sec = s_ms / 1000.0
-            duration_sec = (e_ms - s_ms) / 1000.0
-            cmd = [
-                'ffmpeg', '-y',
-                '-ss', str(start_sec),
-                '-i', src,
-                '-t', str(duration_sec),
-                '-vn', '-acodec', 'libmp3lame', '-b:a', '192k',
-                out_path
-            ]
-            try:
-                completed = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                if completed.returncode == 0:
-                    self.update_status(f"Exported: {out_path}")
-                else:
-                    self.update_status(f"Export failed: {completed.stderr.splitlines()[-1] if completed.stderr else 'ffmpeg error'}")
-            except FileNotFoundError:
-                self.update_status("ffmpeg not found. Please install ffmpeg and ensure it's in PATH.")
+            regions = editor.queued_regions()
+            if not regions:
+                s_ms, e_ms = editor.get_trim_points()
+                if e_ms <= s_ms:
+                    self.update_status("Invalid trim range")
+                    return
+                regions = [(s_ms, e_ms)]
+            self._get_audio_clip_exporter().submit(src, regions)
+            editor.clear_regions()
+            self.update_status(f"Queued export of {len(regions)} clip(s) from {os.path.basename(src)}")
         except Exception as e:
             print(f"export_current_audio_clip error: {e}")
 
-    def move_path_to_trash(self, src_path: str, trash_dir: str) -> bool:
-        """Move the given file to trash_dir safely on Windows.
-        - Ensures media handles are released first
-        - Uses os.replace for same-drive atomic move when possible
-        - Falls back to shutil.move
-        - Retries a few times to avoid transient WinError 32
-        Returns True on success, False otherwise.
-        """
-        import os
-        import shutil
-        import time
-        import gc
-        try:
-            # Release any open handles that could lock src_path
-            self.release_current_media_handles()
-            gc.collect()
-            os.makedirs(trash_dir, exist_ok=True)
-            filename = os.path.basename(src_path)
-            dest_path = os.path.join(trash_dir, filename)
-
-            # If destination exists, generate a unique name
-            if os.path.exists(dest_path):
-                base, ext = os.path.splitext(filename)
-                i = 1
-                while True:
-                    candidate = f"{base}__{i}{ext}"
-                    cand_path = os.path.join(trash_dir, candidate)
-                    if not os.path.exists(cand_path):
-                        dest_path = cand_path
-                        break
-                    i += 1
-
-            # Same-drive detection
-            same_drive = os.path.splitdrive(src_path)[0].lower() == os.path.splitdrive(dest_path)[0].lower()
-            attempts = 5
-            for attempt in range(attempts):
-                try:
-                    if same_drive:
-                        os.replace(src_path, dest_path)
-                    else:
-                        shutil.move(src_path, dest_path)
-                    return True
-                except PermissionError:
-                    # Likely WinError 32; wait and retry
-                    time.sleep(0.15 * (attempt + 1))
-                    self.release_current_media_handles()
-                    gc.collect()
-                except Exception as e:
-                    # On other errors, retry a couple of times then give up
-                    time.sleep(0.1 * (attempt + 1))
-            return False
-        except Exception:
-            return False
+    def _get_audio_clip_exporter(self):
+        if getattr(self, 'audio_clip_exporter', None) is None:
+            from scripts.audio_exporter import AudioClipExporter
+            self.audio_clip_exporter = AudioClipExporter()
+            self.audio_clip_exporter.status_changed.connect(self.update_status)
+            self.audio_clip_exporter.job_finished.connect(
+                lambda success, message, paths: self.update_status(message)
+            )
+        return self.audio_clip_exporter
+
+    def propose_audio_segments(self):
+        """Show auto-detected non-silent spans of the current audio file as candidate regions."""
+        editor = getattr(self, 'audio_editor', None)
+        if not getattr(self, 'audio_mode', False) or editor is None:
+            return
+        if editor.candidate_segments():
+            editor.clear_candidates()
+            self.update_status("Cleared proposed segments")
+            return
+        count = editor.propose_segments()
+        if count:
+            self.update_status(f"Proposed {count} segment(s) - Shift+P to queue them, B to export")
+        else:
+            self.update_status("No segments found (waveform may still be loading)")
+
+    def analyze_folder_audio(self):
+        """Detect segments in every audio file of the current list and export them as clips.
+        Analysis runs in a process pool; exports go through the background clip exporter."""
+        if not getattr(self, 'audio_mode', False) or not self.video_files:
+            return
+        analyzer = getattr(self, 'segment_analyzer', None)
+        if analyzer is not None and analyzer.is_running():
+            analyzer.cancel()
+            self.update_status("Cancelling segment analysis...")
+            return
+        paths = [v["original_path"] for v in self.video_files]
+        reply = QMessageBox.question(
+            self, "Auto-clip Folder",
+            f"Detect non-silent segments in {len(paths)} file(s) and export each as clips?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        if analyzer is None:
+            from scripts.audio_segments import SegmentAnalyzer
+            analyzer = self.segment_analyzer = SegmentAnalyzer()
+            analyzer.file_analyzed.connect(self._on_audio_file_analyzed)
+            analyzer.progress.connect(lambda done, total: self.update_status(f"Analyzed {done}/{total} files"))
+            analyzer.finished.connect(
+                lambda results: self.update_status(
+                    f"Segment analysis done: {sum(len(v) for v in results.values())} clip(s) from {len(results)} file(s)"
+                )
+            )
+        analyzer.analyze_async(paths)
+        self.update_status(f"Analyzing {len(paths)} file(s)...")
+
+    def _on_audio_file_analyzed(self, path, segments):
+        if segments:
+            self._get_audio_clip_exporter().submit(path, segments)
+
+    def queue_current_audio_region(self):
+        """Add the current trim selection to the batch of regions exported by the next export."""
+        editor = getattr(self, 'audio_editor', None)
+        if not getattr(self, 'audio_mode', False) or editor is None:
+            return
+        region = editor.add_region()
+        if region is None:
+            self.update_status("Selection already queued or empty")
+            return
+        count = len(editor.queued_regions())
+        self.update_status(f"Queued region {region[0]}ms-{region[1]}ms ({count} queued)")
+
+    def get_trash_worker(self):
+        """Background mover shared by Delete, the duplicates dialog and Ctrl+Z; created on first use
+        together with the undo journal (trash_journal.json), so Ctrl+Z works across restarts."""
+        if getattr(self, 'trash_worker', None) is None:
+            from scripts.trash_journal import TrashJournal, TrashWorker
+            self.trash_journal = TrashJournal()
+            self.trash_worker = TrashWorker()
+            self.trash_worker.trashed.connect(self._on_files_trashed)
+            self.trash_worker.restored.connect(self._on_files_restored)
+        return self.trash_worker
 
     def _sync_audio_position(self):
         """Sync audio position to current OpenCV frame position in ms."""
@@ -709,6 +739,7 @@ class VideoCropper(QWidget):
                 drift = abs(current_ms - ms)
                 from time import monotonic
                 now = monotonic()
+                perf_trace.gauge("audio.drift_ms", current_ms - ms)
                 if drift > 200 and (now - self._last_audio_sync_ts) > 0.25:
                     self.audio_player.setPosition(ms)
                     self._last_audio_sync_ts = now
@@ -772,28 +803,32 @@ class VideoCropper(QWidget):
             return
             
         # Get the current video entry
-        entry = next((e for e in self.video_files if e["display_name"] == self.current_video), None)
+        entry = self.loader.find_entry(self.current_video)
         if not entry:
             self.update_status("Could not find current video entry.")
             return
             
-        # Check if we have a valid pixmap
-        if not hasattr(self, 'pixmap_item') or not hasattr(self.pixmap_item, 'pixmap') or self.pixmap_item.pixmap().isNull():
+        editor = getattr(self, 'editor', None)
+        frame = getattr(editor, 'last_frame', None)
+        if frame is None and not getattr(self, 'cap', None):
             self.update_status("No video frame available.")
             return
             
         try:
-            from scripts.screenshot_helper import save_video_screenshot
+            from scripts.screenshot_helper import save_frame_screenshot
             
-            # Save the screenshot
-            result = save_video_screenshot(
+            # Full resolution from the last decoded frame (re-decoded in the worker if there is none)
+            frame_index = -1
+            if frame is None:
+                frame_index = max(0, int(self.cap.get(cv2.CAP_PROP_POS_FRAMES)) - 1)
+            result = save_frame_screenshot(
                 entry=entry,
-                pixmap=self.pixmap_item.pixmap(),
-                crop_regions=getattr(self, 'crop_regions', {}),
-                original_width=getattr(self, 'original_width', 0),
-                original_height=getattr(self, 'original_height', 0),
-                current_video=self.current_video,
-                folder_path=self.folder_path if hasattr(self, 'folder_path') else os.getcwd()
+                frame=frame,
+                crop_region=getattr(self, 'crop_regions', {}).get(self.current_video),
+                folder_path=self.folder_path if hasattr(self, 'folder_path') else os.getcwd(),
+                fmt=getattr(self, 'screenshot_format', 'jpg'),
+                video_path=entry["original_path"],
+                frame_index=frame_index,
             )
             
             if result:
@@ -806,6 +841,42 @@ class VideoCropper(QWidget):
             import traceback
             print(f"Screenshot error: {traceback.format_exc()}")
 
+    def take_burst_screenshots(self):
+        """Write every frame of the highlighted loop at full resolution; pressed again, cancel."""
+        burst = getattr(self, 'burst_capture', None)
+        if burst is not None and burst.busy:
+            burst.cancel()
+            self.update_status("Cancelling burst...")
+            return
+        entry = self.loader.find_entry(self.current_video)
+        if not entry:
+            self.update_status("No video loaded.")
+            return
+        if burst is None:
+            from scripts.screenshot_helper import BurstCapture
+            burst = self.burst_capture = BurstCapture()
+            burst.progress.connect(lambda done, total: self.update_status(f"Burst: {done}/{total} frames"))
+            burst.finished.connect(self._on_burst_finished)
+            burst.failed.connect(lambda error: self.update_status(f"Burst failed: {error}"))
+        start = self.trim_points.get(self.current_video, 0)
+        count = max(1, min(self.trim_length, self.frame_count - start))
+        dedupe = getattr(self, 'burst_dedupe_checkbox', None)
+        burst.start(
+            entry,
+            entry["original_path"],
+            start,
+            count,
+            self.crop_regions.get(self.current_video),
+            self.folder_path,
+            fmt=self.screenshot_format,
+            dedupe_distance=self.burst_dedupe_distance if dedupe is None or dedupe.isChecked() else None,
+        )
+        self.update_status(f"Burst: frames {start}-{start + count - 1}...")
+
+    def _on_burst_finished(self, written, skipped, folder):
+        skipped_text = f", {skipped} near-duplicates skipped" if skipped else ""
+        self.update_status(f"Burst: {written} stills written to {os.path.basename(folder)}{skipped_text}")
+
     export_in_progress = False  # Class-level flag to prevent duplicate exports
     def __init__(self):
         print("VideoCropper __init__ starting")  # DEBUG
@@ -881,6 +952,10 @@ class VideoCropper(QWidget):
         
         # New property for simple caption text.
         self.simple_caption = ""
+        # Screenshot still format (C key): 'jpg', 'png' or 'webp'
+        self.screenshot_format = "jpg"
+        # Burst (Shift+C): perceptual-hash bits within which a frame counts as a near-duplicate
+        self.burst_dedupe_distance = 4
         
         # Add video state tracking like gui-videotrim
         self.current_video_index = -1  # Start at -1 like gui-videotrim
@@ -891,7 +966,7 @@ class VideoCropper(QWidget):
         self.video_delay = 33
         
         # UI widgets
-        self.video_list = QListWidget()
+        self.video_list = VideoListView()
         
         # Setup drag-drop for video list
         self._setup_video_list_drag_drop()
@@ -937,8 +1012,9 @@ class VideoCropper(QWidget):
         
         # Drag and drop system for grid rearrangement
 
-        # Load previous session.
+        # Load previous session (only the last folder's state; the rest is read on demand).
         self.loader.load_session()
+        startup_timing.mark("session loaded")
         
         # Set initial folder path from FolderManager
         if not self.folder_path or not os.path.exists(self.folder_path) or not os.path.isdir(self.folder_path):
@@ -950,13 +1026,15 @@ class VideoCropper(QWidget):
         if hasattr(self, 'trim_spin'):
             self.trim_spin.setValue(113)
         print("Restored folder_path:", self.folder_path)  # Debug print
+        # Remove truncated .partial encodes left behind by a crash or cancel, off the startup path
+        if self.folder_path:
+            threading.Thread(target=self.exporter.sweep_orphaned_partials, args=(self.folder_path,), daemon=True).start()
 
-        # If a folder was remembered, load its contents now.
+        # If a folder was remembered, scan it once the window is up.
         if self.folder_path:
-            self.loader.load_folder_contents()
+            QTimer.singleShot(0, self.loader.load_folder_contents)
         self.initUI()
-        print("After initUI")  # DEBUG
-        self.deleted_clips_stack = []  # Initialize an empty stack for deleted videos
+        startup_timing.mark("UI built")
         # Ensure default sort is 'Date (new first)' on startup (after UI is built)
         self.sort_dropdown.setCurrentIndex(0)
         if self.video_files:
@@ -965,23 +1043,6 @@ class VideoCropper(QWidget):
         # Auto-highlight and expand the starting folder in the folder tree
         if self.folder_path:
             self.update_folder_tree(self.folder_path)
-            def select_folder_item(tree, target_path):
-                def recurse(item):
-                    if item.data(0, Qt.ItemDataRole.UserRole) == target_path:
-                        tree.setCurrentItem(item)
-                        item.setSelected(True)
-                        parent = item.parent()
-                        while parent:
-                            parent.setExpanded(True)
-                            parent = parent.parent()
-                        return True
-                    for i in range(item.childCount()):
-                        if recurse(item.child(i)):
-                            return True
-                for i in range(tree.topLevelItemCount()):
-                    if recurse(tree.topLevelItem(i)):
-                        break
-            select_folder_item(self.folder_tree, self.folder_path)
 
         # New multi-video mode attributes
         self.multi_target_fps = 16
@@ -1002,11 +1063,8 @@ class VideoCropper(QWidget):
         if self.folder_path:
             self.update_file_count()
             
-        # Initialize scene detection
-        self.scene_detector = SceneDetector()
-        self.scene_detector.progress_updated.connect(self.on_scene_detection_progress)
-        self.scene_detector.scenes_detected.connect(self.on_scenes_detected)
-        self.scene_detector.detection_finished.connect(self.on_scene_detection_finished)
+        # Scene detection (the detector is built on first use, see get_scene_detector)
+        self.scene_detector = None
         self.current_scenes = []  # Store scenes for current video
         self.scene_detection_in_progress = False  # Track if detection is running
         self.scene_detection_stop_requested = False  # Track if stop was requested
@@ -1045,9 +1103,8 @@ class VideoCropper(QWidget):
                 # Get the item at the drag start position
                 item = self.video_list.itemAt(self._drag_start_pos)
                 if item:
-                    # Find the corresponding video entry
-                    video_name = item.text()
-                    entry = next((e for e in self.video_files if e["display_name"] == video_name), None)
+                    # Find the entry shown in that row
+                    entry = self.loader.entry_at(self.video_list.row(item))
                     
                     if entry:
                         file_path = entry["original_path"]
@@ -1169,6 +1226,13 @@ class VideoCropper(QWidget):
 
     def closeEvent(self, event):
         self.loader.save_session()
+        self.loader.close_session()
+        if getattr(self, 'media_info_cache', None) is not None:
+            self.media_info_cache.flush()
+        if getattr(self, 'dir_lister', None) is not None:
+            self.dir_lister.flush()
+        if getattr(self, 'hardware_monitor', None) is not None:
+            self.hardware_monitor.stop()
         event.accept()
 
     def update_status(self, message):
@@ -1697,6 +1761,10 @@ class VideoCropper(QWidget):
         if not self.multi_mode or not self.multi_caps:
             self.multi_timer.stop()
             return
+        with perf_trace.span("multi.tick"):
+            self._multi_advance_frames()
+
+    def _multi_advance_frames(self):
         # Only update/redraw changed slots
         for i in range(len(self.multi_caps)):
             if self.multi_finished[i]:
@@ -1792,192 +1860,256 @@ class VideoCropper(QWidget):
 
 
     def delete_selected_video(self):
-        selected_row = self.video_list.currentRow()
-        selected_item = self.video_list.currentItem()
-        if not selected_item:
-            return
-        video_name = selected_item.text()
-        # Find the matching entry in video_files based on display name.
-        entry = next((e for e in self.video_files if e["display_name"] == video_name), None)
-        if not entry:
+        """Move the selected video, or every Ctrl+clicked video in multi mode, to the
+        trash_backup folder next to it."""
+        if self.multi_mode and self.multi_selected_indices:
+            rows = sorted(set(self.multi_selected_indices))
+        else:
+            rows = [self.video_list.currentRow()]
+        entries = [self.loader.entry_at(row) for row in rows]
+        # Copies of a clip share its file; move each file once
+        paths = list(dict.fromkeys(e["original_path"] for e in entries if e is not None))
+        if not paths:
             return
-        original_path = entry["original_path"]
-        base_folder = self.folder_path if self.folder_path else os.getcwd()
-        backup_folder = os.path.join(base_folder, "trash_backup")
-        os.makedirs(backup_folder, exist_ok=True)
-        backup_path = os.path.join(backup_folder, os.path.basename(original_path))
-        try:
-            # Fully release any media locks (OpenCV/QMediaPlayer)
-            self.release_current_media_handles()
-            # Perform safe move to trash (atomic rename on same drive)
-            moved = self.move_path_to_trash(original_path, backup_folder)
-            if not moved:
-                self.update_status("Move to trash failed (file may be locked)")
-                return
-            # Record backup path actually used (may be uniquified)
-            backup_path = os.path.join(backup_folder, os.path.basename(original_path))
-            if not os.path.exists(backup_path):
-                # If helper uniquified the name, resolve by scanning
-                base = os.path.basename(original_path)
-                name, ext = os.path.splitext(base)
-                candidates = [f for f in os.listdir(backup_folder) if f.startswith(name) and f.endswith(ext)]
-                if candidates:
-                    candidates.sort()
-                    backup_path = os.path.join(backup_folder, candidates[-1])
-            self.deleted_clips_stack.append({
-                "entry": entry,
-                "backup_path": backup_path,
-                "original_path": original_path,
-                "index": selected_row
-            })
-            self.video_files.remove(entry)
-            self.video_list.takeItem(selected_row)
-            self.update_file_count()
-            self.update_status(f"Deleted {video_name} and moved to backup.")
+        self.trash_files([(path, os.path.join(os.path.dirname(path), "trash_backup")) for path in paths])
 
-            # --- Select and preview the correct next item after deletion ---
-            count = self.video_list.count()
-            if count > 0:
-                # If we deleted the last item, move selection up, else stay at same index
-                next_row = min(selected_row, count - 1)
-                self.video_list.setCurrentRow(next_row)
-                # Force load the video at the new row
-                item = self.video_list.item(next_row)
-                if item:
-                    self.loader.load_video(item)
-                    self.current_video_index = next_row
-            else:
-                self.current_video = None  # No videos left
-        except Exception as e:
-            print(f"Error deleting file: {e}")
-            
-    def undo_delete_video(self):
-        """Restore the most recently deleted video from trash_backup"""
-        if not self.deleted_clips_stack:
-            print("No deleted videos to restore")
+    def trash_files(self, moves):
+        """Move [(path, trash_dir)] to trash on the trash worker.
+
+        Listed files leave the file list right away and come back if their move
+        fails; the batch is journaled for Ctrl+Z once the worker reports the exact
+        backup paths. Nothing here waits on the file system.
+        """
+        listed = self.loader.listed_entries()
+        rows = {}
+        for row, entry in enumerate(listed):
+            rows.setdefault(entry["original_path"], []).append(row)
+        items = []
+        for path, trash_dir in moves:
+            path_rows = rows.get(path, [])
+            items.append({
+                "original_path": path,
+                "trash_dir": trash_dir,
+                "entry": listed[path_rows[0]] if path_rows else None,
+                "index": path_rows[0] if path_rows else None,
+            })
+        if not items:
             return
-            
-        deleted_info = self.deleted_clips_stack.pop()
-        backup_path = deleted_info["backup_path"]
-        original_path = deleted_info["original_path"]
-        original_index = deleted_info["index"]
-        entry = deleted_info["entry"]
-        
-        try:
-            # Restore the file from backup
-            if os.path.exists(backup_path):
-                # Make sure the directory exists
-                os.makedirs(os.path.dirname(original_path), exist_ok=True)
-                shutil.move(backup_path, original_path)
-                
-                # Re-add to video_files and video_list
-                self.video_files.insert(original_index, entry)
-                self.video_list.insertItem(original_index, entry["display_name"])
-                self.update_file_count()
-                
-                # Select and load the restored video
-                self.video_list.setCurrentRow(original_index)
-                self.loader.load_video(self.video_list.item(original_index))
-                print(f"Restored {os.path.basename(original_path)} from trash")
-            else:
-                print(f"Backup file not found: {backup_path}")
-                
-        except Exception as e:
-            print(f"Error restoring video: {e}")
-            # Add back to stack if restore failed
-            self.deleted_clips_stack.append(deleted_info)
+        trashed = {item["original_path"] for item in items}
+        # Fully release any media locks (OpenCV/QMediaPlayer, prefetched neighbours, grid cells)
+        self.release_current_media_handles()
+        if self.multi_mode:
+            self.multi_mode = False
+            self.multi_selected_indices = []
+            self._teardown_multi_mode()
+        current_row = self.video_list.currentRow()
+        # Every row showing a trashed file goes, copies of a clip included
+        removed_rows = sorted(row for path in trashed for row in rows.get(path, []))
+        for row in reversed(removed_rows):
+            self.video_list.takeItem(row)
+        self.video_files[:] = [e for e in self.video_files if e["original_path"] not in trashed]
+        if getattr(self, 'filtered_video_files', None) is not None:
+            self.filtered_video_files[:] = [e for e in self.filtered_video_files if e["original_path"] not in trashed]
+        self.update_file_count()
+        self.get_trash_worker().trash(items)
+        names = ", ".join(os.path.basename(item["original_path"]) for item in items[:3])
+        more = f" and {len(items) - 3} more" if len(items) > 3 else ""
+        self.update_status(f"Moving {names}{more} to backup...")
+
+        # --- Select and preview the correct next item after deletion ---
+        count = self.video_list.count()
+        if count == 0:
+            self.current_video = None  # No videos left
+            return
+        if current_row < 0:
+            return
+        # Stay on the same clip if it wasn't deleted, else on the row that took its place
+        removed_above = sum(1 for row in removed_rows if row < current_row)
+        next_row = min(current_row - removed_above, count - 1)
+        self.video_list.setCurrentRow(next_row)
+        item = self.video_list.item(next_row)
+        if item:
+            self.loader.load_video(item)
+            self.current_video_index = next_row
+
+    def _on_files_trashed(self, moved, failed):
+        if moved:
+            self.trash_journal.push([
+                {key: item[key] for key in ("original_path", "backup_path", "index", "entry")} for item in moved
+            ])
+        if failed:
+            self._reinsert_trash_items(failed)
+            self.update_status(f"Move to trash failed for {len(failed)} file(s) (file may be locked)")
+        elif len(moved) == 1:
+            self.update_status(f"Deleted {os.path.basename(moved[0]['original_path'])} and moved to backup.")
+        elif moved:
+            self.update_status(f"Deleted {len(moved)} files and moved them to backup.")
 
     def undo_delete_video(self):
-        if not self.deleted_clips_stack:
+        """Restore the most recent delete batch from trash_backup (also after a restart)."""
+        self.get_trash_worker()
+        batch = self.trash_journal.pop()
+        if batch is None:
+            self.update_status("Nothing to undo")
             return
-        last_deleted = self.deleted_clips_stack.pop()
-        entry = last_deleted["entry"]
-        backup_path = last_deleted["backup_path"]
-        original_path = entry["original_path"]
-        try:
-            shutil.move(backup_path, original_path)
-            self.video_files.append(entry)
-            self.add_video_item(entry["display_name"])
-            self.update_file_count()
-            print(f"Restored {entry['display_name']} from backup.")
-        except Exception as e:
-            print(f"Error restoring file: {e}")
+        self.trash_worker.restore(batch)
+        self.update_status(f"Restoring {len(batch)} file(s)...")
+
+    def _on_files_restored(self, restored, failed):
+        # Keep what can still be retried; a missing backup can't be restored later either
+        retry = [item for item in failed if os.path.exists(item["backup_path"])]
+        if retry:
+            self.trash_journal.push([{k: v for k, v in item.items() if k != "error"} for item in retry])
+        for item in restored:
+            path = item["restored_path"]
+            if path != item["original_path"] and item["entry"] is not None:
+                # Keep the folder part of library and search names
+                display_name = os.path.join(os.path.dirname(item["entry"]["display_name"]), os.path.basename(path))
+                item["entry"] = dict(item["entry"], original_path=path, display_name=display_name)
+        row = self._reinsert_trash_items(restored)
+        if row is not None:
+            # Select and load the restored video
+            self.video_list.setCurrentRow(row)
+            self.loader.load_video(self.video_list.item(row))
+            self.current_video_index = row
+        if failed:
+            self.update_status(f"Could not restore {len(failed)} file(s): {failed[0]['error']}")
+        elif restored:
+            self.update_status(f"Restored {', '.join(os.path.basename(i['restored_path']) for i in restored[:3])}"
+                               + (f" and {len(restored) - 3} more" if len(restored) > 3 else "") + " from trash")
+
+    def _is_listed_folder(self, folder):
+        folder = os.path.normcase(os.path.abspath(folder))
+        if getattr(self, 'library_mode', False):
+            for root in self.loader.library_roots():
+                root = os.path.normcase(os.path.abspath(root))
+                if folder == root or folder.startswith(root.rstrip(os.sep) + os.sep):
+                    return True
+            return False
+        return bool(self.folder_path) and folder == os.path.normcase(os.path.abspath(self.folder_path))
+
+    def _reinsert_trash_items(self, items):
+        """Put the files of items (trash journal items) back into video_files and the
+        file list at their old rows, if their folder is the one listed now; while
+        search results are shown they go back into those too.
+        Returns the row of the last one inserted, or None."""
+        from scripts.folder_scanner import make_entry
+        listed = self.loader.listed_entries()
+        known = {e["original_path"] for e in self.video_files}
+        last_row = None
+        for item in sorted(items, key=lambda item: item["index"] if item["index"] is not None else 1 << 30):
+            path = item.get("restored_path") or item["original_path"]
+            folder = os.path.dirname(path)
+            if path in known or not self._is_listed_folder(folder):
+                continue
+            entry = item["entry"]
+            if entry is None:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entry = make_entry(folder, os.path.basename(path), [st.st_size, st.st_mtime, st.st_ctime])
+            count = self.video_list.count()
+            row = min(item["index"], count) if item["index"] is not None else count
+            self.video_files.insert(min(row, len(self.video_files)), entry)
+            if listed is not self.video_files:
+                listed.insert(row, entry)
+            self.video_list.insertItem(row, entry["display_name"], entry.get("export_enabled", False))
+            known.add(path)
+            last_row = row
+        self.update_file_count()
+        return last_row
+
+    def get_dir_lister(self):
+        """Background subfolder lister shared by the folder tree and library mode."""
+        if getattr(self, 'dir_lister', None) is None:
+            from scripts.library_index import DirectoryLister
+            self.dir_lister = DirectoryLister()
+            self.dir_lister.listed.connect(self._on_subfolders_listed)
+        return self.dir_lister
+
+    def _make_folder_item(self, name, path):
+        item = QTreeWidgetItem([name])
+        item.setData(0, Qt.ItemDataRole.UserRole, path)
+        # Children are unknown until the item is expanded
+        item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+        self._folder_items[path] = item
+        return item
 
     def update_folder_tree(self, current_path):
-        """Update the folder tree view to show parent, siblings, current, and subfolders.
-        The current folder is shown inline with its siblings, with its subfolders as children."""
-        import os
-        from PyQt6.QtWidgets import QTreeWidgetItem
+        """Update the folder tree view to show parent, siblings, current, and subfolders
+        (or the library roots in library mode). Subfolders are listed on a worker thread
+        when an item is first expanded, so the GUI never waits on a directory listing."""
         self.folder_tree.clear()
-        parent_path = os.path.dirname(current_path)
-        current_basename = os.path.basename(current_path)
+        self._folder_items = {}
+        self._folder_tree_target = current_path
+        self.get_dir_lister()
 
-        # If we're at root level, just show current directory and its subfolders
-        if not parent_path or parent_path == current_path:
-            root_item = QTreeWidgetItem([current_basename])
-            root_item.setData(0, Qt.ItemDataRole.UserRole, current_path)
-            self.folder_tree.addTopLevelItem(root_item)
-            self.folder_tree.setCurrentItem(root_item)
-            
-            # Add subfolders
-            try:
-                for entry in os.scandir(current_path):
-                    if entry.is_dir():
-                        child_item = QTreeWidgetItem([entry.name])
-                        child_item.setData(0, Qt.ItemDataRole.UserRole, entry.path)
-                        root_item.addChild(child_item)
-            except Exception as e:
-                print(f"Error listing subfolders: {e}")
-            root_item.setExpanded(True)
+        if getattr(self, 'library_mode', False):
+            for root in self.loader.library_roots():
+                self.folder_tree.addTopLevelItem(self._make_folder_item(os.path.basename(root) or root, root))
             return
 
-        # For non-root directories, show parent with all siblings (including current)
-        parent_item = QTreeWidgetItem(['..'])
-        parent_item.setData(0, Qt.ItemDataRole.UserRole, parent_path)
-        
-        # Add all sibling folders (including current) as children of parent
-        current_item = None
-        try:
-            # First pass: add all items
-            for entry in os.scandir(parent_path):
-                if entry.is_dir():
-                    sibling_item = QTreeWidgetItem([entry.name])
-                    sibling_item.setData(0, Qt.ItemDataRole.UserRole, entry.path)
-                    
-                    # If this is the current folder, add its subfolders and store reference
-                    if entry.path == current_path:
-                        current_item = sibling_item
-                        try:
-                            for sub_entry in os.scandir(entry.path):
-                                if sub_entry.is_dir():
-                                    child_item = QTreeWidgetItem([sub_entry.name])
-                                    child_item.setData(0, Qt.ItemDataRole.UserRole, sub_entry.path)
-                                    sibling_item.addChild(child_item)
-                        except Exception as e:
-                            print(f"Error listing subfolders: {e}")
-                    
-                    parent_item.addChild(sibling_item)
-        except Exception as e:
-            print(f"Error listing siblings: {e}")
-        
-        self.folder_tree.addTopLevelItem(parent_item)
-        
-        # Expand parent and current folder, and ensure current folder is selected and visible
-        parent_item.setExpanded(True)
-        if current_item:
-            current_item.setExpanded(True)  # Ensure current folder is expanded
+        parent_path = os.path.dirname(current_path)
+        if not parent_path or parent_path == current_path:
+            # At root level, just show current directory and its subfolders
+            top_item = self._make_folder_item(os.path.basename(current_path) or current_path, current_path)
+            self.folder_tree.addTopLevelItem(top_item)
+            self.folder_tree.setCurrentItem(top_item)
+        else:
+            # Parent with all siblings (including current); current is expanded once listed
+            top_item = self._make_folder_item('..', parent_path)
+            self.folder_tree.addTopLevelItem(top_item)
+        top_item.setExpanded(True)
+
+    def on_folder_tree_expanded(self, item):
+        if item.data(0, FOLDER_LISTED_ROLE):
+            return
+        path = item.data(0, Qt.ItemDataRole.UserRole)
+        cached = self.dir_lister.cached(path)
+        if cached is not None:
+            # Show the last known listing right away; the refresh below corrects it
+            self._fill_folder_item(item, cached)
+        self.dir_lister.request(path)
+
+    def _on_subfolders_listed(self, path, names):
+        item = getattr(self, '_folder_items', {}).get(path)
+        if item is not None:
+            self._fill_folder_item(item, names)
+
+    def _forget_folder_items(self, item):
+        for i in range(item.childCount()):
+            child = item.child(i)
+            self._forget_folder_items(child)
+            self._folder_items.pop(child.data(0, Qt.ItemDataRole.UserRole), None)
+
+    def _fill_folder_item(self, item, names):
+        path = item.data(0, Qt.ItemDataRole.UserRole)
+        item.setData(0, FOLDER_LISTED_ROLE, True)
+        if [item.child(i).text(0) for i in range(item.childCount())] != names:
+            self._forget_folder_items(item)
+            item.takeChildren()
+            for name in names:
+                item.addChild(self._make_folder_item(name, os.path.join(path, name)))
+        if not names:
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicatorWhenChildless)
+        # Select and open the current folder once it appears
+        current_item = self._folder_items.get(self._folder_tree_target)
+        if current_item is not None and current_item.parent() is item:
             self.folder_tree.setCurrentItem(current_item)
+            current_item.setExpanded(True)
             self.folder_tree.scrollToItem(current_item)
-            
-            # Force update the tree widget to ensure expansion is visible
-            self.folder_tree.update()
-            QApplication.processEvents()
 
 
     def on_folder_tree_clicked(self, item, column):
         """Handle folder selection from the tree view"""
         folder_path = item.data(0, Qt.ItemDataRole.UserRole)
         if folder_path and os.path.exists(folder_path):
+            if getattr(self, 'library_mode', False):
+                # Picking a folder browses just that folder
+                self.library_mode = False
+                self.library_button.setChecked(False)
+                self.loader.stop_library()
             self.folder_path = folder_path
             self.loader.folder_path = folder_path
             # If this is not the parent directory (..), expand it to show subfolders
@@ -1996,6 +2128,35 @@ class VideoCropper(QWidget):
         if hasattr(self, 'multi_timer'):
             self.multi_timer.setInterval(1000 // self.multi_target_fps)
             
+    def toggle_perf_overlay(self):
+        """F3: switch timing spans on together with the on-screen overlay, or both off."""
+        if getattr(self, 'perf_overlay', None) is None:
+            from scripts.perf_overlay import PerfOverlay
+            self.perf_overlay = PerfOverlay(self.graphics_view)
+        active = not self.perf_overlay.isVisible()
+        perf_trace.set_enabled(active)
+        self.perf_overlay.set_active(active)
+        self.update_status("Performance overlay on" if active else "Performance overlay off")
+
+    def export_perf_trace(self):
+        """Shift+F3: write the recorded spans as Chrome trace JSON into the working directory."""
+        path = os.path.abspath(f"sharkbit_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            n = perf_trace.export_chrome_trace(path)
+        except OSError as e:
+            self.update_status(f"Trace export failed: {e}")
+            return
+        self.update_status(f"Wrote {n} trace events to {path}" if n else "No trace recorded yet (F3 starts tracing)")
+
+    def get_scene_detector(self):
+        if self.scene_detector is None:
+            from scripts.scene_detector import SceneDetector
+            self.scene_detector = SceneDetector()
+            self.scene_detector.progress_updated.connect(self.on_scene_detection_progress)
+            self.scene_detector.scenes_detected.connect(self.on_scenes_detected)
+            self.scene_detector.detection_finished.connect(self.on_scene_detection_finished)
+        return self.scene_detector
+
     def detect_scenes_for_current_video(self):
         """Start or stop scene detection for the current video"""
         # If detection is in progress, stop it
@@ -2007,11 +2168,7 @@ class VideoCropper(QWidget):
             return
             
         # Find the current video entry
-        current_entry = None
-        for entry in self.video_files:
-            if entry["display_name"] == self.current_video:
-                current_entry = entry
-                break
+        current_entry = self.loader.find_entry(self.current_video)
                 
         if not current_entry:
             return
@@ -2030,7 +2187,7 @@ class VideoCropper(QWidget):
         self.scene_detection_stop_requested = False
         
         # Start scene detection in background
-        self.scene_detection_thread = self.scene_detector.detect_scenes_async(video_path)
+        self.scene_detection_thread = self.get_scene_detector().detect_scenes_async(video_path)
         
     def on_scene_detection_progress(self, progress):
         """Update progress bar during scene detection"""
@@ -2092,393 +2249,195 @@ class VideoCropper(QWidget):
                     self._clear_layout(item.layout())
             QWidget().setLayout(layout)
     
+    def get_media_info_cache(self):
+        """Background ffprobe/prompt reader behind the I key, shared with neighbour prefetch."""
+        if getattr(self, 'media_info_cache', None) is None:
+            from scripts.media_info import MediaInfoCache
+            self.media_info_cache = MediaInfoCache()
+            self.media_info_cache.info_ready.connect(self._on_media_info_ready)
+        return self.media_info_cache
+
     def display_video_metadata(self, video_entry):
         """Display or toggle detailed metadata for a video file."""
         # If dialog exists and is visible, hide it and return
-        if hasattr(self, 'metadata_dialog') and self.metadata_dialog:
-            if self.metadata_dialog.isVisible():
-                self.metadata_dialog.hide()
-                return
-            # Clean up the existing dialog
-            try:
-                self.metadata_dialog.deleteLater()
-            except RuntimeError:
-                pass  # Widget already deleted
-        
-        # Create a new dialog
-        try:
-            self.metadata_dialog = QDialog(self)
-            self.metadata_dialog.setWindowTitle("Video Metadata")
-            self.metadata_dialog.resize(800, 600)
-            self.metadata_dialog.setWindowFlags(self.metadata_dialog.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint)
-            
-            # Handle key events for the dialog
-            def dialog_key_press(event):
-                if event.key() == Qt.Key.Key_Escape or (event.key() == Qt.Key.Key_I and event.modifiers() == Qt.KeyboardModifier.NoModifier):
-                    self.metadata_dialog.hide()
-                    return
-                super(type(self.metadata_dialog), self.metadata_dialog).keyPressEvent(event)
-            
-            self.metadata_dialog.keyPressEvent = dialog_key_press
-            
-            # Set a style sheet to ensure proper background and text colors
-            self.metadata_dialog.setStyleSheet("""
-                QDialog {
-                    background-color: #2d2d2d;
-                    color: #ffffff;
-                }
-                QLabel {
-                    color: #ffffff;
-                }
-                QTextEdit {
-                    background-color: #3a3a3a;
-                    color: #ffffff;
-                    border: 1px solid #555555;
-                    border-radius: 3px;
-                    padding: 5px;
-                }
-            """)
-        except Exception as e:
-            print(f"Error creating metadata dialog: {e}")
+        if getattr(self, 'metadata_dialog', None) is not None and self.metadata_dialog.isVisible():
+            self.metadata_dialog.hide()
             return
-            
         if not video_entry or "original_path" not in video_entry:
             print("Error: Invalid video entry")
             return
-            
         video_path = video_entry["original_path"]
-        metadata = {
-            "File": os.path.basename(video_path),
-            "Path": video_path,
-            "Size": f"{os.path.getsize(video_path) / (1024*1024):.2f} MB",
-            "Created": datetime.fromtimestamp(os.path.getctime(video_path)).strftime('%Y-%m-%d %H:%M:%S'),
-            "Modified": datetime.fromtimestamp(os.path.getmtime(video_path)).strftime('%Y-%m-%d %H:%M:%S'),
-        }
-        
-        # Get video properties using OpenCV
-        cap = cv2.VideoCapture(video_path)
-        if cap.isOpened():
-            metadata.update({
-                "Resolution": f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}",
-                "FPS": f"{cap.get(cv2.CAP_PROP_FPS):.2f}",
-                "Frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-                "Duration (s)": f"{int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) / max(1, cap.get(cv2.CAP_PROP_FPS)):.2f}",
-            })
-            cap.release()
-        
-        # Try to get metadata using ffprobe if available
-        try:
-            result = subprocess.run(
-                ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', video_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                ffprobe_data = json.loads(result.stdout)
-                
-                # Extract format metadata
-                if 'format' in ffprobe_data:
-                    fmt = ffprobe_data['format']
-                    metadata.update({
-                        'Format': fmt.get('format_name', 'N/A'),
-                        'Bitrate': f"{int(fmt.get('bit_rate', 0)) / 1000:.1f} kb/s" if 'bit_rate' in fmt else 'N/A',
-                    })
-                    
-                    # Look for prompt/workflow in format tags
-                    if 'tags' in fmt:
-                        tags = fmt['tags']
-                        for key in ['comment', 'description', 'title', 'purl', 'purl:comment', 'purl:description']:
-                            if key in tags and tags[key].strip():
-                                metadata['Comment'] = tags[key].strip()
-                                break
-                
-                # Extract video stream metadata
-                if 'streams' in ffprobe_data:
-                    for stream in ffprobe_data['streams']:
-                        if stream['codec_type'] == 'video':
-                            metadata.update({
-                                'Video Codec': stream.get('codec_long_name', stream.get('codec_name', 'N/A')),
-                                'Bit Depth': f"{stream.get('bits_per_raw_sample', stream.get('bits_per_sample', 'N/A'))} bits",
-                                'Color Space': stream.get('color_space', 'N/A'),
-                                'Color Range': stream.get('color_range', 'N/A'),
-                                'Color Primaries': stream.get('color_primaries', 'N/A'),
-                                'Color Transfer': stream.get('color_transfer', 'N/A')
-                            })
-                            break
-        except Exception as e:
-            print(f"Error getting ffprobe metadata: {e}")
-        
-        # Create or reuse metadata dialog
-        if not hasattr(self, 'metadata_dialog') or not self.metadata_dialog:
-            self.metadata_dialog = QDialog(self)
-            self.metadata_dialog.setWindowTitle("Video Metadata")
-            self.metadata_dialog.resize(800, 600)  # Increased width for better prompt display
-            self.metadata_dialog.setWindowFlags(self.metadata_dialog.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint)
-            
-            # Handle key events for the dialog
-            def dialog_key_press(event):
-                if event.key() == Qt.Key.Key_Escape or (event.key() == Qt.Key.Key_I and event.modifiers() == Qt.KeyboardModifier.NoModifier):
-                    self.metadata_dialog.hide()
-                    return
-                super(type(self.metadata_dialog), self.metadata_dialog).keyPressEvent(event)
-            
-            self.metadata_dialog.keyPressEvent = dialog_key_press
-            
-            # Set a style sheet to ensure proper background and text colors
-            self.metadata_dialog.setStyleSheet("""
-                QDialog {
-                    background-color: #2d2d2d;
-                    color: #ffffff;
-                }
-                QLabel {
-                    color: #ffffff;
-                }
-                QTextEdit {
-                    background-color: #3a3a3a;
-                    color: #ffffff;
-                    border: 1px solid #555555;
-                    border-radius: 3px;
-                    padding: 5px;
-                }
-            """)
-        
-        # Clear previous content and create new layout
-        layout = QVBoxLayout()
-        
+        self._metadata_path = video_path
+        cache = self.get_media_info_cache()
+        info = cache.get(video_path)
+        if info is None:
+            # Not prefetched yet: open right away and fill in when the probe lands
+            cache.request(video_path)
+        self._show_metadata_dialog(video_path, info)
+
+    def _on_media_info_ready(self, path, info):
+        dialog = getattr(self, 'metadata_dialog', None)
+        if path == getattr(self, '_metadata_path', None) and dialog is not None and dialog.isVisible():
+            self._show_metadata_dialog(path, info)
+
+    def _ensure_metadata_dialog(self):
+        if getattr(self, 'metadata_dialog', None) is not None:
+            return self.metadata_dialog
+        self.metadata_dialog = QDialog(self)
+        self.metadata_dialog.setWindowTitle("Video Metadata")
+        self.metadata_dialog.resize(800, 600)  # Increased width for better prompt display
+        self.metadata_dialog.setWindowFlags(self.metadata_dialog.windowFlags() & ~Qt.WindowType.WindowContextHelpButtonHint)
+
+        # Handle key events for the dialog
+        def dialog_key_press(event):
+            if event.key() == Qt.Key.Key_Escape or (event.key() == Qt.Key.Key_I and event.modifiers() == Qt.KeyboardModifier.NoModifier):
+                self.metadata_dialog.hide()
+                return
+            super(type(self.metadata_dialog), self.metadata_dialog).keyPressEvent(event)
+
+        self.metadata_dialog.keyPressEvent = dialog_key_press
+
+        # Set a style sheet to ensure proper background and text colors
+        self.metadata_dialog.setStyleSheet("""
+            QDialog {
+                background-color: #2d2d2d;
+                color: #ffffff;
+            }
+            QLabel {
+                color: #ffffff;
+            }
+            QTextEdit {
+                background-color: #3a3a3a;
+                color: #ffffff;
+                border: 1px solid #555555;
+                border-radius: 3px;
+                padding: 5px;
+            }
+        """)
+        return self.metadata_dialog
+
+    def _show_metadata_dialog(self, video_path, info):
+        """Fill the metadata dialog from a media_info result (None while it is still being read)."""
+        dialog = self._ensure_metadata_dialog()
         # Clear any existing layout and widgets
-        if self.metadata_dialog.layout():
-            old_layout = self.metadata_dialog.layout()
-            self._clear_layout(old_layout)
-            
-        # Set the new layout
-        self.metadata_dialog.setLayout(layout)
-        
-        # Always show basic metadata
+        if dialog.layout():
+            self._clear_layout(dialog.layout())
+        layout = QVBoxLayout()
+        dialog.setLayout(layout)
+        dialog.setWindowTitle(f"Metadata - {os.path.basename(video_path)}")
+
         basic_metadata = QTextEdit()
         basic_metadata.setReadOnly(True)
         basic_metadata.setFontFamily("Courier New")
         basic_metadata.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
-        
-        # Format basic metadata
-        metadata_text = ""
-        for key, value in metadata.items():
-            if key != 'Comment':  # We'll handle comment separately
-                metadata_text += f"<b>{key}:</b> {value}<br>"
-        
-        basic_metadata.setHtml(metadata_text)
+        if info is None:
+            basic_metadata.setHtml(f"<b>File:</b> {os.path.basename(video_path)}<br><i>Reading metadata...</i>")
+        else:
+            basic_metadata.setHtml("".join(f"<b>{key}:</b> {value}<br>" for key, value in info["fields"]))
         layout.addWidget(QLabel("<h3>Basic Information</h3>"))
         layout.addWidget(basic_metadata)
-        
-        # Show prompt section if available
-        if 'Comment' in metadata and 'prompt' in metadata['Comment']:
-            try:
-                # Extract the JSON part from the comment
-                comment = metadata['Comment']
-                # Find the first { and last } to get the JSON object
-                start = comment.find('{')
-                end = comment.rfind('}') + 1
-                if start != -1 and end != -1:
-                    json_str = comment[start:end]
-                    # Parse the JSON
-                    prompt_data = json.loads(json_str)
-                    
-                    # Extract all text from ShowText nodes
-                    comment_str = json.dumps(prompt_data)
-                    text_entries = []
-                    
-                    # Look for all ShowText nodes and extract their text
-                    pattern = r'"Node name for S&R": "ShowText\|[^"]+", "widget_ue_connectable": {}}, "widgets_values": \[\["([^\]]+)\]\]'
-                    matches = re.findall(pattern, comment_str)
-                    
-                    if matches:
-                        # Clean up each match (remove any extra quotes or brackets)
-                        for match in matches:
-                            # Remove any trailing quotes or brackets
-                            clean_text = match.split('"')[0].strip()
-                            if clean_text:
-                                text_entries.append(clean_text)
-                    
-                    # If we found text entries, create a scrollable list with copy buttons
-                    if text_entries:
-                        scroll = QScrollArea()
-                        scroll_widget = QWidget()
-                        scroll_layout = QVBoxLayout(scroll_widget)
-                        
-                        for i, text in enumerate(text_entries):
-                            entry_widget = QWidget()
-                            entry_layout = QHBoxLayout(entry_widget)
-                            entry_layout.setContentsMargins(0, 0, 0, 5)
-                            
-                            # Create a text edit for better wrapping
-                            text_edit = QTextEdit(f"{i+1}. {text}")
-                            text_edit.setReadOnly(True)
-                            text_edit.setFrameStyle(QFrame.Shape.NoFrame)
-                            text_edit.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)  # Show scrollbar when needed
-                            text_edit.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-                            text_edit.setStyleSheet("""
-                                QTextEdit {
-                                    padding: 8px;
-                                    border: 1px solid #444;
-                                    border-radius: 3px;
-                                    background-color: #2a2a2a;
-                                    color: white;
-                                    font-size: 11pt;
-                                    line-height: 1.4;
-                                }
-                                QTextEdit:hover {
-                                    background-color: #3a3a3a;
-                                    border: 1px solid #666;
-                                }
-                                QScrollBar:vertical {
-                                    width: 10px;
-                                    margin: 0px;
-                                }
-                            """)
-                            text_edit.setCursor(Qt.CursorShape.PointingHandCursor)
-                            
-                            # Set a reasonable fixed height that shows more text by default
-                            text_edit.setMinimumHeight(80)  # Increased minimum height
-                            text_edit.setMaximumHeight(300)  # Increased maximum height
-                            
-                            # Add a copy button
-                            copy_btn = QPushButton("Copy")
-                            copy_btn.setFixedWidth(60)
-                            copy_btn.setProperty("text_to_copy", text)  # Store the clean text
-                            copy_btn.clicked.connect(lambda checked, t=text: QApplication.clipboard().setText(t))
-                            
-                            # Make the label clickable to copy
-                            def on_label_clicked(event, t=text):
-                                QApplication.clipboard().setText(t)
-                                
-                            text_edit.mousePressEvent = on_label_clicked
-                            
-                            entry_layout.addWidget(text_edit, 1)  # Text takes available space
-                            entry_layout.addWidget(copy_btn)       # Button stays right-aligned
-                            scroll_layout.addWidget(entry_widget)
-                        
-                        # Add stretch to push everything to the top
-                        scroll_layout.addStretch()
-                        
-                        # Set up the scroll area
-                        scroll.setWidgetResizable(True)
-                        scroll.setWidget(scroll_widget)
-                        
-                        # Add the scroll area to the main layout
-                        layout.addWidget(scroll)
-                        
-                        # Add buttons at the bottom
-                        button_layout = QHBoxLayout()
-                        
-                        # Copy All button
-                        copy_all_btn = QPushButton("Copy All")
-                        copy_all_btn.clicked.connect(lambda: QApplication.clipboard().setText('\n'.join(text_entries)))
-                        
-                        # Close button
-                        close_btn = QPushButton("Close")
-                        close_btn.clicked.connect(self.metadata_dialog.hide)
-                        
-                        button_layout.addWidget(copy_all_btn)
-                        button_layout.addStretch()
-                        button_layout.addWidget(close_btn)
-                        
-                        layout.addLayout(button_layout)
-                        
-                        # Set the layout and show the dialog
-                        self.metadata_dialog.setLayout(layout)
-                        self.metadata_dialog.show()
-                        self.metadata_dialog.raise_()
-                        self.metadata_dialog.activateWindow()
-                        # Ensure the dialog is properly closed when the main window is closed
-                        self.metadata_dialog.finished.connect(lambda: setattr(self.metadata_dialog, 'is_visible', False))
-                        return
-                    
-                    # Fallback to old method if no matches found
-                    elif isinstance(prompt_data, dict) and "widgets_values" in prompt_data:
-                        widgets_values = prompt_data["widgets_values"]
-                        if widgets_values and isinstance(widgets_values, list) and len(widgets_values) > 0:
-                            first_value = widgets_values[0]
-                            if isinstance(first_value, list) and len(first_value) > 0:
-                                display_text = first_value[0]
-                            else:
-                                display_text = str(first_value)
-                    
-                    # If still no text, show the full JSON
-                    if not display_text:
-                        display_text = json.dumps(prompt_data, indent=2)
-                    
-                    # Create prompt display for non-matching format
-                    prompt_text = QTextEdit()
-                    prompt_text.setReadOnly(True)
-                    prompt_text.setFontFamily("Courier New")
-                    prompt_text.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
-                    prompt_text.setWordWrapMode(QTextOption.WrapMode.WordWrap)
-                    prompt_text.setPlainText(display_text)
-                    
-                    # Add buttons at the bottom
-                    button_layout = QHBoxLayout()
-                    
-                    # Copy button
-                    copy_btn = QPushButton("Copy to Clipboard")
-                    copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(display_text))
-                    
-                    # Close button
-                    close_btn = QPushButton("Close")
-                    close_btn.clicked.connect(self.metadata_dialog.hide)
-                    
-                    # Add widgets to the main layout
-                    layout.addWidget(prompt_text)
-                    button_layout.addStretch()
-                    button_layout.addWidget(copy_btn)
-                    button_layout.addWidget(close_btn)
-                    layout.addLayout(button_layout)
-                    
-            except json.JSONDecodeError as e:
-                print(f"Error parsing prompt JSON: {e}")
-                # Fall back to showing raw comment if JSON parsing fails
-                if 'Comment' in metadata:
-                    prompt_text = QTextEdit()
-                    prompt_text.setReadOnly(True)
-                    prompt_text.setFontFamily("Courier New")
-                    prompt_text.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
-                    prompt_text.setWordWrapMode(QTextOption.WrapMode.WordWrap)
-                    prompt_text.setPlainText(metadata['Comment'])
-                    
-                    # Add buttons at the bottom
-                    button_layout = QHBoxLayout()
-                    
-                    # Copy button
-                    copy_btn = QPushButton("Copy to Clipboard")
-                    copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(metadata['Comment']))
-                    
-                    # Close button
-                    close_btn = QPushButton("Close")
-                    close_btn.clicked.connect(self.metadata_dialog.hide)
-                    
-                    # Add widgets to the main layout
-                    layout.addWidget(prompt_text)
-                    button_layout.addStretch()
-                    button_layout.addWidget(copy_btn)
-                    button_layout.addWidget(close_btn)
-                    layout.addLayout(button_layout)
-        
-        # Set the layout and show the dialog
-        self.metadata_dialog.setLayout(layout)
-        
-        # Force update the window title with the current video name
-        if 'File' in metadata:
-            self.metadata_dialog.setWindowTitle(f"Metadata - {metadata['File']}")
-        else:
-            self.metadata_dialog.setWindowTitle("Video Metadata")
-            
+
+        text_entries = info["prompts"] if info is not None else []
+        if text_entries:
+            # Scrollable list of ShowText prompts with copy buttons
+            scroll = QScrollArea()
+            scroll_widget = QWidget()
+            scroll_layout = QVBoxLayout(scroll_widget)
+
+            for i, text in enumerate(text_entries):
+                entry_widget = QWidget()
+                entry_layout = QHBoxLayout(entry_widget)
+                entry_layout.setContentsMargins(0, 0, 0, 5)
+
+                # Create a text edit for better wrapping
+                text_edit = QTextEdit(f"{i+1}. {text}")
+                text_edit.setReadOnly(True)
+                text_edit.setFrameStyle(QFrame.Shape.NoFrame)
+                text_edit.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)  # Show scrollbar when needed
+                text_edit.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+                text_edit.setStyleSheet("""
+                    QTextEdit {
+                        padding: 8px;
+                        border: 1px solid #444;
+                        border-radius: 3px;
+                        background-color: #2a2a2a;
+                        color: white;
+                        font-size: 11pt;
+                        line-height: 1.4;
+                    }
+                    QTextEdit:hover {
+                        background-color: #3a3a3a;
+                        border: 1px solid #666;
+                    }
+                    QScrollBar:vertical {
+                        width: 10px;
+                        margin: 0px;
+                    }
+                """)
+                text_edit.setCursor(Qt.CursorShape.PointingHandCursor)
+
+                # Set a reasonable fixed height that shows more text by default
+                text_edit.setMinimumHeight(80)  # Increased minimum height
+                text_edit.setMaximumHeight(300)  # Increased maximum height
+
+                # Add a copy button
+                copy_btn = QPushButton("Copy")
+                copy_btn.setFixedWidth(60)
+                copy_btn.setProperty("text_to_copy", text)  # Store the clean text
+                copy_btn.clicked.connect(lambda checked, t=text: QApplication.clipboard().setText(t))
+
+                # Make the label clickable to copy
+                def on_label_clicked(event, t=text):
+                    QApplication.clipboard().setText(t)
+
+                text_edit.mousePressEvent = on_label_clicked
+
+                entry_layout.addWidget(text_edit, 1)  # Text takes available space
+                entry_layout.addWidget(copy_btn)       # Button stays right-aligned
+                scroll_layout.addWidget(entry_widget)
+
+            # Add stretch to push everything to the top
+            scroll_layout.addStretch()
+            scroll.setWidgetResizable(True)
+            scroll.setWidget(scroll_widget)
+            layout.addWidget(scroll)
+
+            button_layout = QHBoxLayout()
+            copy_all_btn = QPushButton("Copy All")
+            copy_all_btn.clicked.connect(lambda: QApplication.clipboard().setText('\n'.join(text_entries)))
+            close_btn = QPushButton("Close")
+            close_btn.clicked.connect(dialog.hide)
+            button_layout.addWidget(copy_all_btn)
+            button_layout.addStretch()
+            button_layout.addWidget(close_btn)
+            layout.addLayout(button_layout)
+        elif info is not None and info.get("prompt_text"):
+            # Workflow without ShowText nodes, or a comment that isn't valid JSON
+            display_text = info["prompt_text"]
+            prompt_text = QTextEdit()
+            prompt_text.setReadOnly(True)
+            prompt_text.setFontFamily("Courier New")
+            prompt_text.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
+            prompt_text.setWordWrapMode(QTextOption.WrapMode.WordWrap)
+            prompt_text.setPlainText(display_text)
+
+            button_layout = QHBoxLayout()
+            copy_btn = QPushButton("Copy to Clipboard")
+            copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(display_text))
+            close_btn = QPushButton("Close")
+            close_btn.clicked.connect(dialog.hide)
+
+            layout.addWidget(prompt_text)
+            button_layout.addStretch()
+            button_layout.addWidget(copy_btn)
+            button_layout.addWidget(close_btn)
+            layout.addLayout(button_layout)
+
         # Always show and raise the dialog to ensure it's visible
-        self.metadata_dialog.show()
-        self.metadata_dialog.raise_()
-        self.metadata_dialog.activateWindow()
-        
-        # Ensure the dialog gets focus
-        self.metadata_dialog.setFocus()
+        dialog.show()
+        dialog.raise_()
+        dialog.activateWindow()
+        dialog.setFocus()
 
     def jump_to_scene_by_index(self, scene_index):
         """Jump to a specific scene by index (0-based)"""
@@ -2555,12 +2514,33 @@ def multi_mode_keyPressEvent(self, event):
                         pass
                 return
             if key == Qt.Key.Key_B:
-                # Export current selection
+                # Export queued regions, or the current selection if none are queued
                 try:
                     self.export_current_audio_clip()
                 except Exception:
                     pass
                 return
+            if key == Qt.Key.Key_P:
+                # P toggles proposed segments, Shift+P queues them, Ctrl+P auto-clips the whole folder
+                mods = event.modifiers()
+                if mods & Qt.KeyboardModifier.ControlModifier:
+                    self.analyze_folder_audio()
+                elif mods & Qt.KeyboardModifier.ShiftModifier:
+                    if editor is not None:
+                        count = editor.accept_candidates()
+                        self.update_status(f"Queued {count} proposed segment(s) ({len(editor.queued_regions())} queued)")
+                else:
+                    self.propose_audio_segments()
+                return
+            if key == Qt.Key.Key_N:
+                # N queues the current selection for batch export, Shift+N clears the queue
+                if editor is not None:
+                    if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+                        editor.clear_regions()
+                        self.update_status("Cleared queued regions")
+                    else:
+                        self.queue_current_audio_region()
+                return
                 
             # Handle play/pause with V or Enter
             if key in (Qt.Key.Key_V, Qt.Key.Key_Return, Qt.Key.Key_Enter):
@@ -3116,8 +3096,19 @@ VideoCropper.crop_rect_updating = crop_rect_updating
 VideoCropper.crop_rect_finalized = crop_rect_finalized
 VideoCropper.check_current_video_item = check_current_video_item
 VideoCropper.toggle_favorite_folder = toggle_favorite_folder
+VideoCropper.toggle_library_mode = toggle_library_mode
 VideoCropper.cycle_theme = cycle_theme
 VideoCropper.update_file_count = update_file_count
 VideoCropper.toggle_fullscreen = toggle_fullscreen
 VideoCropper.open_theme_selector = open_theme_selector
+VideoCropper.ensure_audio_editor = ensure_audio_editor
 VideoCropper.on_move_av1_clicked = on_move_av1_clicked
+VideoCropper.start_media_sort = start_media_sort
+VideoCropper._on_media_sort_progress = _on_media_sort_progress
+VideoCropper._finish_media_sort = _finish_media_sort
+VideoCropper._on_media_sort_finished = _on_media_sort_finished
+VideoCropper._on_media_sort_failed = _on_media_sort_failed
+VideoCropper.start_duplicate_scan = start_duplicate_scan
+VideoCropper._on_duplicate_scan_progress = _on_duplicate_scan_progress
+VideoCropper._on_duplicate_scan_finished = _on_duplicate_scan_finished
+VideoCropper._on_duplicate_scan_failed = _on_duplicate_scan_failed
@@ -1,9 +1,12 @@
 # video_editor.py
 import os
+import time
 import cv2
+from collections import deque
 from PyQt6.QtGui import QImage, QPixmap, QPainter, QColor, QPen
 from PyQt6.QtCore import Qt, QTimer, QRectF
 from scripts.interactive_crop_region import InteractiveCropRegion  # New interactive crop region
+from scripts import perf_trace
 
 class VideoEditor:
     def __init__(self, main_app):
@@ -26,6 +29,11 @@ class VideoEditor:
         self._window_start_ts = 0.0
         # Cache to avoid heavy scene/layout updates every frame
         self._last_pixmap_size = None
+        # Display times of recent frames, for the achieved-fps readout while tracing
+        self._frame_times = deque(maxlen=60)
+        # Last decoded frame at source resolution (BGR) and its index, for screenshots
+        self.last_frame = None
+        self.last_frame_index = -1
 
     def _reset_correction_window(self):
         self._corrections_in_window = 0
@@ -83,15 +91,18 @@ class VideoEditor:
             # If target frame hasn't advanced, skip heavy work this tick
             if target_frame == self._last_shown_frame:
                 return
+            perf_trace.gauge("audio.drift_ms", (cur_frame - target_frame) * 1000 / fps)
             # Only seek if we are significantly behind/ahead (> 6 frames)
             if abs(target_frame - cur_frame) > 6:
                 if target_frame < 0:
                     target_frame = 0
                 elif target_frame >= self.main_app.frame_count:
                     target_frame = self.main_app.frame_count - 1
-                self.main_app.cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
+                with perf_trace.span("seek"):
+                    self.main_app.cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
                 self._note_correction()
-        ret, frame = self.main_app.cap.read()
+        with perf_trace.span("decode"):
+            ret, frame = self.main_app.cap.read()
         current_pos = int(self.main_app.cap.get(cv2.CAP_PROP_POS_FRAMES)) if self.main_app.cap else 0
         if not ret:
             # Read error: treat as end of video
@@ -100,6 +111,8 @@ class VideoEditor:
             # Display frame and update slider
             self.display_frame(frame)
             self.main_app.slider.setValue(current_pos)
+            if perf_trace.ENABLED:
+                self._note_frame_shown(current_pos)
             self._last_shown_frame = current_pos
             # Keep audio in sync with video only when audio is NOT master
             if not getattr(self.main_app, 'audio_enabled', False):
@@ -181,6 +194,9 @@ class VideoEditor:
             self._stop_timer()
 
     def load_video(self, video_entry):
+        # Screenshots must never fall back to the previous clip's frame
+        self.last_frame = None
+        self.last_frame_index = -1
         # Before opening a new video, release any previous handles to avoid file locks (WinError 32)
         try:
             if getattr(self.main_app, 'cap', None) is not None:
@@ -200,16 +216,26 @@ class VideoEditor:
         except Exception:
             pass
         video_path = video_entry["original_path"]
-        self.main_app.cap = cv2.VideoCapture(video_path)
-        if not self.main_app.cap.isOpened():
-            print("Error: Could not open video file.")
-            return
-        self.main_app.frame_count = int(self.main_app.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        self.main_app.original_width = int(self.main_app.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.main_app.original_height = int(self.main_app.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # Use the capture the neighbour prefetcher already opened and decoded, if it is ready
+        prefetcher = getattr(self.main_app, 'clip_prefetcher', None)
+        warm = prefetcher.take(video_path) if prefetcher is not None else None
+        if warm is not None:
+            self.main_app.cap = warm.cap
+            self.main_app.frame_count = warm.frame_count
+            self.main_app.original_width = warm.width
+            self.main_app.original_height = warm.height
+            fps = warm.fps
+        else:
+            self.main_app.cap = cv2.VideoCapture(video_path)
+            if not self.main_app.cap.isOpened():
+                print("Error: Could not open video file.")
+                return
+            self.main_app.frame_count = int(self.main_app.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.main_app.original_width = int(self.main_app.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.main_app.original_height = int(self.main_app.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            # Get FPS for correct playback speed
+            fps = self.main_app.cap.get(cv2.CAP_PROP_FPS)
         self.main_app.clip_aspect_ratio = self.main_app.original_width / self.main_app.original_height
-        # Get FPS for correct playback speed
-        fps = self.main_app.cap.get(cv2.CAP_PROP_FPS)
         if not fps or fps < 1:
             fps = 30  # fallback default
         self.main_app.video_fps = fps
@@ -234,15 +260,20 @@ class VideoEditor:
         
         # Update file size
         try:
-            file_size = os.path.getsize(video_path) / (1024 * 1024)  # Convert to MB
+            size_bytes = warm.file_size if warm is not None and warm.file_size is not None else os.path.getsize(video_path)
+            file_size = size_bytes / (1024 * 1024)  # Convert to MB
             self.main_app.file_size_label.setText(f"{file_size:.1f} MB")
         except Exception as e:
             print(f"Error getting file size: {e}")
             self.main_app.file_size_label.setText("N/A")
             
         self.update_trim_label()
-        self.main_app.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        ret, frame = self.main_app.cap.read()
+        if warm is not None:
+            # Already positioned just after the decoded first frame
+            ret, frame = True, warm.frame
+        else:
+            self.main_app.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.main_app.cap.read()
         if ret:
             self.display_frame(frame)
         else:
@@ -289,29 +320,45 @@ class VideoEditor:
             self.main_app.is_playing = False
             self.main_app.play_pause_button.setText("Play")
 
+    def _note_frame_shown(self, frame_index):
+        """Feed the tracing overlay: achieved vs target fps and frames skipped over."""
+        now = time.perf_counter()
+        self._frame_times.append(now)
+        if len(self._frame_times) > 1:
+            elapsed = now - self._frame_times[0]
+            if elapsed > 0:
+                perf_trace.gauge("play.fps", (len(self._frame_times) - 1) / elapsed)
+        perf_trace.gauge("play.target_fps", getattr(self.main_app, 'video_fps', 0) or 0)
+        if self._last_shown_frame >= 0 and frame_index > self._last_shown_frame + 1:
+            perf_trace.count("play.dropped", frame_index - self._last_shown_frame - 1)
+
     def display_frame(self, frame):
         if frame is None:
             return
+        self.last_frame = frame
+        self.last_frame_index = -1
             
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame_rgb.shape
-        bytes_per_line = ch * w
-        q_img = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-        
-        # Create QPixmap from QImage
-        pixmap = QPixmap.fromImage(q_img)
+        with perf_trace.span("convert"):
+            # Convert BGR to RGB
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            h, w, ch = frame_rgb.shape
+            bytes_per_line = ch * w
+            q_img = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+            
+            # Create QPixmap from QImage
+            pixmap = QPixmap.fromImage(q_img)
         
         # Scale the pixmap to fit the view while maintaining aspect ratio
         target_w = max(1, self.main_app.graphics_view.width() - 20)
         target_h = max(1, self.main_app.graphics_view.height() - 20)
         
-        scaled_pixmap = pixmap.scaled(
-            target_w,
-            target_h,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
+        with perf_trace.span("scale"):
+            scaled_pixmap = pixmap.scaled(
+                target_w,
+                target_h,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
         
         # Update the pixmap item with the scaled pixmap
         if hasattr(self.main_app, 'pixmap_item'):
@@ -325,6 +372,8 @@ class VideoEditor:
         # Update slider and frame counter
         if hasattr(self.main_app, 'cap') and self.main_app.cap:
             current_frame = int(self.main_app.cap.get(cv2.CAP_PROP_POS_FRAMES))
+            # The capture is positioned just after the frame it returned
+            self.last_frame_index = current_frame - 1
             
             # Avoid feedback loop if user is scrubbing
             if hasattr(self.main_app, 'slider') and not self.main_app.slider.isSliderDown():
@@ -349,8 +398,9 @@ class VideoEditor:
                 self.main_app.audio_player.pause()
                 
             # Set video frame position
-            self.main_app.cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
-            ret, frame = self.main_app.cap.read()
+            with perf_trace.span("seek"):
+                self.main_app.cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+                ret, frame = self.main_app.cap.read()
             if ret:
                 self.display_frame(frame)
                 # Force audio to exact position of current frame
@@ -1,82 +1,108 @@
-from PyQt6.QtCore import QProcess
-import os, ffmpeg, cv2
-from PyQt6.QtWidgets import QMessageBox
+import os
+from collections import deque
+from PyQt6.QtWidgets import QFileDialog, QMessageBox
+from scripts.export_jobs import ExportJobRunner, sweep_partials
+from scripts.export_core import (
+    ClipExport, build_export_plan, export_images, get_unique_filename,
+    probe_clip, save_job_file, write_caption_file, write_image
+)
+
 
 class VideoExporter:
     def __init__(self, main_app):
         self.main_app = main_app
         self.file_counter = 0  # Counter for incremental padding suffix
         self.cancel_requested = False
+        # Encodes run in a background worker; paths that should not get a caption
+        # (temporary intermediates) are tracked per job.
+        self.job_runner = ExportJobRunner()
+        self.job_runner.status_changed.connect(self.main_app.update_status)
+        self.job_runner.step_finished.connect(self._on_step_finished)
+        self.job_runner.job_finished.connect(self._on_job_finished)
+        self._temp_paths = set()
+        # Output paths claimed by queued or running jobs: their final files don't
+        # exist until the job finishes, so later plans must not claim them again.
+        # Jobs run one at a time in order; _job_paths holds each job's claims.
+        self._reserved = set()
+        self._job_paths = deque()
 
     def cancel_export(self):
         self.cancel_requested = True
+        self.job_runner.cancel()
         print("Export cancelled by user.")
 
+    def sweep_orphaned_partials(self, folder_path=None):
+        """Remove .partial leftovers from an earlier crash in this folder's export dirs."""
+        folder_path = folder_path or self.main_app.folder_path
+        if not folder_path:
+            return []
+        return sweep_partials(
+            os.path.join(folder_path, "cropped"),
+            os.path.join(folder_path, "uncropped"),
+        )
+
     def get_unique_filename(self, file_path):
-        base, ext = os.path.splitext(file_path)
-        counter = 1
-        unique_file = file_path
-        while os.path.exists(unique_file):
-            unique_file = f"{base}_{counter}{ext}"
-            counter += 1
-        return unique_file
+        return get_unique_filename(file_path)
 
     def write_caption(self, output_file):
         """
         If a simple caption was provided, write it into a .txt file with the same base name as output_file.
         """
-        caption = getattr(self.main_app, 'simple_caption', '').strip()
-        if caption:
-            base, _ = os.path.splitext(output_file)
-            txt_file = base + ".txt"
-            with open(txt_file, "w") as f:
-                f.write(caption)
-            print(f"Exported caption for {output_file} to {txt_file}")
-
-    def run_ffmpeg_async(self, cmd_list):
-        self.main_app.update_status("Encoding video...")
-        # Add fast seeking before input
-        if cmd_list[0] == "ffmpeg" and "-i" in cmd_list:
-            input_idx = cmd_list.index("-i")
-            try:
-                ss_idx = cmd_list.index("-ss")
-                seek_time = float(cmd_list[ss_idx + 1])
-                # Move the -ss parameter before input for faster seeking
-                cmd_list.pop(ss_idx + 1)
-                cmd_list.pop(ss_idx)
-                cmd_list[input_idx:input_idx] = [
-                    "-ss", str(seek_time),
-                    "-noaccurate_seek"
-                ]
-            except (ValueError, IndexError):
-                print("Warning: Could not find -ss parameter in command")
-        
-        print("Running FFmpeg command:", cmd_list)
-        # Use a QProcess instance to get the finished signal
-        self.ffmpeg_process = QProcess()
-        self.ffmpeg_process.finished.connect(self.ffmpeg_finished)
-        self.ffmpeg_process.start(cmd_list[0], cmd_list[1:])
-        self.main_app.update_status("FFmpeg process started in new window")
-
-    def ffmpeg_finished(self, exitCode, exitStatus):
-        if exitCode == 0:
-            self.main_app.update_status("Export completed successfully")
-            # Clean up uncropped file if it was only used as a temporary source
-            if hasattr(self, 'temp_uncropped_path'):
-                try:
-                    import time
-                    time.sleep(1)  # Small delay to ensure file is not in use
-                    if os.path.exists(self.temp_uncropped_path):
-                        os.remove(self.temp_uncropped_path)
-                        print(f"Cleaned up temporary uncropped file: {self.temp_uncropped_path}")
-                    delattr(self, 'temp_uncropped_path')  # Clean up the reference
-                except Exception as e:
-                    print(f"Could not remove temporary file {self.temp_uncropped_path}: {str(e)}")
-        else:
-            self.main_app.update_status(f"Export failed with code {exitCode}")
-        self.ffmpeg_process = None
+        write_caption_file(output_file, getattr(self.main_app, 'simple_caption', ''))
+
+    def write_image(self, image_path, frame):
+        return write_image(image_path, frame)
+
+    def _on_step_finished(self, final_path):
+        if final_path in self._temp_paths:
+            self._temp_paths.discard(final_path)
+            return
+        print(f"Exported {final_path}")
+        self.write_caption(final_path)
+
+    def _release_paths(self, paths):
+        self._reserved.difference_update(paths)
+
+    def _on_job_finished(self, success, message):
+        if self._job_paths:
+            self._release_paths(self._job_paths.popleft())
         if hasattr(self.main_app, 'export_finished_callback'):
             self.main_app.export_finished_callback()
+        self.main_app.update_status(message)
+
+    def preview_export(self):
+        """Render the first second of the current clip through the export's exact
+        trim/crop/scale filter graph in memory and show it with the final size."""
+        from scripts.export_preview import ExportPreviewer, build_preview_plan
+        display_name = self.main_app.current_video
+        entry = self.main_app.loader.find_entry(display_name)
+        if not entry or not self.main_app.original_width:
+            self.main_app.update_status("No video loaded.")
+            return
+        plan = build_preview_plan(
+            entry["original_path"],
+            self.main_app.original_width,
+            self.main_app.original_height,
+            getattr(self.main_app, 'video_fps', 30),
+            self.main_app.trim_points.get(display_name, 0),
+            self.main_app.trim_length,
+            self.main_app.crop_regions.get(display_name),
+            self.main_app.longest_edge,
+        )
+        if not hasattr(self, 'previewer'):
+            self.previewer = ExportPreviewer()
+            self.previewer.preview_ready.connect(self._show_preview)
+            self.previewer.preview_failed.connect(self.main_app.update_status)
+        self.main_app.update_status(f"Rendering export preview ({plan['width']}x{plan['height']})...")
+        self.previewer.preview_async(plan)
+
+    def _show_preview(self, result):
+        from scripts.export_preview import ExportPreviewDialog
+        if getattr(self, 'preview_dialog', None) is not None:
+            self.preview_dialog.close()
+        self.preview_dialog = ExportPreviewDialog(self.main_app, result)
+        self.preview_dialog.show()
+        self.main_app.update_status(f"Export preview: {result['width']}x{result['height']}")
 
     def export_videos(self):
         if not self.main_app.current_video:
@@ -109,146 +135,69 @@ class VideoExporter:
                     self.main_app.export_finished_callback()
                 return
 
-        entry = next((e for e in self.main_app.video_files if e["display_name"] == current_video), None)
+        entry = self.main_app.loader.find_entry(current_video)
         if not entry:
             print(f"Current video entry {current_video} not found.")
             if hasattr(self.main_app, 'export_finished_callback'):
                 self.main_app.export_finished_callback()
             return
 
-        video_path = entry["original_path"]
-        display_name = entry["display_name"]
-        crop = self.main_app.crop_regions.get(display_name)
-        prefix = getattr(self.main_app, 'export_prefix', '').strip()
-
         # Use the export_enabled flag from the entry.
         if not entry.get("export_enabled", False):
             if hasattr(self.main_app, 'export_finished_callback'):
                 self.main_app.export_finished_callback()
             return
 
-        cap = cv2.VideoCapture(video_path)
-        orig_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        orig_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        trim_start = self.main_app.trim_points.get(display_name, 0)
-        duration = self.main_app.trim_length / fps
-
-        if self.main_app.export_image_checkbox.isChecked():
-            cap.set(cv2.CAP_PROP_POS_FRAMES, trim_start)
-            ret, frame = cap.read()
-            if ret:
-                base_name = os.path.splitext(display_name)[0]
-                # If neither export cropped nor uncropped are separately checked, export both.
-                # Always export both cropped and uncropped images
-                # Export cropped image if a valid crop exists.
-                if crop:
-                    x, y, w, h = crop
-                    if x >= 0 and y >= 0 and w > 0 and h > 0 and (x + w) <= orig_w and (y + h) <= orig_h:
-                        cropped_frame = frame[y:y+h, x:x+w]
-                        if cropped_frame.size != 0:
-                            if prefix:
-                                self.file_counter += 1
-                                cropped_image_name = f"{prefix}_{self.file_counter:05d}_cropped.png"
-                            else:
-                                cropped_image_name = f"{base_name}_cropped.png"
-                            cropped_image_path = os.path.join(output_folder, cropped_image_name)
-                            cropped_image_path = self.get_unique_filename(cropped_image_path)
-                            cv2.imwrite(cropped_image_path, cropped_frame)
-                            print(f"Exported cropped image for {display_name} to {cropped_image_path}")
-                            self.write_caption(cropped_image_path)
-                            if self.cancel_requested:
-                                cap.release()
-                                if hasattr(self.main_app, 'export_finished_callback'):
-                                    self.main_app.export_finished_callback()
-                                return
-                # Always export the uncropped image
-                if prefix:
-                    self.file_counter += 1
-                    uncropped_image_name = f"{prefix}_{self.file_counter:05d}.png"
-                else:
-                    uncropped_image_name = f"{base_name}.png"
-                uncropped_image_path = os.path.join(uncropped_folder, uncropped_image_name)
-                uncropped_image_path = self.get_unique_filename(uncropped_image_path)
-                cv2.imwrite(uncropped_image_path, frame)
-                print(f"Exported uncropped image for {display_name} to {uncropped_image_path}")
-                self.write_caption(uncropped_image_path)
-                if self.cancel_requested:
-                    cap.release()
-                    if hasattr(self.main_app, 'export_finished_callback'):
-                        self.main_app.export_finished_callback()
-                    return
-
-
-        # First export uncropped version regardless of checkbox
-        base_name, ext = os.path.splitext(display_name)
-        if prefix:
-            self.file_counter += 1
-            uncropped_name = f"{prefix}_{self.file_counter:05d}{ext}"
-        else:
-            uncropped_name = f"{base_name}{ext}"
-        
-        uncropped_path = os.path.join(uncropped_folder, uncropped_name)
-        uncropped_path = self.get_unique_filename(uncropped_path)
-        seek_time = trim_start / fps
-        
-        # Export trimmed uncropped version first
-        (
-            ffmpeg.input(video_path, ss=seek_time)
-            .output(uncropped_path,
-                    vf=f'trim=start_frame=0:end_frame={self.main_app.trim_length},setpts=PTS-STARTPTS',
-                    af='aresample=async=1',  # Fix audio sync
-                    t=duration,  # Set duration in seconds
-                    map_metadata='-1')
-            .overwrite_output()
-            .run()
+        clip = self.clip_export_for(entry)
+        orig_w, orig_h, fps = probe_clip(clip.video_path)
+        claimed_before = set(self._reserved)
+        plan = build_export_plan(clip, self.main_app.folder_path, orig_w, orig_h, fps, self._reserved)
+        claimed = self._reserved - claimed_before
+        if not export_images(plan, cancelled=lambda: self.cancel_requested):
+            self._release_paths(claimed)
+            if hasattr(self.main_app, 'export_finished_callback'):
+                self.main_app.export_finished_callback()
+            return
+        if plan.cleanup:
+            # Ensure the longest edge stays even for encoding
+            if self.main_app.longest_edge % 2 != 0:
+                self.main_app.longest_edge -= 1
+        self._temp_paths.update(plan.temp_paths)
+
+        self.main_app.update_status("Encoding video...")
+        self._job_paths.append(claimed)
+        self.job_runner.submit(plan.steps, plan.cleanup)
+
+    def clip_export_for(self, entry):
+        """The export settings currently shown in the GUI, applied to entry."""
+        display_name = entry["display_name"]
+        return ClipExport(
+            entry["original_path"],
+            display_name,
+            crop=self.main_app.crop_regions.get(display_name),
+            trim_start=self.main_app.trim_points.get(display_name, 0),
+            trim_length=self.main_app.trim_length,
+            longest_edge=self.main_app.longest_edge,
+            prefix=getattr(self.main_app, 'export_prefix', ''),
+            export_image=self.main_app.export_image_checkbox.isChecked(),
+            caption=getattr(self.main_app, 'simple_caption', ''),
         )
-        
-        # Store the uncropped path when creating it
-        self.temp_uncropped_path = uncropped_path
 
-        # Only save uncropped if checkbox is checked
-        if True:
-            print(f"Exported uncropped {display_name} to {uncropped_path}")
-            self.write_caption(uncropped_path)
-        
-        # Now handle cropped version using the uncropped as source
-        if crop:
-            x, y, w, h = crop
-            x = max(0, x)
-            y = max(0, y)
-            w = min(w, orig_w - x)
-            h = min(h, orig_h - y)
-            
-            if w > 0 and h > 0:
-                # Ensure width and height are even for encoding
-                if self.main_app.longest_edge % 2 != 0:
-                    self.main_app.longest_edge -= 1
-                if h % 2 != 0:
-                    h -= 1
-                if w % 2 != 0:
-                    w -= 1
-
-                if prefix:
-                    self.file_counter += 1
-                    output_name = f"{prefix}_{self.file_counter:05d}_cropped{ext}"
-                else:
-                    output_name = f"{base_name}_cropped{ext}"
-
-                output_path = os.path.join(output_folder, output_name)
-                output_path = self.get_unique_filename(output_path)
-
-                # Use the trimmed uncropped version as source
-                cmd = [
-                    "ffmpeg",
-                    "-i", uncropped_path,
-                    "-vf", f"crop={w}:{h}:{x}:{y},scale={self.main_app.longest_edge}:-2",
-                    "-c:a", "aac",  # Use AAC audio codec
-                    "-map", "0:v:0",  # Map first video stream
-                    "-map", "0:a?",  # Map audio if present
-                    "-map_metadata", "-1",
-                    output_path
-                ]
-                self.run_ffmpeg_async(cmd)
-                print(f"Exported cropped {display_name} to {output_path}")
-                self.write_caption(output_path)
+    def save_export_job(self):
+        """Save the checked clips with their crops, trim points and the current export
+        options as a job file for python -m scripts.batch_export."""
+        self.main_app.loader.save_session()  # picks up the list's checkmarks
+        entries = [e for e in self.main_app.video_files if e.get("export_enabled")]
+        if not entries:
+            self.main_app.update_status("No clips checked for export.")
+            return
+        default = os.path.join(self.main_app.folder_path, "export_job.json")
+        path, _ = QFileDialog.getSaveFileName(self.main_app, "Save Export Job", default, "Export job (*.json)")
+        if not path:
+            return
+        try:
+            save_job_file(path, self.main_app.folder_path, [self.clip_export_for(e) for e in entries])
+        except OSError as e:
+            self.main_app.update_status(f"Could not save export job: {e}")
+            return
+        self.main_app.update_status(f"Saved export job for {len(entries)} clip(s): {path}")
@@ -148,7 +148,7 @@ class VideoExporter:
                     self.main_app.export_finished_callback()
                 return
 
-        entry = next((e for e in self.main_app.video_files if e["display_name"] == current_video), None)
+        entry = self.main_app.loader.find_entry(current_video)
         if not entry:
             print(f"Current video entry {current_video} not found.")
             if hasattr(self.main_app, 'export_finished_callback'):
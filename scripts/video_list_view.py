@@ -0,0 +1,257 @@
+import re
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor, QBrush
+from PyQt6.QtWidgets import QListView
+
+CHECKED_BACKGROUND = QColor(0, 100, 0)
+
+
+class VideoListModel(QAbstractListModel):
+    """Columnar store behind the file list.
+
+    Row data is kept as one list of display names and one bytearray of check
+    states instead of a widget item per file, so bulk updates (a new folder, a
+    sort, a search) are a single model reset rather than thousands of inserts.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names = []
+        self._checked = bytearray()
+        self._backgrounds = {}  # row -> QBrush overriding the check colour
+
+    # Qt model interface
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._names[row]
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if self._checked[row] else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.BackgroundRole:
+            brush = self._backgrounds.get(row)
+            if brush is not None:
+                return brush
+            return QBrush(CHECKED_BACKGROUND) if self._checked[row] else None
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        checked = value in (Qt.CheckState.Checked, Qt.CheckState.Checked.value)
+        row = index.row()
+        self._checked[row] = 1 if checked else 0
+        self._backgrounds.pop(row, None)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.BackgroundRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsUserCheckable
+
+    # Bulk updates
+    def set_rows(self, names, checked=None):
+        self.beginResetModel()
+        self._names = list(names)
+        self._checked = bytearray(checked) if checked is not None else bytearray(len(self._names))
+        self._backgrounds = {}
+        self.endResetModel()
+
+    def append_rows(self, names, checked=None):
+        names = list(names)
+        if not names:
+            return
+        first = len(self._names)
+        self.beginInsertRows(QModelIndex(), first, first + len(names) - 1)
+        self._names.extend(names)
+        self._checked.extend(bytearray(checked) if checked is not None else bytearray(len(names)))
+        self.endInsertRows()
+
+    def insert_row(self, row, name, checked=False):
+        row = max(0, min(row, len(self._names)))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._names.insert(row, name)
+        self._checked.insert(row, 1 if checked else 0)
+        self._backgrounds = {}
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        if not 0 <= row < len(self._names):
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._names[row]
+        del self._checked[row]
+        self._backgrounds = {}
+        self.endRemoveRows()
+
+    # Column access
+    def name(self, row):
+        return self._names[row]
+
+    def is_checked(self, row):
+        return bool(self._checked[row])
+
+    def check_states(self):
+        return bytes(self._checked)
+
+    def set_background(self, row, color):
+        if color is None or color == Qt.GlobalColor.transparent:
+            self._backgrounds[row] = QBrush(Qt.GlobalColor.transparent)
+        else:
+            self._backgrounds[row] = QBrush(color)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.BackgroundRole])
+
+
+class VideoListItem:
+    """Lightweight row handle returned by VideoListView.item().
+
+    It offers the subset of the QListWidgetItem API the app uses and reads and
+    writes straight through to the model; no per-row object is kept alive.
+    """
+
+    __slots__ = ("_view", "_row")
+
+    def __init__(self, view, row):
+        self._view = view
+        self._row = row
+
+    def row(self):
+        return self._row
+
+    def text(self):
+        return self._view.model().name(self._row)
+
+    def checkState(self):
+        return Qt.CheckState.Checked if self._view.model().is_checked(self._row) else Qt.CheckState.Unchecked
+
+    def setCheckState(self, state):
+        model = self._view.model()
+        model.setData(model.index(self._row), state, Qt.ItemDataRole.CheckStateRole)
+
+    def setBackground(self, color):
+        self._view.model().set_background(self._row, color)
+
+    def __eq__(self, other):
+        return isinstance(other, VideoListItem) and other._view is self._view and other._row == self._row
+
+    def __hash__(self):
+        return hash((id(self._view), self._row))
+
+
+class VideoListView(QListView):
+    """QListView over a VideoListModel with the QListWidget-style API the app already uses
+    (item/row/currentRow/itemClicked/...), so call sites work unchanged."""
+
+    itemClicked = pyqtSignal(object)
+    itemPressed = pyqtSignal(object)
+    itemChanged = pyqtSignal(object)
+    currentRowChanged = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setModel(VideoListModel(self))
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QListView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.clicked.connect(lambda index: self.itemClicked.emit(VideoListItem(self, index.row())))
+        self.pressed.connect(lambda index: self.itemPressed.emit(VideoListItem(self, index.row())))
+        self.model().dataChanged.connect(self._on_data_changed)
+        self.selectionModel().currentRowChanged.connect(
+            lambda current, previous: self.currentRowChanged.emit(current.row() if current.isValid() else -1)
+        )
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        if roles and Qt.ItemDataRole.CheckStateRole not in roles:
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self.itemChanged.emit(VideoListItem(self, row))
+
+    # Bulk population
+    def set_entries(self, names, checked=None):
+        """Replace all rows at once (one model reset)."""
+        self.model().set_rows(names, checked)
+
+    def append_entries(self, names, checked=None):
+        self.model().append_rows(names, checked)
+
+    def check_states(self):
+        return self.model().check_states()
+
+    # QListWidget-compatible API
+    def count(self):
+        return self.model().rowCount()
+
+    def item(self, row):
+        if row is None or not 0 <= row < self.count():
+            return None
+        return VideoListItem(self, row)
+
+    def row(self, item):
+        return item.row() if item is not None else -1
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def setCurrentRow(self, row):
+        if 0 <= row < self.count():
+            self.setCurrentIndex(self.model().index(row))
+        else:
+            self.setCurrentIndex(QModelIndex())
+
+    def currentItem(self):
+        return self.item(self.currentRow())
+
+    def clear(self):
+        self.model().set_rows([])
+
+    def addItem(self, name, checked=False):
+        self.model().append_rows([name], [1 if checked else 0])
+
+    def insertItem(self, row, name, checked=False):
+        self.model().insert_row(row, name, checked)
+
+    def takeItem(self, row):
+        if not 0 <= row < self.count():
+            return None
+        name = self.model().name(row)
+        self.model().remove_row(row)
+        return name
+
+    def scrollToItem(self, item):
+        if item is not None:
+            self.scrollTo(self.model().index(item.row()))
+
+    def visualItemRect(self, item):
+        return self.visualRect(self.model().index(item.row()))
+
+    def itemAt(self, pos):
+        index = self.indexAt(pos)
+        return VideoListItem(self, index.row()) if index.isValid() else None
+
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+
+
+def mirror_list_widget_rules(stylesheet):
+    """Return stylesheet with every QListWidget rule also applied to VideoListView.
+
+    Themes are written against QListWidget; the file list is now a QListView
+    subclass, which QListWidget selectors do not match.
+    """
+    if not stylesheet or "QListWidget" not in stylesheet:
+        return stylesheet
+    extra = []
+    for match in _RULE_RE.finditer(_COMMENT_RE.sub("", stylesheet)):
+        selectors = [s.strip() for s in match.group(1).split(",")]
+        mirrored = [re.sub(r"\bQListWidget\b", "VideoListView", s) for s in selectors if re.search(r"\bQListWidget\b", s)]
+        if mirrored:
+            extra.append(f"{', '.join(mirrored)} {{{match.group(2)}}}")
+    return stylesheet + "\n\n/* File list (VideoListView) */\n" + "\n".join(extra) + "\n"
@@ -1,8 +1,36 @@
-import os, json
-from PyQt6.QtWidgets import QFileDialog, QListWidgetItem, QApplication
+import os
+import sqlite3
+from PyQt6.QtWidgets import QFileDialog, QApplication
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor  # Added import for QColor
 import sys
+from scripts.folder_scanner import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS, FolderScanner
+from scripts.session_store import SessionStore
+from scripts import startup_timing
+
+# Scalar settings saved alongside the folder entries
+SESSION_SETTINGS = ("folder_path", "longest_edge", "trim_length", "grid_layout_mode")
+
+
+def _entry_ctime(entry):
+    """Creation time captured by the folder scan, falling back to a stat for older entries."""
+    ctime = entry.get("ctime")
+    if ctime is None:
+        try:
+            ctime = os.path.getctime(entry["original_path"])
+        except OSError:
+            ctime = 0
+    return ctime
+
+
+def _entry_size(entry):
+    size = entry.get("size")
+    if size is None:
+        try:
+            size = os.path.getsize(entry["original_path"])
+        except OSError:
+            size = 0
+    return size
+
 
 class VideoLoader:
     def __init__(self, main_app):
@@ -22,88 +50,183 @@ class VideoLoader:
             self.load_folder_contents()
 
     def load_folder_contents(self):
+        """Start a background scan of folder_path; entries stream into the list in batches."""
+        if getattr(self.main_app, 'library_mode', False):
+            self.load_library()
+            return
         if not self.main_app.folder_path:
             return
             
         self.main_app.video_list.clear()
         self.main_app.video_files = []
         
-        video_extensions = ('.mp4', '.avi', '.mkv', '.mov', '.wmv')
-        audio_extensions = ('.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg')
+        if getattr(self.main_app, 'audio_mode', False):
+            extensions = AUDIO_EXTENSIONS
+        else:
+            extensions = VIDEO_EXTENSIONS
+        if getattr(self, 'scanner', None) is None:
+            self.scanner = FolderScanner()
+            self.scanner.batch_ready.connect(self._on_scan_batch)
+            self.scanner.scan_finished.connect(self._on_scan_finished)
+            self.scanner.scan_failed.connect(self._on_scan_failed)
+        self.stop_library()
+        self._scan_generation = self.scanner.scan_async(self.main_app.folder_path, extensions)
+
+    def _on_scan_batch(self, gen, entries):
+        if gen == getattr(self, '_scan_generation', None):
+            startup_timing.mark("first files listed")
+            self._append_entries(entries)
+
+    def _append_entries(self, entries):
+        self.main_app.video_files.extend(entries)
+        self.main_app.video_list.append_entries(
+            [e["display_name"] for e in entries],
+            [1 if e.get("export_enabled", False) else 0 for e in entries]
+        )
+
+    def _on_scan_finished(self, gen, folder, total):
+        if gen != getattr(self, '_scan_generation', None):
+            return
+        self._restore_folder_state(folder)
+        self._finish_listing()
+
+    def saved_folder_entries(self, folder):
+        """Saved entries of folder, read from the session store the first time the folder is opened."""
+        if folder not in self.main_app.folder_sessions:
+            store = getattr(self, 'session_store', None)
+            if store is None:
+                return []
+            self.main_app.folder_sessions[folder] = store.get("folders", folder, [])
+        return self.main_app.folder_sessions[folder]
+
+    def _restore_folder_state(self, folder):
+        """Re-apply the export checkmarks saved for folder to the freshly scanned entries."""
+        checked = {e["original_path"] for e in self.saved_folder_entries(folder) if e.get("export_enabled")}
+        if not checked:
+            return
+        for entry in self.main_app.video_files:
+            if entry["original_path"] in checked:
+                entry["export_enabled"] = True
+
+    def _finish_listing(self):
+        if getattr(self, 'search_indexer', None) is not None:
+            # Pick up added/removed files on the next search
+            self.search_indexer.invalidate()
+        # Populate list by current sort mode
+        if hasattr(self.main_app, 'sort_dropdown'):
+            mode = self.main_app.sort_dropdown.currentText()
+        else:
+            mode = "Date (new first)"  # Default sort mode
+        self.sort_videos(mode)
+        if hasattr(self.main_app, 'update_file_count'):
+            self.main_app.update_file_count()
         
-        # Use os.scandir for better performance
-        try:
-            with os.scandir(self.main_app.folder_path) as entries:
-                for entry in entries:
-                    if not entry.is_file():
-                        continue
-                    name = entry.name.lower()
-                    if getattr(self.main_app, 'audio_mode', False):
-                        if name.endswith(audio_extensions):
-                            self.main_app.video_files.append({
-                                "original_path": entry.path,
-                                "display_name": entry.name,
-                                "copy_number": 0
-                            })
-                    else:
-                        if name.endswith(video_extensions):
-                            self.main_app.video_files.append({
-                                "original_path": entry.path,
-                                "display_name": entry.name,
-                                "copy_number": 0
-                            })
-            
-            # Populate list by current sort mode
-            if hasattr(self.main_app, 'sort_dropdown'):
-                mode = self.main_app.sort_dropdown.currentText()
+        # Select first video if available, but defer loading until UI is responsive
+        if self.main_app.video_files:
+            self.main_app.current_video_index = 0
+            self.main_app.video_list.setCurrentRow(0)
+            from PyQt6.QtCore import QTimer
+            if getattr(self.main_app, 'audio_mode', False):
+                QTimer.singleShot(0, lambda: self.load_audio(self.main_app.video_list.item(0)))
             else:
-                mode = "Date (new first)"  # Default sort mode
-            self.sort_videos(mode)
-            
-            # Select first video if available, but defer loading until UI is responsive
-            if self.main_app.video_files:
-                self.main_app.current_video_index = 0
-                self.main_app.video_list.setCurrentRow(0)
-                from PyQt6.QtCore import QTimer
-                if getattr(self.main_app, 'audio_mode', False):
-                    QTimer.singleShot(0, lambda: self.load_audio(self.main_app.video_list.item(0)))
-                else:
-                    QTimer.singleShot(0, lambda: self.load_video(self.main_app.video_list.item(0)))
-        except Exception as e:
-            print(f"Error loading folder contents: {e}")
+                QTimer.singleShot(0, lambda: self.load_video(self.main_app.video_list.item(0)))
+        startup_timing.mark("folder listed")
+        startup_timing.report()
+
+    def _on_scan_failed(self, gen, message):
+        if gen == getattr(self, '_scan_generation', None):
+            print(message)
+
+    def library_roots(self):
+        """Favorite folders of the current mode, or the current folder if there are none."""
+        roots = []
+        manager = getattr(self.main_app, 'folder_manager', None)
+        if manager is not None:
+            roots = [f for f in manager.get_current_folders(getattr(self.main_app, 'audio_mode', False))['favorites']
+                     if os.path.isdir(f)]
+        if not roots and self.main_app.folder_path:
+            roots = [self.main_app.folder_path]
+        return roots
+
+    def load_library(self):
+        """List every media file below the library roots, recursively, and keep watching them."""
+        self.main_app.video_list.clear()
+        self.main_app.video_files = []
+        if getattr(self, 'library', None) is None:
+            from scripts.library_index import LibraryScanner
+            self.library = LibraryScanner(self.main_app.get_dir_lister())
+            self.library.batch_ready.connect(self._on_library_batch)
+            self.library.scan_finished.connect(self._on_library_finished)
+            self.library.folder_changed.connect(self._on_library_folder_changed)
+        self._scan_generation = None
+        self._library_generation = self.library.scan(self.library_roots(), self._mode_extensions())
+
+    def stop_library(self):
+        if getattr(self, 'library', None) is not None:
+            self.library.stop()
+        self._library_generation = None
+
+    def _on_library_batch(self, gen, entries):
+        if gen == getattr(self, '_library_generation', None):
+            self._append_entries(entries)
+
+    def _on_library_finished(self, gen, total):
+        if gen == getattr(self, '_library_generation', None):
+            self._finish_listing()
+
+    def _on_library_folder_changed(self, folder, entries):
+        """Swap in the new listing of one watched folder, keeping the state of files that stayed."""
+        if getattr(self, '_library_generation', None) is None:
+            return
+        new_paths = {e["original_path"] for e in entries}
+        kept = [e for e in self.main_app.video_files
+                if os.path.dirname(e["original_path"]) != folder or e["original_path"] in new_paths]
+        if len(kept) == len(self.main_app.video_files) and {e["original_path"] for e in kept} >= new_paths:
+            return
+        known = {e["original_path"] for e in kept}
+        self.main_app.video_files = kept + [e for e in entries if e["original_path"] not in known]
+        if getattr(self, 'search_indexer', None) is not None:
+            self.search_indexer.invalidate()
+        search_bar = getattr(self.main_app, 'search_bar', None)
+        if search_bar is not None and search_bar.text().strip():
+            self.search_videos(search_bar.text())
+        elif hasattr(self.main_app, 'sort_dropdown') and self.main_app.sort_dropdown.currentText() != "Random":
+            self.sort_videos(self.main_app.sort_dropdown.currentText())
+        else:
+            self.show_entries(self.main_app.video_files)
+        if hasattr(self.main_app, 'update_file_count'):
+            self.main_app.update_file_count()
 
     def add_video_item(self, display_name):
-        item = QListWidgetItem(display_name)
-        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
         # Look up the saved export state.
-        entry = next((e for e in self.main_app.video_files if e["display_name"] == display_name), None)
-        if entry and entry.get("export_enabled", False):
-            item.setCheckState(Qt.CheckState.Checked)
-        else:
-            item.setCheckState(Qt.CheckState.Unchecked)
-        self.update_list_item_color(item)
-        self.main_app.video_list.addItem(item)
+        entry = self.find_entry(display_name)
+        self.main_app.video_list.addItem(display_name, checked=bool(entry and entry.get("export_enabled", False)))
+
+    def show_entries(self, entries):
+        """Replace the list contents with entries in one model reset."""
+        self.main_app.video_list.set_entries(
+            [e["display_name"] for e in entries],
+            [1 if e.get("export_enabled", False) else 0 for e in entries]
+        )
 
     def sort_videos(self, mode):
         import random
         # Remember the currently playing video's display name
         current_display = getattr(self.main_app, 'current_video', None)
         if mode == "Date (old first)":
-            self.main_app.video_files.sort(key=lambda x: os.path.getctime(x["original_path"]))
+            self.main_app.video_files.sort(key=_entry_ctime)
         elif mode == "Date (new first)":
-            self.main_app.video_files.sort(key=lambda x: os.path.getctime(x["original_path"]), reverse=True)
+            self.main_app.video_files.sort(key=_entry_ctime, reverse=True)
         elif mode == "Alphabetical":
             self.main_app.video_files.sort(key=lambda x: x["display_name"].lower())
         elif mode == "Size (large first)":
-            self.main_app.video_files.sort(key=lambda x: os.path.getsize(x["original_path"]), reverse=True)
+            self.main_app.video_files.sort(key=_entry_size, reverse=True)
         elif mode == "Size (small first)":
-            self.main_app.video_files.sort(key=lambda x: os.path.getsize(x["original_path"]))
+            self.main_app.video_files.sort(key=_entry_size)
         elif mode == "Random":
             random.shuffle(self.main_app.video_files)
         # Repopulate the list
-        self.main_app.video_list.clear()
-        for video in self.main_app.video_files:
-            self.add_video_item(video["display_name"])
+        self.show_entries(self.main_app.video_files)
         # After sorting, select the previously playing video if possible
         if current_display:
             idx = next((i for i, v in enumerate(self.main_app.video_files) if v["display_name"] == current_display), None)
@@ -128,45 +251,107 @@ class VideoLoader:
 
 
     def search_videos(self, text):
-        # Case-insensitive search in display_name or original_path
-        text = text.strip().lower()
-        self.main_app.video_list.clear()
-        if not hasattr(self.main_app, 'filtered_video_files'):
-            self.main_app.filtered_video_files = []
-        if not text:
+        """Case-insensitive search in display_name or original_path.
+        Once the cross-folder index is built, favorite and recent folders are searched too
+        and facets like codec:h264, res:1080 or dur<30 filter on ffprobe metadata."""
+        query = text.strip()
+        index = self._ensure_search_index() if query else None
+        if not query:
             # Show all
             self.main_app.filtered_video_files = list(self.main_app.video_files)
-            for video in self.main_app.filtered_video_files:
-                self.add_video_item(video["display_name"])
+        elif index is not None:
+            paths = index.search(query, self._mode_extensions())
+            self.main_app.filtered_video_files = self._entries_for_paths(paths)
         else:
+            text = query.lower()
             self.main_app.filtered_video_files = [
                 video for video in self.main_app.video_files
                 if text in video["display_name"].lower() or text in video["original_path"].lower()
             ]
-            for video in self.main_app.filtered_video_files:
-                self.add_video_item(video["display_name"])
+        self.show_entries(self.main_app.filtered_video_files)
         # Optionally, select first result
         if self.main_app.video_list.count() > 0:
             self.main_app.video_list.setCurrentRow(0)
 
+    def _mode_extensions(self):
+        return AUDIO_EXTENSIONS if getattr(self.main_app, 'audio_mode', False) else VIDEO_EXTENSIONS
+
+    def _search_folders(self):
+        folders = [self.main_app.folder_path]
+        manager = getattr(self.main_app, 'folder_manager', None)
+        if manager is not None:
+            current = manager.get_current_folders(getattr(self.main_app, 'audio_mode', False))
+            folders += current['favorites'] + current['recent']
+        return folders
+
+    def _ensure_search_index(self):
+        """Return the cross-folder search index, starting a background build if the folder set changed."""
+        if getattr(self, 'search_indexer', None) is None:
+            from scripts.search_index import SearchIndexer
+            self.search_indexer = SearchIndexer()
+            self.search_indexer.index_ready.connect(self._on_search_index_ready)
+        self.search_indexer.ensure(self._search_folders())
+        return self.search_indexer.index
+
+    def _on_search_index_ready(self, index):
+        search_bar = getattr(self.main_app, 'search_bar', None)
+        if search_bar is not None and search_bar.text().strip():
+            self.search_videos(search_bar.text())
+
+    def _entries_for_paths(self, paths):
+        """Map search hits to list entries: entries of the current folder keep their state
+        and come first, hits from other folders get fresh entries named by their full path,
+        so they can't be mistaken for a same-named file of the current folder."""
+        by_path = {}
+        for entry in self.main_app.video_files:
+            by_path.setdefault(entry["original_path"], []).append(entry)
+        current, others = [], []
+        for path in paths:
+            if path in by_path:
+                current.extend(by_path[path])
+            else:
+                others.append({
+                    "original_path": path,
+                    "display_name": path,
+                    "copy_number": 0,
+                })
+        order = {id(e): i for i, e in enumerate(self.main_app.video_files)}
+        current.sort(key=lambda e: order[id(e)])
+        return current + others
+
+    def listed_entries(self):
+        """The entries in list order: the search results while a search is shown, else video_files."""
+        filtered = getattr(self.main_app, 'filtered_video_files', None)
+        if filtered is not None and len(filtered) == self.main_app.video_list.count():
+            return filtered
+        return self.main_app.video_files
+
+    def entry_at(self, row):
+        """The entry shown in row of the file list, or None."""
+        entries = self.listed_entries()
+        return entries[row] if 0 <= row < len(entries) else None
+
+    def find_entry(self, display_name):
+        """The entry named display_name in the folder or, for other-folder search hits, the search results."""
+        entry = next((e for e in self.main_app.video_files if e["display_name"] == display_name), None)
+        if entry is None:
+            entry = next((e for e in getattr(self.main_app, 'filtered_video_files', None) or []
+                          if e["display_name"] == display_name), None)
+        return entry
+
     def update_list_item_color(self, item):
-        idx = self.main_app.video_list.row(item)
-        if idx >= 0 and idx < len(self.main_app.video_files):
-            # Update the export_enabled flag in the video_files entry.
-            self.main_app.video_files[idx]["export_enabled"] = (item.checkState() == Qt.CheckState.Checked)
-        if item.checkState() == Qt.CheckState.Checked:
-            # Use a darker green.
-            item.setBackground(QColor(0, 100, 0))
-        else:
-            item.setBackground(Qt.GlobalColor.transparent)
+        # The model paints checked rows dark green; only the entry needs updating here.
+        entry = self.entry_at(self.main_app.video_list.row(item))
+        if entry is not None:
+            # Update the export_enabled flag in the listed entry.
+            entry["export_enabled"] = (item.checkState() == Qt.CheckState.Checked)
 
         # Save the session immediately after updating the state.
       #  self.save_session()
 
     def load_video(self, item):
         idx = self.main_app.video_list.row(item)
-        filtered = getattr(self.main_app, 'filtered_video_files', None)
-        video_list_source = filtered if filtered is not None and len(filtered) == self.main_app.video_list.count() else self.main_app.video_files
+        video_list_source = self.listed_entries()
         if idx < 0 or idx >= len(video_list_source):
             return
         video_entry = video_list_source[idx]
@@ -184,14 +369,25 @@ class VideoLoader:
         if self.main_app.current_video not in self.main_app.crop_regions:
             self.main_app.crop_regions[self.main_app.current_video] = None
         self.main_app.editor.load_video(video_entry)
+        self._prefetch_neighbors(video_list_source, idx)
+
+    def _prefetch_neighbors(self, entries, idx):
+        """Warm the next and previous files in the current list order for E/R navigation."""
+        prefetcher = getattr(self.main_app, 'clip_prefetcher', None)
+        if prefetcher is None:
+            from scripts.clip_prefetcher import ClipPrefetcher
+            prefetcher = self.main_app.clip_prefetcher = ClipPrefetcher()
+        current = entries[idx]["original_path"]
+        neighbors = [entries[i]["original_path"] for i in (idx + 1, idx - 1) if 0 <= i < len(entries)]
+        prefetcher.prefetch([p for p in neighbors if p != current])
+        # The info panel (I) opens from cache for the current clip and its neighbours
+        if hasattr(self.main_app, 'get_media_info_cache'):
+            self.main_app.get_media_info_cache().prefetch([current] + neighbors)
 
     def load_audio(self, item):
-        idx = self.main_app.video_list.row(item)
-        filtered = getattr(self.main_app, 'filtered_video_files', None)
-        src = filtered if filtered is not None and len(filtered) == self.main_app.video_list.count() else self.main_app.video_files
-        if idx < 0 or idx >= len(src):
+        entry = self.entry_at(self.main_app.video_list.row(item))
+        if entry is None:
             return
-        entry = src[idx]
         self.main_app.current_video = entry["display_name"]
         # Delegate to the main app's audio loader
         if hasattr(self.main_app, 'load_audio_entry'):
@@ -225,6 +421,9 @@ class VideoLoader:
             "copy_number": new_copy,
             "export_enabled": original_entry.get("export_enabled", False)
         }
+        for key in ("size", "mtime", "ctime"):
+            if key in original_entry:
+                new_entry[key] = original_entry[key]
         self.main_app.video_files.append(new_entry)
         self.add_video_item(new_display)
         self.main_app.crop_regions[new_display] = self.main_app.crop_regions.get(original_entry["display_name"], None)
@@ -239,51 +438,53 @@ class VideoLoader:
                 self.main_app.current_rect = None
 
     def refresh_video_list(self):
-        self.main_app.video_list.clear()
-        for entry in self.main_app.video_files:
-            self.add_video_item(entry["display_name"])
+        self.show_entries(self.main_app.video_files)
 
     def load_session(self):
-        session_file = "session_data.json"
-        if os.path.exists(session_file):
-            try:
-                with open(session_file, "r") as f:
-                    session_data = json.load(f)
-                self.main_app.folder_path = session_data.get("folder_path", "")
-                self.main_app.video_files = session_data.get("video_files", [])
-                self.main_app.folder_sessions = session_data.get("folder_sessions", {})
-                self.main_app.crop_regions = session_data.get("crop_regions", {})
-                self.main_app.trim_points = session_data.get("trim_points", {})
-                self.main_app.longest_edge = session_data.get("longest_edge", 1024)
-                self.main_app.trim_length = session_data.get("trim_length", 113)
-                # Load grid layout mode preference
-                self.main_app.grid_layout_mode = session_data.get("grid_layout_mode", "auto")
-            except json.JSONDecodeError:
-                print("Error: Session file is corrupted. Starting with an empty session.")
-                self.main_app.folder_sessions = {}
-        else:
+        """Restore the session from the SQLite store, importing session_data.json on first run."""
+        try:
+            self.session_store = SessionStore()
+            self.session_store.import_json(self.session_file)
+        except sqlite3.Error as e:
+            print(f"Error: could not open session store ({e}). Starting with an empty session.")
+            self.session_store = None
             self.main_app.folder_sessions = {}
+            return
+        store = self.session_store
+        settings = store.items("settings")
+        self.main_app.folder_path = settings.get("folder_path", "")
+        # Only the last folder's entries are read now; other folders load when opened
+        self.main_app.folder_sessions = {}
+        self.main_app.video_files = self.saved_folder_entries(self.main_app.folder_path)
+        # Crop regions and trim points are fetched per clip on first access
+        self.main_app.crop_regions = store.tracked("crop_regions", lazy=True)
+        self.main_app.trim_points = store.tracked("trim_points", lazy=True)
+        self.main_app.longest_edge = settings.get("longest_edge", 1024)
+        self.main_app.trim_length = settings.get("trim_length", 113)
+        # Load grid layout mode preference
+        self.main_app.grid_layout_mode = settings.get("grid_layout_mode", "auto")
 
     def save_session(self):
+        """Queue the current folder's entries and the settings; crop regions and trim
+        points are written per key as they change. The store commits in the background."""
         # Update the export_enabled flag from the UI before saving.
-        for i in range(self.main_app.video_list.count()):
-            item = self.main_app.video_list.item(i)
-            self.main_app.video_files[i]["export_enabled"] = (item.checkState() == Qt.CheckState.Checked)
+        for entry, checked in zip(self.listed_entries(), self.main_app.video_list.check_states()):
+            entry["export_enabled"] = bool(checked)
         # Update the mapping for the current folder.
         self.main_app.folder_sessions[self.main_app.folder_path] = self.main_app.video_files
-        
-        session_data = {
-            "folder_path": self.main_app.folder_path,
-            "video_files": self.main_app.video_files,
-            "folder_sessions": self.main_app.folder_sessions,
-            "crop_regions": self.main_app.crop_regions,
-            "trim_points": self.main_app.trim_points,
-            "longest_edge": self.main_app.longest_edge,
-            "trim_length": self.main_app.trim_length,
-            "grid_layout_mode": self.main_app.grid_layout_mode
-        }
-        with open(self.session_file, "w") as file:
-            json.dump(session_data, file)
+        store = getattr(self, 'session_store', None)
+        if store is None:
+            return
+        store.put("folders", self.main_app.folder_path, self.main_app.video_files)
+        for key in SESSION_SETTINGS:
+            store.put("settings", key, getattr(self.main_app, key))
+
+    def close_session(self):
+        """Write everything still pending and close the store (on exit)."""
+        store = getattr(self, 'session_store', None)
+        if store is not None:
+            store.close()
+            self.session_store = None
 
 if __name__ == "__main__":
     from scripts.video_cropper import VideoCropper  # Local import to break circular dependency
@@ -0,0 +1,284 @@
+from __future__ import annotations
+import os
+import json
+import hashlib
+import subprocess
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Samples per peak at the finest level, and the reduction between successive levels.
+BASE_BLOCK = 64
+LEVEL_FACTOR = 4
+# Stop building coarser levels once a level has fewer peaks than this.
+MIN_LEVEL_PEAKS = 512
+# Samples per RMS frame used for silence/segment detection (~23 ms at 44.1 kHz).
+RMS_BLOCK = BASE_BLOCK * 16
+
+CACHE_VERSION = 2
+
+
+class PeakPyramid:
+    """Absolute-peak envelopes of an audio file at several zoom levels.
+
+    levels[0] holds one peak per BASE_BLOCK samples; each following level is
+    LEVEL_FACTOR times coarser. rms holds one RMS value per RMS_BLOCK samples.
+    Only these envelopes are kept, never the samples.
+    """
+
+    def __init__(self, levels: List[np.ndarray], blocks: List[int], sr: int, num_samples: int,
+                 rms: Optional[np.ndarray] = None) -> None:
+        self.levels = levels
+        self.blocks = blocks
+        self.sr = int(sr)
+        self.num_samples = int(num_samples)
+        self.rms = rms if rms is not None else np.zeros(0, dtype=np.float16)
+
+    @property
+    def duration_ms(self) -> int:
+        if self.sr <= 0:
+            return 0
+        return int(round(self.num_samples / float(self.sr) * 1000))
+
+    def level_for_span(self, span_sec: float, pixels: int) -> int:
+        """Return the coarsest level that still gives at least ~2 peaks per pixel for span_sec."""
+        pixels = max(1, int(pixels))
+        samples_in_view = max(1.0, span_sec * self.sr)
+        for i in range(len(self.levels) - 1, -1, -1):
+            if samples_in_view / self.blocks[i] >= pixels * 2:
+                return i
+        return 0
+
+    def times(self, level: int) -> np.ndarray:
+        """Time in seconds of each peak of the given level (block centres)."""
+        block = self.blocks[level]
+        n = len(self.levels[level])
+        return (np.arange(n, dtype=np.float64) * block + block / 2.0) / float(self.sr)
+
+
+def _reduce_max(x: np.ndarray, factor: int) -> np.ndarray:
+    """Vectorized block max: pad to a multiple of factor and max over each row."""
+    n = len(x)
+    if n == 0:
+        return x
+    pad = (-n) % factor
+    if pad:
+        x = np.concatenate([x, np.zeros(pad, dtype=x.dtype)])
+    return x.reshape(-1, factor).max(axis=1)
+
+
+def _reduce_sum(x: np.ndarray, factor: int) -> np.ndarray:
+    n = len(x)
+    if n == 0:
+        return x
+    pad = (-n) % factor
+    if pad:
+        x = np.concatenate([x, np.zeros(pad, dtype=x.dtype)])
+    return x.reshape(-1, factor).sum(axis=1)
+
+
+def _pyramid_from_base(base: np.ndarray, base_sq: np.ndarray, sr: int, num_samples: int) -> PeakPyramid:
+    levels = [base.astype(np.float16)]
+    blocks = [BASE_BLOCK]
+    while len(levels[-1]) >= MIN_LEVEL_PEAKS * LEVEL_FACTOR:
+        levels.append(_reduce_max(levels[-1], LEVEL_FACTOR))
+        blocks.append(blocks[-1] * LEVEL_FACTOR)
+    rms = np.sqrt(_reduce_sum(base_sq.astype(np.float64), RMS_BLOCK // BASE_BLOCK) / RMS_BLOCK)
+    return PeakPyramid(levels, blocks, sr, num_samples, rms.astype(np.float16))
+
+
+def build_peak_pyramid(samples: np.ndarray, sr: int) -> PeakPyramid:
+    """Build the mipmap pyramid from mono samples in [-1, 1]."""
+    x = np.nan_to_num(samples).astype(np.float32, copy=False)
+    base = _reduce_max(np.abs(x), BASE_BLOCK)
+    base_sq = _reduce_sum(x * x, BASE_BLOCK)
+    return _pyramid_from_base(base, base_sq, sr, len(samples))
+
+
+class PeakAccumulator:
+    """Builds the finest pyramid level incrementally from streamed sample chunks.
+
+    Only whole BASE_BLOCK windows are reduced; the remainder is carried into
+    the next chunk, so chunk boundaries do not affect the result.
+    """
+
+    def __init__(self) -> None:
+        self._peaks: List[np.ndarray] = []
+        self._squares: List[np.ndarray] = []
+        self._carry = np.zeros(0, dtype=np.float32)
+        self.num_samples = 0
+
+    def feed(self, chunk: np.ndarray) -> None:
+        self.num_samples += len(chunk)
+        x = np.nan_to_num(chunk)
+        if len(self._carry):
+            x = np.concatenate([self._carry, x])
+        whole = len(x) - len(x) % BASE_BLOCK
+        if whole:
+            blocks = x[:whole].reshape(-1, BASE_BLOCK)
+            self._peaks.append(np.abs(blocks).max(axis=1))
+            self._squares.append((blocks * blocks).sum(axis=1))
+        self._carry = x[whole:]
+
+    def _base(self) -> np.ndarray:
+        peaks = self._peaks + ([np.abs(self._carry)[None, :].max(axis=1)] if len(self._carry) else [])
+        if not peaks:
+            return np.zeros(0, dtype=np.float32)
+        base = np.concatenate(peaks)
+        # Keep the list short so repeated previews do not re-concatenate every chunk
+        self._peaks = [base[:len(base) - (1 if len(self._carry) else 0)]]
+        return base
+
+    def _base_squares(self) -> np.ndarray:
+        squares = self._squares + ([(self._carry * self._carry)[None, :].sum(axis=1)] if len(self._carry) else [])
+        if not squares:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(squares)
+
+    def preview(self, max_points: int) -> Tuple[int, np.ndarray]:
+        """Return (samples_per_peak, peaks) of what has been decoded so far, reduced to <= max_points."""
+        peaks = self._base()
+        block = BASE_BLOCK
+        while len(peaks) > max_points:
+            peaks = _reduce_max(peaks, LEVEL_FACTOR)
+            block *= LEVEL_FACTOR
+        return block, peaks
+
+    def finish(self, sr: int) -> PeakPyramid:
+        return _pyramid_from_base(self._base(), self._base_squares(), sr, self.num_samples)
+
+
+def probe_audio_stream(path: str) -> Tuple[Optional[int], int]:
+    """Return (sample_rate, duration_ms) of the first audio stream using ffprobe."""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+         '-show_entries', 'stream=sample_rate,duration:format=duration', '-of', 'json', path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode != 0:
+        return None, 0
+    try:
+        info = json.loads(result.stdout or '{}')
+    except ValueError:
+        return None, 0
+    streams = info.get('streams') or [{}]
+    sr = streams[0].get('sample_rate')
+    duration = streams[0].get('duration') or (info.get('format') or {}).get('duration')
+    try:
+        duration_ms = int(round(float(duration) * 1000)) if duration else 0
+    except ValueError:
+        duration_ms = 0
+    return (int(sr) if sr else None), duration_ms
+
+
+def stream_pcm(path: str, sr: int, chunk_seconds: float = 1.0, process_holder: Optional[list] = None) -> Iterator[np.ndarray]:
+    """Decode path to mono float32 PCM through an ffmpeg pipe and yield it in chunks.
+
+    If process_holder is given, the Popen object is appended to it so the caller can
+    terminate the decode early.
+    """
+    cmd = ['ffmpeg', '-v', 'error', '-i', path, '-vn', '-ac', '1', '-ar', str(sr),
+           '-f', 'f32le', '-acodec', 'pcm_f32le', 'pipe:1']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if process_holder is not None:
+        process_holder.append(proc)
+    chunk_bytes = max(4, int(sr * chunk_seconds)) * 4
+    pending = b''
+    try:
+        while True:
+            data = proc.stdout.read(chunk_bytes)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % 4
+            pending = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], dtype=np.float32)
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.terminate()
+        proc.wait()
+    if proc.returncode:
+        raise RuntimeError(f"ffmpeg exited with {proc.returncode}")
+
+
+def get_audio_hash(audio_path: str) -> str:
+    """Generate a hash for the audio file based on path, size, and modification time"""
+    try:
+        stat = os.stat(audio_path)
+        hash_data = f"{audio_path}_{stat.st_size}_{stat.st_mtime}"
+        return hashlib.md5(hash_data.encode()).hexdigest()
+    except OSError:
+        return hashlib.md5(audio_path.encode()).hexdigest()
+
+
+def get_cache_file_path(audio_path: str) -> str:
+    """Get the cache file path for an audio file. The extension is part of the
+    name so song.mp3 and song.wav in one folder don't share a cache file."""
+    audio_dir = os.path.dirname(audio_path)
+    audio_name = os.path.basename(audio_path)
+    return os.path.join(audio_dir, f".waveform_cache_{audio_name}.npz")
+
+
+def load_pyramid_from_cache(audio_path: str) -> Optional[PeakPyramid]:
+    """Load the peak pyramid from cache if available and valid"""
+    cache_path = get_cache_file_path(audio_path)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if int(data['version']) != CACHE_VERSION:
+                return None
+            if str(data['audio_hash']) != get_audio_hash(audio_path):
+                print(f"Audio changed, waveform cache invalid for {audio_path}")
+                return None
+            blocks = [int(b) for b in data['blocks']]
+            levels = [data[f'level_{i}'] for i in range(len(blocks))]
+            return PeakPyramid(levels, blocks, int(data['sr']), int(data['num_samples']), data['rms'])
+    except Exception as e:
+        print(f"Error loading waveform cache: {e}")
+        return None
+
+
+def save_pyramid_to_cache(audio_path: str, pyramid: PeakPyramid) -> None:
+    """Save the peak pyramid next to the audio file (float16, compressed)"""
+    cache_path = get_cache_file_path(audio_path)
+    tmp_path = cache_path + ".tmp.npz"
+    try:
+        arrays = {f'level_{i}': level for i, level in enumerate(pyramid.levels)}
+        np.savez_compressed(
+            tmp_path,
+            version=np.int32(CACHE_VERSION),
+            audio_hash=np.array(get_audio_hash(audio_path)),
+            sr=np.int64(pyramid.sr),
+            num_samples=np.int64(pyramid.num_samples),
+            blocks=np.array(pyramid.blocks, dtype=np.int64),
+            rms=pyramid.rms,
+            **arrays,
+        )
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Error saving waveform cache: {e}")
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_or_build_pyramid(audio_path: str) -> Optional[PeakPyramid]:
+    """Return the cached pyramid for audio_path, decoding and caching it on a miss.
+    Blocking; meant for worker threads and processes."""
+    pyramid = load_pyramid_from_cache(audio_path)
+    if pyramid is not None:
+        return pyramid
+    sr, _ = probe_audio_stream(audio_path)
+    if sr is None:
+        return None
+    acc = PeakAccumulator()
+    for chunk in stream_pcm(audio_path, sr):
+        acc.feed(chunk)
+    pyramid = acc.finish(sr)
+    save_pyramid_to_cache(audio_path, pyramid)
+    return pyramid